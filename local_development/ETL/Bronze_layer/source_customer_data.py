@@ -1,159 +1,205 @@
 # imports 
+import sys
 import os
+import argparse
 import duckdb
-import pandas as pd
-import random
-from faker import Faker
-from faker.providers import DynamicProvider
+import pyarrow as pa
 import datetime
-from tqdm import tqdm
-
-
-def generate_base_customers(seed: int = 12345, num_customers: int = 1000) -> pd.DataFrame:
-    """Generate consistent base customer data using Faker."""
-    fake = Faker('en_GB')
-    Faker.seed(seed)
-    random.seed(seed)
-
-    # Add dynamic profession provider
-    professions_provider = DynamicProvider(
-        provider_name="profession",
-        elements=[
-            "Engineer", "Graphic Designer", "Architect", "Civil engineer", "Software Developer",
-            "Laboratory Technician", "Mechanical engineer", "Scientist", "Veterinarian", "Artist",
-            "Bricklayer", "Producers and Directors", "Plasterer", "Nurse", "Roofer", "Musician", "Social Worker",
-            "Physiotherapist", "Health professional", "Teacher", "Radiographer", "Paramedic", "Physician", "Welder",
-            "Archaeologist", "Association football manager", "Technician", "Electrician", "Engineering technician",
-            "Accountant", "Painter and decorator", "Librarian", "Private investigator", "Pharmacy Technician",
-            "Technology specialist", "Quantity surveyor", "Air traffic controller", "Financial Manager",
-            "Official", "Chef", "Plumber", "Aviator", "Broker", "Police officer", "Designer", "Optician",
-            "Adviser", "Trader", "Consultant", "Chartered Surveyor", "Pipefitter"
-        ]
-    )
-    fake.add_provider(professions_provider)
-
-    bday_start = datetime.date(1950, 1, 1)
-    bday_end = datetime.date(2005, 1, 1)
-    joined_start = datetime.date(1990, 1, 1)
-    joined_end = datetime.date(2024, 12, 31)
-
-    customers = []
-    for cid in tqdm(range(10000, 10000 + num_customers), desc="Generating customers"):
-        customers.append({
-            'customerID': cid,
-            'firstName': fake.first_name(),
-            'lastName': fake.last_name(),
-            'rewardsMember': fake.boolean(),
-            'emailAddress': fake.email(),
-            'postcode': fake.postcode(),
-            'profession': fake.profession(),
-            'dob': fake.date_between(bday_start, bday_end),
-            'customerJoined': fake.date_time_between(start_date=joined_start, end_date=joined_end)
-        })
-
-    return pd.DataFrame(customers)
-
-
-def randomly_update_customers(df: pd.DataFrame, update_rate: float = 0.05, seed: int = None) -> pd.DataFrame:
-    """Randomly update fields for a small subset of customers."""
-    fake = Faker('en_GB')
-    if seed is not None:
-        Faker.seed(seed)
-        random.seed(seed)
-
-    professions_provider = DynamicProvider(
-        provider_name="profession",
-        elements=[
-            "Engineer", "Graphic Designer", "Architect", "Civil engineer", "Software Developer",
-            "Laboratory Technician", "Mechanical engineer", "Scientist", "Veterinarian", "Artist",
-            "Bricklayer", "Producers and Directors", "Plasterer", "Nurse", "Roofer", "Musician", "Social Worker",
-            "Physiotherapist", "Health professional", "Teacher", "Radiographer", "Paramedic", "Physician", "Welder",
-            "Archaeologist", "Association football manager", "Technician", "Electrician", "Engineering technician",
-            "Accountant", "Painter and decorator", "Librarian", "Private investigator", "Pharmacy Technician",
-            "Technology specialist", "Quantity surveyor", "Air traffic controller", "Financial Manager",
-            "Official", "Chef", "Plumber", "Aviator", "Broker", "Police officer", "Designer", "Optician",
-            "Adviser", "Trader", "Consultant", "Chartered Surveyor", "Pipefitter"
-        ]
-    )
-    fake.add_provider(professions_provider)
-
-    df_updated = df.copy()
-    num_to_update = int(len(df) * update_rate)
-    update_ids = random.sample(list(df['customerID']), num_to_update)
 
-    for cid in tqdm(update_ids, desc="Applying customer updates"):
-        idx = df_updated[df_updated['customerID'] == cid].index[0]
-        df_updated.at[idx, 'profession'] = fake.profession()
-        df_updated.at[idx, 'postcode'] = fake.postcode()
-        df_updated.at[idx, 'emailAddress'] = fake.email()
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.customers import generate_base_customers, randomly_update_customers
+from utils.partitions import overwrite_partition, overwrite_partitions, tag_partition
+from utils import schema_registry
+from utils.schema_registry import ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
 
-    return df_updated
+# source columns of a customer record (everything but the partition column)
+CUSTOMER_COLUMNS = [name for name, _ in schema_registry.CUSTOMER_COLUMNS]
+CDC_TABLE = "retail_bronze.customer_cdc_raw"
 
 
 # ============================================================================================================
 # for this section, i'm going to mock some data as if it came from some database or API
 # so that we have a flow of data we can use in our project
-def get_raw_customer_data() -> pd.DataFrame:
-    base_df = generate_base_customers(seed=101, num_customers=10000) # leave seed as static
-    customer_df = randomly_update_customers(base_df, update_rate=0.05) # customer data now in memory
-    dt = (datetime.date.today()).strftime('%Y-%m-%d')
-    customer_df['extract_date'] = dt
-    return customer_df
+def get_raw_customer_data(dt: datetime.date = None, num_customers: int = 10_000) -> pa.Table:
+    dt = dt or datetime.date.today()
+    base_tbl = generate_base_customers(seed=101, num_customers=num_customers, as_arrow=True) # leave seed as static
+    # seed the daily updates from the extract date, so any day can be regenerated identically
+    customer_tbl = randomly_update_customers(base_tbl, update_rate=0.05, seed=int(dt.strftime('%Y%m%d')))
+    return tag_partition(customer_tbl, dt.strftime('%Y-%m-%d'))
+
+
+# =============================================================================================================
+# change data capture: rather than a full snapshot per day, only store the rows that changed since the
+# latest stored state, tagged with an operation of I(nsert), U(pdate) or D(elete)
+def _current_state_query(dt: datetime.date) -> str:
+    """SQL of the latest stored row (with its row hash) of every customer not deleted as at `dt`, from the CDC table."""
+    return f"""
+    SELECT *
+    FROM (
+        SELECT *
+        FROM {CDC_TABLE}
+        WHERE extract_date <= '{dt:%Y-%m-%d}'
+        QUALIFY row_number() OVER (PARTITION BY customerID ORDER BY extract_date DESC) = 1
+    )
+    WHERE operation <> 'D'
+    """
+
+
+def customer_snapshot_query(dt: datetime.date) -> str:
+    """SQL rebuilding the full customer snapshot as at `dt`, from the CDC table.
+
+    Args:
+        dt (datetime.date): Extract date of the snapshot to rebuild
+
+    Returns:
+        str: Query returning the same columns as `retail_bronze.customer_src_raw`
+    """
+    columns = ", ".join(CUSTOMER_COLUMNS)
+    return f"SELECT {columns}, '{dt:%Y-%m-%d}' AS extract_date FROM ({_current_state_query(dt)})"
+
+
+def _diff_customers(con: duckdb.DuckDBPyConnection, incoming: pa.Table, previous: str, dt: datetime.date) -> pa.Table:
+    """Rows of the CDC partition for `dt`: the changes from the customers of query `previous` (the state
+    before `dt`) to the full snapshot `incoming`, both with their row hash, compared on `customerID` and
+    that hash."""
+    columns = ", ".join(CUSTOMER_COLUMNS)
+    con.register("incoming", incoming)
+    changes = con.execute(f"""
+    WITH current_state AS (
+        SELECT {columns}, row_hash FROM ({previous})
+    )
+    SELECT i.*, CASE WHEN c.customerID IS NULL THEN 'I' ELSE 'U' END AS operation, '{dt:%Y-%m-%d}' AS extract_date
+    FROM incoming AS i
+    LEFT JOIN current_state AS c USING (customerID)
+    WHERE c.customerID IS NULL OR c.row_hash <> i.row_hash
+    UNION ALL
+    SELECT {columns}, c.row_hash, 'D' AS operation, '{dt:%Y-%m-%d}' AS extract_date
+    FROM current_state AS c
+    ANTI JOIN incoming AS i USING (customerID)
+    """).arrow()
+    con.unregister("incoming")
+    return changes
+
+
+def load_customer_cdc(con: duckdb.DuckDBPyConnection, customer_tbl: pa.Table, dt: datetime.date) -> dict:
+    """Diff a customer snapshot against the latest stored state, and write only the changes for `dt`.
+
+    Rows are compared on `customerID` and an md5 hash of their source columns. Reruns for the same day
+    are idempotent, as changes are always computed against the state before `dt`. Each later day's
+    changes were computed against the state `dt` replaces, so when an earlier day is rerun, the full
+    snapshot of every later day is first rebuilt from the stored changes, each is diffed again against
+    the day before it, and every partition is replaced in one transaction (see
+    `utils.partitions.overwrite_partitions`).
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        customer_tbl (pa.Table): Full customer snapshot for `dt`
+        dt (datetime.date): Extract date being loaded
+
+    Returns:
+        dict: Write stats from `overwrite_partition` (for `dt`), the number of rows per operation, and the
+            later days recomputed
+    """
+    columns = ", ".join(CUSTOMER_COLUMNS)
+    row_hash = "md5(CAST({" + ", ".join(f"'{c}': {c}" for c in CUSTOMER_COLUMNS) + "} AS VARCHAR))"
+
+    # create the table (source columns, plus the row hash & operation) as defined in the schema registry,
+    # and (re)create the view of the current state on top
+    ensure_tables(con, [CDC_TABLE])
+    con.execute(f"CREATE OR REPLACE VIEW retail_bronze.customer_cdc_current AS {customer_snapshot_query(datetime.date.max)} ;")
+
+    con.register("customer_tbl", customer_tbl)
+    snapshots = [(dt, con.execute(f"SELECT {columns}, {row_hash} AS row_hash FROM customer_tbl").arrow())]
+    con.unregister("customer_tbl")
+    # full snapshots of the days after `dt` (with the hashes stored), read before any of them is rewritten
+    later_days = [datetime.date.fromisoformat(row[0]) for row in con.execute(
+        f"SELECT DISTINCT extract_date FROM {CDC_TABLE} WHERE extract_date > '{dt:%Y-%m-%d}' ORDER BY extract_date"
+    ).fetchall()]
+    for day in later_days:
+        snapshots.append((day, con.execute(f"SELECT {columns}, row_hash FROM ({_current_state_query(day)})").arrow()))
+
+    # diff `dt` against the stored state before it, then each later day against the snapshot of the day before
+    writes = []
+    previous = _current_state_query(dt - datetime.timedelta(days=1))
+    for day, snapshot in snapshots:
+        writes.append((CDC_TABLE, _diff_customers(con, snapshot, previous, day), f"{day:%Y-%m-%d}"))
+        con.register("previous_snapshot", snapshot)
+        previous = "FROM previous_snapshot"
+    con.unregister("previous_snapshot")
+
+    if later_days:
+        print(f"`{CDC_TABLE}`: recomputing the changes of {len(later_days)} later day(s) after rerunning {dt:%Y-%m-%d}")
+        stats = overwrite_partitions(con, writes)[0]
+    else:
+        stats = overwrite_partition(con, CDC_TABLE, writes[0][1], f"{dt:%Y-%m-%d}")
+    changes = writes[0][1]
+    stats["operations"] = dict(zip(*changes.group_by("operation").aggregate([("operation", "count")]).to_pydict().values()))
+    stats["days_recomputed"] = [f"{day:%Y-%m-%d}" for day in later_days]
+    return stats
 
 
 # =============================================================================================================
-# collect env variables for connection to DuckLake as ETL admin
-def etl():
+# load to DuckLake as ETL admin, through the shared session (see `utils.session`)
+def load_raw_customer_data(
+    con: duckdb.DuckDBPyConnection,
+    customer_tbl: pa.Table,
+    dt: datetime.date,
+    mode: str = "snapshot"
+) -> dict:
+    """Write one day of raw customer data to the bronze layer, creating the table on first load.
+
+    Either as a full snapshot into `retail_bronze.customer_src_raw`, or (mode="cdc") as changes only
+    into `retail_bronze.customer_cdc_raw`.
+    """
+    if mode == "cdc":
+        return load_customer_cdc(con, customer_tbl, dt)
+
+    # create the table, or add new columns, as defined in the schema registry
+    ensure_tables(con, ["retail_bronze.customer_src_raw"])
+    return overwrite_partition(con, "retail_bronze.customer_src_raw", customer_tbl, f"{dt:%Y-%m-%d}")
+
+
+def etl(dt: datetime.date = None, mode: str = "snapshot", profile: str = DEFAULT_PROFILE):
     """
     Process the ETL stage of loading raw customer data to bronze layer of DuckLake.
     Automatically manages connection context to ensure clean closure.
+    Loads the `extract_date` partition for `dt` (defaults to today), either as a full snapshot into
+    `retail_bronze.customer_src_raw`, or (mode="cdc") as changes only into `retail_bronze.customer_cdc_raw`,
+    writing with `profile` (see `utils.write_profiles`).
     """
-    pg_host = os.getenv('PG_HOST')
-    pg_user = os.getenv('PG_USER')
-    pg_password = os.getenv('PG_PASSWORD')
+    dt = dt or datetime.date.today()
 
     # collect customer_data first (so it's available even if we need to infer schema)
     print("generating fake customer data ...")
-    customer_df = get_raw_customer_data()
-
-    # DuckDB connection with context manager for auto-close
-    with duckdb.connect(database=":memory:") as con:
-
-        con = duckdb.connect(database=":memory:")
-        print("connecting to ducklake ...")
-        con.execute(f"""
-        ATTACH 'ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}' AS retail_ducklake ;
-        USE retail_ducklake ;
-        """)
-
-        # create table if not exists (based on schema of customer_df)
-        try:
-            con.execute("SELECT 1 FROM retail_bronze.customer_src_raw LIMIT 1;")
-        except:
-            print("Table: `retail_bronze.customer_src_raw` does not yet exist. Creating ...")
-            con.register("customer_df", customer_df)  # register pandas DataFrame
-            con.execute("""
-            CREATE TABLE retail_bronze.customer_src_raw AS SELECT * FROM customer_df LIMIT 0 ;
-            ALTER TABLE retail_bronze.customer_src_raw SET PARTITIONED BY (extract_date) ;
-            """)
-            print("Table: `retail_bronze.customer_src_raw` created")
-        
-        # execute write of data to table
-        print("load customer data to bronze layer")
-        dt = (datetime.date.today()).strftime('%Y-%m-%d')
-        con.execute(f"""
-        DELETE FROM retail_bronze.customer_src_raw WHERE extract_date = '{dt}' ;
-        INSERT INTO retail_bronze.customer_src_raw SELECT * FROM customer_df ;
-        """)
-        print("Data loaded")
+    with metrics.job("customers"), metrics.stage("generate") as generate_stage:
+        customer_tbl = get_raw_customer_data(dt)
+        generate_stage["rows"] = len(customer_tbl)
 
-        # clean up the context (optional inside `with`, but for completeness)
-        con.execute("USE memory ;")
-        con.execute("DETACH retail_ducklake ;")
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con, metrics.job("customers"):
+        print("load customer data to bronze layer")
+        with metrics.stage("load") as load_stage:
+            stats = load_raw_customer_data(con, customer_tbl, dt, mode)
+            load_stage.update(rows=stats["rows_written"], bytes=stats["bytes_written"])
+        print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load raw customer data to the bronze layer")
+    parser.add_argument("--mode", choices=["snapshot", "cdc"], default="snapshot",
+                        help="write a full daily snapshot, or only the changes since the latest stored state")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
     print("Running ETL process for BRONZE -- Raw Customer Data ...")
-    etl() # process ETL
-    print("Data Load to `retail_bronze.customer_src_raw` completed")
+    etl(mode=args.mode, profile=args.profile) # process ETL
+    table = CDC_TABLE if args.mode == "cdc" else "retail_bronze.customer_src_raw"
+    print(f"Data Load to `{table}` completed")
     exit()
@@ -2,104 +2,71 @@
 import sys
 import os
 import duckdb
+import argparse
 import datetime
-import pandas as pd
-from faker import Faker
-import random
-from typing import Optional
-from tqdm import tqdm
+import pyarrow as pa
 
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.stores import get_stores
+from utils.partitions import overwrite_partition, tag_partition
+from utils.schema_registry import ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
 
-UK_CITIES = [
-    "London", "Birmingham", "Manchester", "Glasgow", "Liverpool",
-    "Leeds", "Sheffield", "Bristol", "Edinburgh", "Newcastle"
-]
 
+def get_raw_store_data(dt: datetime.date = None) -> pa.Table:
+    dt = dt or datetime.date.today()
+    stores_tbl = get_stores(
+        seed=123,
+        show_progress=True,
+        as_arrow=True
+    )
+    return tag_partition(stores_tbl, dt.strftime("%Y-%m-%d"))
 
-def get_stores(
-    seed: Optional[int] = 100,
-    show_progress: bool = False
-) -> pd.DataFrame:
-    """Generate a fixed set of 10 fake retail stores using UK city names.
-
-    Args:
-        seed (Optional[int]): Random seed for reproducibility
-        show_progress (bool): Whether to show a progress bar
-
-    Returns:
-        pd.DataFrame: Store metadata
-    """
-    fake = Faker("en_GB")
-    Faker.seed(seed)
-    random.seed(seed)
 
-    rows = []
-    iterator = tqdm(enumerate(UK_CITIES, start=1), total=10, desc="Generating stores") if show_progress else enumerate(UK_CITIES, start=1)
-    for store_id, city in iterator:
-        rows.append({
-            "store_id": store_id,
-            "store_name": f"{city} Store",
-            "manager": fake.name(),
-            "opened_date": fake.date_between(start_date='-10y', end_date='-1y')
-        })
-    return pd.DataFrame(rows)
+# =============================================================================================================
+# load to DuckLake as ETL admin, through the shared session (see `utils.session`)
+def load_raw_store_data(con: duckdb.DuckDBPyConnection, stores_tbl: pa.Table, dt: datetime.date) -> dict:
+    """Write one day of raw store data to `retail_bronze.stores_src_raw`, creating the table on first load."""
+    # create the table, or add new columns, as defined in the schema registry
+    ensure_tables(con, ["retail_bronze.stores_src_raw"])
+    return overwrite_partition(con, "retail_bronze.stores_src_raw", stores_tbl, f"{dt:%Y-%m-%d}")
 
 
-# =============================================================================================================
-# collect env variables for connection to DuckLake as ETL admin
-def etl():
+def etl(dt: datetime.date = None, profile: str = DEFAULT_PROFILE):
     """
     Process the ETL stage of loading raw store data to bronze layer of DuckLake.
     Automatically manages connection context to ensure clean closure.
+    Loads the `extract_date` partition for `dt` (defaults to today), writing with `profile` (see `utils.write_profiles`).
     """
-    pg_host = os.getenv('PG_HOST')
-    pg_user = os.getenv('PG_USER')
-    pg_password = os.getenv('PG_PASSWORD')
+    dt = dt or datetime.date.today()
 
     # collect customer_data first (so it's available even if we need to infer schema)
     print("generating fake stores data ...")
-    stores_df = get_stores(
-        seed=123,
-        show_progress=True
-    )
-    stores_df['extract_date'] = datetime.date.today().strftime("%Y-%m-%d")
+    with metrics.job("stores"), metrics.stage("generate") as generate_stage:
+        stores_tbl = get_raw_store_data(dt)
+        generate_stage["rows"] = len(stores_tbl)
 
-    # DuckDB connection with context manager for auto-close
-    with duckdb.connect(database=":memory:") as con:
-        print("connecting to ducklake ...")
-        con.execute(f"""
-        ATTACH 'ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}' AS retail_ducklake ;
-        USE retail_ducklake ;
-        """)
-
-        # create table if not exists (based on schema of df)
-        try:
-            con.execute("SELECT 1 FROM retail_bronze.stores_src_raw ;")
-        except:
-            print("Table: `retail_bronze.stores_src_raw` does not yet exist. Creating ...")
-            con.register("stores_df", stores_df)  # register pandas DataFrame
-            con.execute("""
-            CREATE TABLE retail_bronze.stores_src_raw AS SELECT * FROM stores_df LIMIT 0 ;
-            ALTER TABLE retail_bronze.stores_src_raw SET PARTITIONED BY (extract_date) ;
-            """)
-            print("Table: `retail_bronze.stores_src_raw` created")
-        
-        # execute write of data to table
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con, metrics.job("stores"):
         print("load stores data to bronze layer")
-        dt = (datetime.date.today()).strftime('%Y-%m-%d')
-        con.execute(f"""
-        DELETE FROM retail_bronze.stores_src_raw WHERE extract_date = '{dt}' ;
-        INSERT INTO retail_bronze.stores_src_raw SELECT * FROM stores_df ;
-        """)
-        print("Data loaded")       
-
-        # clean up the context (optional inside `with`, but for completeness)
-        con.execute("USE memory ;")
-        con.execute("DETACH retail_ducklake ;")
+        with metrics.stage("load") as load_stage:
+            stats = load_raw_store_data(con, stores_tbl, dt)
+            load_stage.update(rows=stats["rows_written"], bytes=stats["bytes_written"])
+        print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load raw stores data to the bronze layer")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
     print("Running ETL process for BRONZE -- Raw Stores Data ...")
-    etl() # process ETL
+    etl(profile=args.profile) # process ETL
     print("Data Load to `retail_bronze.stores_src_raw` completed")
     exit()
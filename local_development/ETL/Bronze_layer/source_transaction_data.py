@@ -2,165 +2,142 @@
 import sys
 import os
 import duckdb
-import pandas as pd
-from faker import Faker
-from faker.providers import DynamicProvider
+import argparse
 import datetime
-import random
-import uuid
-from typing import Optional
-from tqdm import tqdm
-
-# Constants
-PRODUCT_PRICES = {
-    "Laptop": 399.99,
-    "Desktop": 599.99,
-    "Monitor": 120,
-    "Keyboard": 35,
-    "Mouse": 8,
-    "Docking Station": 70,
-    "HDMI Cable": 14.98,
-    "Office Chair Premium": 250,
-    "Office Chair Standard": 160,
-    "Desk": 400,
-    "Laptop Bag": 55,
-    "Laptop Stand": 12.99,
-    "Extension Cable": 4.99,
-    "USB Flash Drive 16gb": 3.99,
-    "Tablet": 115,
-    "Printer": 70,
-    "Projector": 300,
-    "WiFi Range Extender": 30,
-}
-
-
-def get_transactions(
-    start: datetime.date,
-    end: datetime.date,
-    num_transactions: int = 100_000,
-    seed: Optional[int] = None,
-    show_progress: bool = False
-) -> pd.DataFrame:
-    """Generate fake multi-product transaction data with channel and store_id.
+import pyarrow as pa
+from typing import Iterator
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import (
+    generate_transactions, iter_transaction_batches, TRANSACTION_SCHEMA, CATEGORY_TYPE, ID_SCHEMES
+)
+from utils.partitions import overwrite_partition, tag_partition
+from utils.schema_registry import ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+# schema of the bronze table: generated line items plus the partition column
+BRONZE_SCHEMA = TRANSACTION_SCHEMA.append(pa.field("extract_date", CATEGORY_TYPE))
+
+
+# =============================================================================================================
+def get_raw_transaction_data(dt: datetime.date = None, num_transactions: int = 5_000, id_scheme: str = "uuid4") -> pa.Table:
+    """One day of fake transactions as an Arrow table (keeping UUID ids as 16-byte values), tagged with `extract_date`."""
+    dt = dt or datetime.date.today()
+    txns_tbl = generate_transactions(
+        start=dt,
+        end=dt + datetime.timedelta(days=1),
+        num_transactions=num_transactions,
+        as_arrow=True,
+        show_progress=True,
+        id_scheme=id_scheme
+    )
+    return tag_partition(txns_tbl, f"{dt:%Y-%m-%d}")
+
+
+def stream_raw_transaction_data(
+    dt: datetime.date,
+    num_transactions: int,
+    chunk_size: int,
+    id_scheme: str = "uuid4"
+) -> pa.RecordBatchReader:
+    """Stream one day of fake transactions as fixed-size record batches, tagged with `extract_date`.
 
     Args:
-        start (datetime.date): Start date for transaction timestamps
-        end (datetime.date): End date for transaction timestamps
+        dt (datetime.date): Day to generate transactions for
         num_transactions (int): Number of unique transactions to generate
-        seed (Optional[int]): Seed value for reproducibility
-        show_progress (bool): Whether to show a progress bar
+        chunk_size (int): Number of transactions per record batch
+        id_scheme (str): Transaction id scheme, "uuid4" (random) or "uuid7" (time-ordered)
 
     Returns:
-        pd.DataFrame: DataFrame containing line-item transactions
+        pa.RecordBatchReader: Lazily generated batches, with schema `BRONZE_SCHEMA`
     """
-    fake = Faker(locale="en_GB")
-
-    # Seed everything for reproducibility
-    if seed is None:
-        seed = int(start.strftime("%Y%m%d"))
-    fake.seed_instance(seed)
-    random.seed(seed)
-
-    # Add dynamic product provider
-    product_provider = DynamicProvider(
-        provider_name="product",
-        elements=list(PRODUCT_PRICES.keys())
-    )
-    fake.add_provider(product_provider)
-
-    txn_list = []
-    iterator = tqdm(range(num_transactions), desc="Generating transactions") if show_progress else range(num_transactions)
-
-    for _ in iterator:
-        customer_id = random.randint(10000, 150000)
-        transaction_ts = fake.date_time_between(start_date=start, end_date=end)
-        transaction_id = str(uuid.uuid4())
-
-        num_items = random.randint(1, 5)
-        products = random.sample(list(PRODUCT_PRICES.keys()), k=num_items)
-
-        channel = random.choices(["Online", "In-Store"], weights=[0.7, 0.3])[0]
-        store_id = random.randint(1, 10) if channel == "In-Store" else None
-
-        for product in products:
-            txn_list.append({
-                "transaction_id": transaction_id,
-                "customerID": customer_id,
-                "transaction_TS": transaction_ts,
-                "Product": product,
-                "volume": random.randint(1, 6),
-                "channel": channel,
-                "store_id": store_id
-            })
-
-    df = pd.DataFrame(txn_list)
-    # Join prices
-    prices_df = pd.DataFrame(PRODUCT_PRICES.items(), columns=["Product", "Price"])
-    df = df.merge(prices_df, on="Product", how="left")
-    # Calculate line-item total
-    df["txn_amount"] = df["volume"] * df["Price"]
-    return df
-
-
-# =============================================================================================================
-# collect env variables for connection to DuckLake as ETL admin
-def etl():
+    def batches() -> Iterator[pa.RecordBatch]:
+        for batch in iter_transaction_batches(
+            start=dt,
+            end=dt + datetime.timedelta(days=1),
+            num_transactions=num_transactions,
+            batch_size=chunk_size,
+            show_progress=True,
+            id_scheme=id_scheme
+        ):
+            yield tag_partition(batch, dt.strftime("%Y-%m-%d"))
+
+    return pa.RecordBatchReader.from_batches(BRONZE_SCHEMA, batches())
+
+
+# load to DuckLake as ETL admin, through the shared session (see `utils.session`)
+def load_raw_transaction_data(con: duckdb.DuckDBPyConnection, txns_src, dt: datetime.date) -> dict:
+    """Write one day of raw transactions to `retail_bronze.transactions_src_raw`, creating the table on first load.
+
+    `txns_src` may be an Arrow table (or pandas DataFrame), or a record batch reader from
+    `stream_raw_transaction_data`, in which case batches are written out as DuckDB pulls them, each sorted on its
+    own in the table's layout order (see `utils.partitions.sort_batches`).
+    """
+    # create the table, or add new columns, as defined in the schema registry (so a stream is not consumed here)
+    ensure_tables(con, ["retail_bronze.transactions_src_raw"])
+    return overwrite_partition(con, "retail_bronze.transactions_src_raw", txns_src, f"{dt:%Y-%m-%d}")
+
+
+def etl(
+    dt: datetime.date = None,
+    num_transactions: int = 5_000,
+    stream: bool = False,
+    chunk_size: int = 100_000,
+    id_scheme: str = "uuid4",
+    profile: str = DEFAULT_PROFILE
+):
     """
     Process the ETL stage of loading raw transaction data to bronze layer of DuckLake.
     Automatically manages connection context to ensure clean closure.
+    Loads the `extract_date` partition for `dt` (defaults to today), writing with `profile` (see `utils.write_profiles`).
+
+    In streaming mode, transactions are generated in batches of `chunk_size` and consumed by DuckDB
+    straight into the DuckLake table in a single transaction, so the whole day is never held as a
+    table: each batch is sorted in the table's layout order on its own, rather than the whole day at
+    once, so memory stays bounded by `chunk_size`. Anything DuckDB does buffer is held to the profile's
+    `memory_limit`, spilling to its `temp_directory`.
+
+    Transaction ids are stored as UUIDs, either random ("uuid4") or time-ordered ("uuid7"), which
+    cluster by transaction time.
     """
-    pg_host = os.getenv('PG_HOST')
-    pg_user = os.getenv('PG_USER')
-    pg_password = os.getenv('PG_PASSWORD')
-
-    # collect customer_data first (so it's available even if we need to infer schema)
-    print("generating fake transaction data ...")
-    today = datetime.date.today()
-    tomorrow = today + datetime.timedelta(days=1)
-    txns_df = get_transactions(
-        start=today,
-        end=tomorrow,
-        num_transactions=5_000,
-        show_progress=True
-    )
-    txns_df['extract_date'] = datetime.date.today().strftime("%Y-%m-%d")
-
-    # DuckDB connection with context manager for auto-close
-    with duckdb.connect(database=":memory:") as con:
-        print("connecting to ducklake ...")
-        con.execute(f"""
-        ATTACH 'ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}' AS retail_ducklake ;
-        USE retail_ducklake ;
-        """)
-
-        # create table if not exists (based on schema of df)
-        try:
-            con.execute("SELECT 1 FROM retail_bronze.transactions_src_raw ;")
-        except:
-            print("Table: `retail_bronze.transactions_src_raw` does not yet exist. Creating ...")
-            con.register("txns_df", txns_df)  # register pandas DataFrame
-            con.execute("""
-            CREATE TABLE retail_bronze.transactions_src_raw AS SELECT * FROM txns_df LIMIT 0 ;
-            ALTER TABLE retail_bronze.transactions_src_raw SET PARTITIONED BY (extract_date) ;
-            """)
-            print("Table: `retail_bronze.transactions_src_raw` created")
-
-        # execute write of data to table
+    dt = dt or datetime.date.today()
+    if stream:
+        # nothing is generated until DuckDB pulls batches from the reader during the INSERT
+        txns_src = stream_raw_transaction_data(dt, num_transactions, chunk_size, id_scheme)
+    else:
+        # collect customer_data first (so it's available even if we need to infer schema)
+        print("generating fake transaction data ...")
+        with metrics.job("transactions"), metrics.stage("generate") as generate_stage:
+            txns_src = get_raw_transaction_data(dt, num_transactions, id_scheme)
+            generate_stage["rows"] = len(txns_src)
+
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con, metrics.job("transactions"):
         print("load txn data to bronze layer")
-        dt = (datetime.date.today()).strftime('%Y-%m-%d')
-        con.execute(f"""
-        DELETE FROM retail_bronze.transactions_src_raw WHERE extract_date = '{dt}' ;
-        INSERT INTO retail_bronze.transactions_src_raw SELECT * FROM txns_df ;
-        """)
-        print("Data loaded")
-
-        # clean up the context (optional inside `with`, but for completeness)
-        con.execute("USE memory ;")
-        con.execute("DETACH retail_ducklake ;")
+        # when streaming, this stage includes generation, as batches are generated as DuckDB pulls them
+        with metrics.stage("load") as load_stage:
+            stats = load_raw_transaction_data(con, txns_src, dt)
+            load_stage.update(rows=stats["rows_written"], bytes=stats["bytes_written"])
+        print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load raw transaction data to the bronze layer")
+    parser.add_argument("--num-transactions", type=int, default=5_000, help="number of transactions to generate")
+    parser.add_argument("--stream", action="store_true", help="generate and load in bounded-memory record batches")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="transactions per record batch when streaming")
+    parser.add_argument("--id-scheme", choices=ID_SCHEMES, default="uuid4", help="random or time-ordered transaction ids")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
     print("Running ETL process for BRONZE -- Raw Transaction Data ...")
-    etl() # process ETL
+    etl(num_transactions=args.num_transactions, stream=args.stream, chunk_size=args.chunk_size, id_scheme=args.id_scheme,
+        profile=args.profile) # process ETL
     print("Data Load to `retail_bronze.transactions_src_raw` completed")
     exit()
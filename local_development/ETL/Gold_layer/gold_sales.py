@@ -0,0 +1,171 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import duckdb
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.partitions import changed_partitions, current_snapshot_id, overwrite_partition
+from utils.watermarks import get_watermark, set_watermark
+from utils.commits import run_in_transaction
+from utils.schema_registry import GOLD_TABLES, ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+# Constants
+SOURCE_TABLE = "retail_silver.transactions"
+RFM_TABLE = "retail_gold.customer_rfm"
+
+
+# =============================================================================================================
+# daily cubes: one `extract_date` partition per silver transactions partition, so a changed silver day only
+# re-aggregates that day. Each query aggregates the silver partition `$day`
+DAILY_CUBES = {
+    # sales by day, store, channel & product category
+    "retail_gold.daily_sales": f"""
+    SELECT
+        transaction_date,
+        store_id,
+        channel,
+        category,
+        count(DISTINCT transaction_id) AS transactions,
+        count(*) AS line_items,
+        sum(volume) AS units,
+        sum(txn_amount) AS revenue,
+        extract_date
+    FROM {SOURCE_TABLE}
+    WHERE extract_date = $day
+    GROUP BY ALL
+    """,
+    # spend per customer & day, from which RFM is scored
+    "retail_gold.customer_daily": f"""
+    SELECT
+        customer_id,
+        transaction_date,
+        count(DISTINCT transaction_id) AS transactions,
+        sum(volume) AS units,
+        sum(txn_amount) AS revenue,
+        max(transaction_ts) AS last_transaction_ts,
+        extract_date
+    FROM {SOURCE_TABLE}
+    WHERE extract_date = $day
+    GROUP BY ALL
+    """,
+}
+
+# recency, frequency & monetary value per customer, scored 1 (worst) to 5 (best) against all customers
+CUSTOMER_RFM_QUERY = """
+WITH rfm AS (
+    SELECT
+        customer_id,
+        max(last_transaction_ts) AS last_transaction_ts,
+        (SELECT max(transaction_date) FROM retail_gold.customer_daily) - max(transaction_date) AS recency_days,
+        sum(transactions) AS frequency,
+        sum(revenue) AS monetary
+    FROM retail_gold.customer_daily
+    GROUP BY customer_id
+)
+SELECT
+    *,
+    ntile(5) OVER (ORDER BY recency_days DESC) AS recency_score,
+    ntile(5) OVER (ORDER BY frequency) AS frequency_score,
+    ntile(5) OVER (ORDER BY monetary) AS monetary_score
+FROM rfm
+"""
+
+
+def refresh_daily_cube(con: duckdb.DuckDBPyConnection, table: str, query: str) -> dict:
+    """Re-aggregate the partitions of a daily cube whose silver transactions changed since its watermark.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        table (str): Cube table, as `schema.table`
+        query (str): Aggregation of the silver partition `$day`, ending in an `extract_date` column
+
+    Returns:
+        dict: Days refreshed, rows written, and elapsed seconds
+    """
+    t0 = time.perf_counter()
+    snapshot_id = current_snapshot_id(con)
+    watermark = get_watermark(con, table, SOURCE_TABLE)
+    days = changed_partitions(con, SOURCE_TABLE, watermark["snapshot_id"] if watermark else -1)
+    stats = {"table": table, "days": days, "rows_written": 0}
+
+    # create the table if not exists (or add columns new to the registry), before its first load
+    ensure_tables(con, [table], GOLD_TABLES)
+
+    for day in days:
+        with metrics.stage("aggregate") as aggregate_stage:
+            cube_tbl = con.execute(query, {"day": day}).arrow()
+            aggregate_stage["rows"] = cube_tbl.num_rows
+
+        stats["rows_written"] += overwrite_partition(con, table, cube_tbl, day)["rows_written"]
+
+    latest = max(days + ([watermark["extract_date"]] if watermark else []), default=None)
+    run_in_transaction(con, lambda con: set_watermark(con, table, SOURCE_TABLE, latest, snapshot_id))
+    return {**stats, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def refresh_customer_rfm(con: duckdb.DuckDBPyConnection) -> dict:
+    """Re-score `retail_gold.customer_rfm` from `retail_gold.customer_daily`.
+
+    Recency is relative to the latest day, so every score can move when any day changes. Scoring reads
+    the (customer x day) cube rather than line items, so a full rebuild stays cheap.
+
+    Returns:
+        dict: Rows written and elapsed seconds
+    """
+    t0 = time.perf_counter()
+    with metrics.stage("score") as score_stage:
+        rows_written = con.execute(f"CREATE OR REPLACE TABLE {RFM_TABLE} AS {CUSTOMER_RFM_QUERY}").fetchone()[0]
+        score_stage["rows"] = rows_written
+    return {"table": RFM_TABLE, "rows_written": rows_written, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def refresh_gold(con: duckdb.DuckDBPyConnection) -> dict:
+    """Refresh every daily cube from changed silver partitions, then re-score RFM if customer spend changed.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+
+    Returns:
+        dict: Refresh stats per gold table
+    """
+    results = {}
+    for table, query in DAILY_CUBES.items():
+        with metrics.job(table):
+            results[table] = refresh_daily_cube(con, table, query)
+
+    if results["retail_gold.customer_daily"]["days"]:
+        with metrics.job(RFM_TABLE):
+            results[RFM_TABLE] = refresh_customer_rfm(con)
+    return results
+
+
+def etl(profile: str = DEFAULT_PROFILE):
+    """
+    Process the ETL stage of refreshing the gold layer sales cubes from the silver layer, writing with
+    `profile` (see `utils.write_profiles`).
+    Automatically manages connection context to ensure clean closure.
+    """
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con:
+        for table, stats in refresh_gold(con).items():
+            print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the gold sales cubes from new silver partitions")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    print("Running ETL process for GOLD -- Sales Cubes ...")
+    etl(args.profile) # process ETL
+    print("Data Load to `retail_gold` completed")
+    exit()
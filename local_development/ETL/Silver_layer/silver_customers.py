@@ -0,0 +1,190 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import duckdb
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.partitions import changed_partitions, current_snapshot_id
+from utils.watermarks import get_watermark, set_watermark
+from utils.commits import run_in_transaction
+from utils.schema_registry import SILVER_TABLES, ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+# Constants
+SILVER_TABLE = "retail_silver.customers"
+# bronze source per customer load mode (see `Bronze_layer/source_customer_data.py`)
+SOURCES = {
+    "snapshot": "retail_bronze.customer_src_raw",
+    "cdc": "retail_bronze.customer_cdc_raw",
+}
+# cleaned & typed silver columns, as expressions over a bronze row
+CLEAN_COLUMNS = {
+    "customer_id": "CAST(customerID AS BIGINT)",
+    "first_name": "trim(firstName)",
+    "last_name": "trim(lastName)",
+    "rewards_member": "CAST(rewardsMember AS BOOLEAN)",
+    "email_address": "lower(trim(emailAddress))",
+    "postcode": "upper(trim(postcode))",
+    "profession": "trim(profession)",
+    "dob": "CAST(dob AS DATE)",
+    "customer_joined": "CAST(customerJoined AS TIMESTAMP)",
+}
+
+
+# =============================================================================================================
+# SCD2: every change to a customer closes its current version (`valid_to` = the day of the change, exclusive)
+# and opens a new one from that day, so the customer's state on any day can be looked up
+def _stage_day(con: duckdb.DuckDBPyConnection, source: str, day: str):
+    """Clean, type & deduplicate one bronze partition, as an Arrow table with a row hash & operation.
+
+    A customer listed more than once in a day keeps one row, picked by operation ("D" last, after "I" & "U")
+    and then row hash, so every run (and every replay after a rewind) keeps the same one, whatever order
+    the rows were read in.
+    """
+    cleaned = ",\n            ".join(f"{expr} AS {name}" for name, expr in CLEAN_COLUMNS.items())
+    row_hash = "md5(CAST({" + ", ".join(f"'{name}': {name}" for name in CLEAN_COLUMNS) + "} AS VARCHAR))"
+    operation = "operation" if source == "cdc" else "'U'"  # a snapshot row upserts the customer
+    return con.execute(f"""
+    SELECT *
+    FROM (
+        SELECT *, {row_hash} AS row_hash
+        FROM (
+            SELECT
+            {cleaned},
+            {operation} AS operation
+            FROM {SOURCES[source]}
+            WHERE extract_date = ? AND customerID IS NOT NULL
+        )
+    )
+    QUALIFY row_number() OVER (PARTITION BY customer_id ORDER BY operation = 'D', operation, row_hash) = 1
+    """, [day]).arrow()
+
+
+def _rewind(con: duckdb.DuckDBPyConnection, day: datetime.date) -> int:
+    """Undo every change applied from `day` onwards, so days from `day` can be (re)applied in order."""
+    con.execute(f"DELETE FROM {SILVER_TABLE} WHERE valid_from >= ?", [day])
+    # each customer has at most one version left spanning `day`, which becomes current again
+    return con.execute(
+        f"UPDATE {SILVER_TABLE} SET valid_to = NULL, is_current = true WHERE valid_to >= ?", [day]
+    ).fetchone()[0]
+
+
+def _apply_day(con: duckdb.DuckDBPyConnection, source: str, day: str) -> tuple:
+    """Apply one bronze partition to the SCD2 table, returning the number of versions closed & opened."""
+    valid_from = datetime.date.fromisoformat(day)
+    con.register("customer_stage", _stage_day(con, source, day))
+
+    # a snapshot lists every customer, so a missing customer has gone. CDC only lists the changes
+    close_missing = "true" if source == "snapshot" else "false"
+    closed = con.execute(f"""
+    UPDATE {SILVER_TABLE} AS s
+    SET valid_to = ?, is_current = false
+    FROM (
+        SELECT cur.customer_id
+        FROM {SILVER_TABLE} AS cur
+        LEFT JOIN customer_stage AS c USING (customer_id)
+        WHERE cur.is_current
+        AND ((c.customer_id IS NULL AND {close_missing}) OR c.operation = 'D' OR c.row_hash <> cur.row_hash)
+    ) AS closing
+    WHERE s.customer_id = closing.customer_id AND s.is_current
+    """, [valid_from]).fetchone()[0]
+
+    # open a version for every customer left without a current one (new, or just closed above)
+    opened = con.execute(f"""
+    INSERT INTO {SILVER_TABLE} BY NAME
+    SELECT c.* EXCLUDE (operation), ? AS valid_from, NULL AS valid_to, true AS is_current
+    FROM customer_stage AS c
+    ANTI JOIN (SELECT customer_id FROM {SILVER_TABLE} WHERE is_current) AS s USING (customer_id)
+    WHERE c.operation <> 'D'
+    """, [valid_from]).fetchone()[0]
+
+    con.unregister("customer_stage")
+    return closed, opened
+
+
+def build_customers(con: duckdb.DuckDBPyConnection, source: str = "snapshot") -> dict:
+    """Apply new bronze customer partitions to the SCD2 table `retail_silver.customers`.
+
+    Only partitions changed since the stored watermark (a bronze snapshot id) are read. If a changed
+    partition is older than the latest one applied (a late or re-delivered day), the table is rewound to
+    that day and every day from it is replayed, so versions are always applied in date order. The
+    changes and the new watermark are committed in one transaction, so a failed run can simply be rerun,
+    and one that conflicts with another writer is retried (see `utils.commits.run_in_transaction`).
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        source (str): Bronze customer load mode to read from, "snapshot" or "cdc"
+
+    Returns:
+        dict: Days applied, versions closed & opened, and elapsed seconds
+    """
+    t0 = time.perf_counter()
+    source_table = SOURCES[source]
+    snapshot_id = current_snapshot_id(con)
+    watermark = get_watermark(con, SILVER_TABLE, source_table)
+    changed = changed_partitions(con, source_table, watermark["snapshot_id"] if watermark else -1)
+    stats = {"table": SILVER_TABLE, "source": source_table, "days": [], "closed": 0, "opened": 0}
+    if not changed:
+        print(f"`{SILVER_TABLE}`: no new partitions in `{source_table}`")
+        return {**stats, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+    # create the table if not exists (cleaned columns, plus the row hash & validity range), as registered
+    ensure_tables(con, [SILVER_TABLE], SILVER_TABLES)
+
+    stats["days"] = [row[0] for row in con.execute(
+        f"SELECT DISTINCT extract_date FROM {source_table} WHERE extract_date >= ? ORDER BY extract_date",
+        [changed[0]]
+    ).fetchall()]
+
+    def apply_changes(con: duckdb.DuckDBPyConnection) -> tuple:
+        # run from the start on every attempt, so the counts only cover the attempt that commits
+        closed_total, opened_total = 0, 0
+        if watermark is None or changed[0] <= watermark["extract_date"]:
+            with metrics.stage("rewind") as rewind_stage:
+                rewind_stage["rows"] = _rewind(con, datetime.date.fromisoformat(changed[0]))
+        for day in stats["days"]:
+            with metrics.stage("apply") as apply_stage:
+                closed, opened = _apply_day(con, source, day)
+                apply_stage["rows"] = closed + opened
+            closed_total += closed
+            opened_total += opened
+        latest = max(stats["days"] + ([watermark["extract_date"]] if watermark else []), default=changed[-1])
+        set_watermark(con, SILVER_TABLE, source_table, latest, snapshot_id)
+        return closed_total, opened_total
+
+    stats["closed"], stats["opened"] = run_in_transaction(con, apply_changes)
+    return {**stats, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def etl(source: str = "snapshot", profile: str = DEFAULT_PROFILE):
+    """
+    Process the ETL stage of building the silver customer SCD2 table from the bronze layer, writing with
+    `profile` (see `utils.write_profiles`).
+    Automatically manages connection context to ensure clean closure.
+    """
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con, metrics.job("silver.customers"):
+        stats = build_customers(con, source)
+        print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the silver customer SCD2 table from new bronze partitions")
+    parser.add_argument("--source", choices=list(SOURCES), default="snapshot",
+                        help="bronze customer load mode to read from")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    print("Running ETL process for SILVER -- Customers ...")
+    etl(args.source, args.profile) # process ETL
+    print(f"Data Load to `{SILVER_TABLE}` completed")
+    exit()
@@ -0,0 +1,132 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import duckdb
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.partitions import changed_partitions, current_snapshot_id, overwrite_partition
+from utils.watermarks import get_watermark, set_watermark
+from utils.commits import run_in_transaction
+from utils.schema_registry import SILVER_TABLES, ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+# Constants
+SILVER_TABLE = "retail_silver.transactions"
+TRANSACTIONS_SOURCE = "retail_bronze.transactions_src_raw"
+PRODUCTS_SOURCE = "retail_bronze.products_src_raw"
+
+
+# =============================================================================================================
+# cleaned, typed & deduplicated line items for one bronze partition, joined to the product catalog as it
+# stood on that day (or the latest catalog before it, should that day's be missing)
+SILVER_TRANSACTIONS_QUERY = f"""
+WITH products AS (
+    SELECT product_id, product_name, category
+    FROM {PRODUCTS_SOURCE}
+    WHERE extract_date = (SELECT max(extract_date) FROM {PRODUCTS_SOURCE} WHERE extract_date <= $day)
+)
+SELECT
+    t.transaction_id,
+    CAST(t.customerID AS BIGINT) AS customer_id,
+    CAST(t.transaction_TS AS TIMESTAMP) AS transaction_ts,
+    CAST(t.transaction_TS AS DATE) AS transaction_date,
+    p.product_id,
+    trim(t.Product) AS product_name,
+    coalesce(p.category, 'Unknown') AS category,
+    CAST(t.volume AS INTEGER) AS volume,
+    t.channel,
+    CAST(t.store_id AS INTEGER) AS store_id,
+    CAST(t.Price AS DECIMAL(10, 2)) AS unit_price,
+    CAST(t.txn_amount AS DECIMAL(12, 2)) AS txn_amount,
+    t.extract_date
+FROM {TRANSACTIONS_SOURCE} AS t
+LEFT JOIN products AS p ON p.product_name = trim(t.Product)
+WHERE t.extract_date = $day AND t.transaction_id IS NOT NULL AND t.volume > 0
+QUALIFY row_number() OVER (PARTITION BY t.transaction_id, t.Product ORDER BY t.transaction_TS) = 1
+"""
+
+
+def build_transactions(con: duckdb.DuckDBPyConnection) -> dict:
+    """Rebuild the partitions of `retail_silver.transactions` whose bronze inputs changed since the last run.
+
+    A day is rebuilt if its bronze transactions partition, or that day's product catalog, changed after
+    the stored watermarks (bronze snapshot ids). Each day replaces its silver partition in a single
+    transaction, and the watermarks only move on once every day is written, so a failed run can
+    simply be rerun.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+
+    Returns:
+        dict: Days rebuilt, rows written, and elapsed seconds
+    """
+    t0 = time.perf_counter()
+    snapshot_id = current_snapshot_id(con)
+    watermarks = {source: get_watermark(con, SILVER_TABLE, source) for source in (TRANSACTIONS_SOURCE, PRODUCTS_SOURCE)}
+    changed = {
+        source: changed_partitions(con, source, watermark["snapshot_id"] if watermark else -1)
+        for source, watermark in watermarks.items()
+    }
+
+    # a changed catalog only matters for days that have transactions
+    days = set(changed[TRANSACTIONS_SOURCE])
+    if changed[PRODUCTS_SOURCE]:
+        days |= {row[0] for row in con.execute(
+            f"SELECT DISTINCT extract_date FROM {TRANSACTIONS_SOURCE} WHERE list_contains(?, extract_date)",
+            [changed[PRODUCTS_SOURCE]]
+        ).fetchall()}
+    stats = {"table": SILVER_TABLE, "days": sorted(days), "rows_written": 0}
+    if not days:
+        print(f"`{SILVER_TABLE}`: no new partitions in `{TRANSACTIONS_SOURCE}` or `{PRODUCTS_SOURCE}`")
+
+    # create the table if not exists (or add columns new to the registry), before its first load
+    ensure_tables(con, [SILVER_TABLE], SILVER_TABLES)
+
+    for day in stats["days"]:
+        with metrics.stage("transform") as transform_stage:
+            txns_tbl = con.execute(SILVER_TRANSACTIONS_QUERY, {"day": day}).arrow()
+            transform_stage["rows"] = txns_tbl.num_rows
+
+        stats["rows_written"] += overwrite_partition(con, SILVER_TABLE, txns_tbl, day)["rows_written"]
+
+    # move each watermark on, even when nothing changed, so the next run only looks at newer snapshots.
+    # Both are replaced in one transaction, so a failure never leaves a source without its watermark
+    def move_watermarks(con: duckdb.DuckDBPyConnection):
+        for source, watermark in watermarks.items():
+            latest = max(changed[source] + ([watermark["extract_date"]] if watermark else []), default=None)
+            set_watermark(con, SILVER_TABLE, source, latest, snapshot_id)
+
+    run_in_transaction(con, move_watermarks)
+
+    return {**stats, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def etl(profile: str = DEFAULT_PROFILE):
+    """
+    Process the ETL stage of building the silver transactions table from the bronze layer, writing with
+    `profile` (see `utils.write_profiles`).
+    Automatically manages connection context to ensure clean closure.
+    """
+    # cursor on the process-wide DuckLake session, closed on exit of the `with` block
+    print("connecting to ducklake ...")
+    with get_session(profile).cursor() as con, metrics.job("silver.transactions"):
+        stats = build_transactions(con)
+        print(f"Data loaded: {stats}")
+        metrics.write_to_ducklake(con)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the silver transactions table from new bronze partitions")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    print("Running ETL process for SILVER -- Transactions ...")
+    etl(args.profile) # process ETL
+    print(f"Data Load to `{SILVER_TABLE}` completed")
+    exit()
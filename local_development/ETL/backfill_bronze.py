@@ -0,0 +1,202 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import functools
+import itertools
+import multiprocessing
+import threading
+import duckdb
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# make the bronze loaders importable (they in turn make the shared `utils` package importable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Bronze_layer"))
+import source_customer_data
+import source_product_data
+import source_store_data
+import source_transaction_data
+from utils.partitions import overwrite_partition, overwrite_partitions
+from utils.commits import contention_stats
+from utils.schema_registry import ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES
+
+
+# bronze table name & per-day generator of each backfilled source (the tables themselves are defined in
+# `utils.schema_registry.BRONZE_TABLES`). Every generator is seeded from the day it is given, so a
+# partition is identical whichever process generates it and in whatever order.
+BACKFILL_SOURCES = {
+    "customers": ("retail_bronze.customer_src_raw", source_customer_data.get_raw_customer_data),
+    "products": ("retail_bronze.products_src_raw", source_product_data.get_raw_product_data),
+    "stores": ("retail_bronze.stores_src_raw", source_store_data.get_raw_store_data),
+    "transactions": ("retail_bronze.transactions_src_raw", source_transaction_data.get_raw_transaction_data),
+}
+
+_writer_state = threading.local()
+_writer_cursors = []
+
+
+def date_range(start: datetime.date, end: datetime.date) -> list:
+    """All days from `start` to `end`, inclusive."""
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _writer_connection() -> duckdb.DuckDBPyConnection:
+    """Cursor on the shared DuckLake session owned by the calling writer thread, opened on first use."""
+    if not hasattr(_writer_state, "con"):
+        _writer_state.con = get_session().cursor()
+        _writer_cursors.append(_writer_state.con)
+    return _writer_state.con
+
+
+def write_partition(table: str, df, dt: datetime.date) -> int:
+    """Replace the `extract_date` partition for `dt` of a bronze table with `df`, in one transaction.
+
+    Args:
+        table (str): Fully qualified bronze table name
+        df: Partition data (pandas DataFrame or Arrow table), including the `extract_date` column
+        dt (datetime.date): Day of the partition
+
+    Returns:
+        int: Number of rows written
+    """
+    con = _writer_connection()
+    ensure_tables(con, [table])  # a no-op once `backfill` has ensured every table
+    return overwrite_partition(con, table, df, f"{dt:%Y-%m-%d}")["rows_written"]
+
+
+def write_day(writes: dict, dt: datetime.date) -> dict:
+    """Replace the `extract_date` partition for `dt` of several bronze tables, in one transaction.
+
+    Args:
+        writes (dict): Partition data per fully qualified bronze table name
+        dt (datetime.date): Day of the partitions
+
+    Returns:
+        dict: Number of rows written per table
+    """
+    stats = overwrite_partitions(_writer_connection(), [(table, df, f"{dt:%Y-%m-%d}") for table, df in writes.items()])
+    return {part["table"]: part["rows_written"] for part in stats}
+
+
+def backfill(
+    start: datetime.date,
+    end: datetime.date,
+    tables: list = list(BACKFILL_SOURCES),
+    workers: int = os.cpu_count(),
+    writers: int = 1,
+    num_transactions: int = 5_000,
+    profile: str = "backfill",
+    group_commit: bool = False,
+    max_in_flight: Optional[int] = None
+) -> dict:
+    """Generate and load bronze partitions for every day from `start` to `end` (inclusive).
+
+    Partitions are generated in parallel across a process pool, and committed to DuckLake as they
+    complete by a pool of `writers` threads, each holding its own cursor on the shared session. Commits
+    that conflict with another writer are retried with backoff (see `utils.commits`). With `group_commit`,
+    a day is written once all of its tables are generated, in a single transaction, so concurrent writers
+    take a turn on the catalog per day rather than per table.
+
+    At most `max_in_flight` partitions are held at a time, from submission to their generator until they
+    are written, so memory stays bounded however long the range is: a new partition is only submitted
+    once an earlier one has been written, and each one is dropped as soon as it is.
+
+    Args:
+        start (datetime.date): First day to backfill
+        end (datetime.date): Last day to backfill
+        tables (list): Keys of `BACKFILL_SOURCES` to backfill
+        workers (int): Number of generator processes
+        writers (int): Number of concurrent DuckLake writers
+        num_transactions (int): Number of transactions to generate per day
+        profile (str): Write profile of the session (see `utils.write_profiles`)
+        group_commit (bool): Commit every table of a day in one transaction
+        max_in_flight (Optional[int]): Partitions generated or waiting to be written at a time (defaults
+            to two per generator & writer, and at least one day of every table with `group_commit`)
+
+    Returns:
+        dict: Rows written per table
+    """
+    generators = {name: BACKFILL_SOURCES[name][1] for name in tables}
+    if "transactions" in generators:
+        generators["transactions"] = functools.partial(generators["transactions"], num_transactions=num_transactions)
+    max_in_flight = max_in_flight or 2 * (workers + writers)
+    if group_commit:
+        max_in_flight = max(max_in_flight, len(tables))  # a day is only written once all its tables are generated
+
+    # create or evolve every table up front, in one catalog query, rather than per partition
+    with get_session(profile).cursor() as con:
+        ensure_tables(con, [BACKFILL_SOURCES[name][0] for name in tables])
+
+    rows_written = {name: 0 for name in tables}
+    todo = iter([(name, dt) for dt in date_range(start, end) for name in tables])
+    generating, writing, pending_days = {}, {}, {}
+    in_flight = 0
+    # generator processes are spawned rather than forked: the session is already running DuckDB threads,
+    # whose locks a forked child could inherit while held
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as gen_pool, ThreadPoolExecutor(max_workers=writers) as write_pool:
+        while True:
+            for name, dt in itertools.islice(todo, max(max_in_flight - in_flight, 0)):
+                generating[gen_pool.submit(generators[name], dt)] = (name, dt)
+                in_flight += 1
+            if not generating and not writing:
+                break
+
+            done, _ = wait(list(generating) + list(writing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in writing:
+                    names = writing.pop(future)
+                    result = future.result()
+                    for name in names:
+                        rows_written[name] += result[BACKFILL_SOURCES[name][0]] if group_commit else result
+                    in_flight -= len(names)
+                    continue
+
+                name, dt = generating.pop(future)
+                if not group_commit:
+                    writing[write_pool.submit(write_partition, BACKFILL_SOURCES[name][0], future.result(), dt)] = [name]
+                    continue
+                day = pending_days.setdefault(dt, {})
+                day[name] = future.result()
+                if len(day) == len(tables):
+                    writes = {BACKFILL_SOURCES[day_name][0]: data for day_name, data in pending_days.pop(dt).items()}
+                    writing[write_pool.submit(write_day, writes, dt)] = list(tables)
+            del done, future  # the last partition written is not held on to while waiting for the next
+
+    # close every writer cursor (the session itself stays open for the rest of the process)
+    for con in _writer_cursors:
+        con.close()
+    _writer_cursors.clear()
+    return rows_written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the bronze layer over a range of extract dates")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, required=True, help="last day (inclusive), YYYY-MM-DD")
+    parser.add_argument("--tables", nargs="+", choices=list(BACKFILL_SOURCES), default=list(BACKFILL_SOURCES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of generator processes")
+    parser.add_argument("--writers", type=int, default=1, help="number of concurrent DuckLake writers")
+    parser.add_argument("--num-transactions", type=int, default=5_000, help="transactions generated per day")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default="backfill",
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    parser.add_argument("--group-commit", action="store_true", help="commit every table of a day in one transaction")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="partitions generated or waiting to be written at a time")
+    args = parser.parse_args()
+
+    print(f"Backfilling BRONZE from {args.start} to {args.end} ...")
+    t0 = time.perf_counter()
+    rows = backfill(
+        args.start, args.end, args.tables, args.workers, args.writers, args.num_transactions, args.profile, args.group_commit,
+        args.max_in_flight
+    )
+    for name, n in rows.items():
+        print(f"{BACKFILL_SOURCES[name][0]}: {n:,} rows")
+    contention = contention_stats()
+    print(f"Commits: {contention['commits']:,} in {contention['attempts']:,} attempts, "
+          f"{contention['conflicts']:,} conflicts, {contention['backoff_s']:.1f}s backing off")
+    print(f"Backfill completed in {time.perf_counter() - t0:.1f}s")
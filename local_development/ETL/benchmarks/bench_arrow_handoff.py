@@ -0,0 +1,75 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import generate_transactions
+from utils.data_sourcing.customers import generate_base_customers
+
+
+def object_frame(tbl: pa.Table) -> pd.DataFrame:
+    """The same rows as the loaders used to register them: a pandas frame of Python objects.
+
+    Strings, dates & UUIDs become one Python object per value, nullable integers an object column holding
+    None, and decimals floats. Timestamps stay `datetime64`, as they were before.
+    """
+    columns = {}
+    for field, column in zip(tbl.schema, tbl.columns):
+        if pa.types.is_decimal(field.type):
+            columns[field.name] = column.cast(pa.float64()).to_numpy()
+        elif pa.types.is_timestamp(field.type):
+            columns[field.name] = column.to_numpy()
+        elif pa.types.is_integer(field.type) and column.null_count == 0:
+            columns[field.name] = column.to_numpy()
+        else:
+            values = column.to_pylist()
+            if isinstance(field.type, pa.UuidType):
+                values = [str(value) for value in values]
+            columns[field.name] = np.array(values, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def time_insert(data, schema: pa.Schema, repeats: int) -> float:
+    """Best seconds to register `data` with DuckDB and insert it into a table of `schema`, as the loaders do."""
+    best = float("inf")
+    for _ in range(repeats):
+        con = duckdb.connect()
+        con.register("schema_tbl", schema.empty_table())
+        con.execute("CREATE TABLE target AS SELECT * FROM schema_tbl")
+        t0 = time.perf_counter()
+        con.register("src", data)
+        con.execute("INSERT INTO target SELECT * FROM src")
+        best = min(best, time.perf_counter() - t0)
+        con.close()
+    return best
+
+
+def main(num_transactions: int, num_customers: int, repeats: int):
+    start = datetime.date(2025, 1, 1)
+    tables = {
+        "transactions": generate_transactions(start, start + datetime.timedelta(days=1), num_transactions, as_arrow=True),
+        "customers": generate_base_customers(seed=101, num_customers=num_customers, as_arrow=True),
+    }
+
+    print(f"{'table':<14} {'rows':>10} {'object frame (s)':>17} {'arrow (s)':>10} {'speed-up':>9}")
+    for name, tbl in tables.items():
+        pandas_s = time_insert(object_frame(tbl), tbl.schema, repeats)
+        arrow_s = time_insert(tbl, tbl.schema, repeats)
+        print(f"{name:<14} {tbl.num_rows:>10,} {pandas_s:>17.3f} {arrow_s:>10.3f} {pandas_s / arrow_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark registering & inserting pandas object frames vs Arrow tables")
+    parser.add_argument("--num-transactions", type=int, default=350_000, help="transactions to generate (~3 line items each)")
+    parser.add_argument("--num-customers", type=int, default=1_000_000, help="customers to generate")
+    parser.add_argument("--repeats", type=int, default=3, help="timed inserts per path")
+    args = parser.parse_args()
+    main(args.num_transactions, args.num_customers, args.repeats)
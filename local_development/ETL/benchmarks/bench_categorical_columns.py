@@ -0,0 +1,55 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import duckdb
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import generate_transactions
+from utils.partitions import as_arrow
+
+CATEGORICAL_COLUMNS = ["Product", "channel"]
+
+
+def memory_mb(df, columns: list = None) -> float:
+    """Deep memory usage of `df` (or of `columns` only), in MB."""
+    return (df[columns] if columns else df).memory_usage(deep=True, index=False).sum() / 1024 ** 2
+
+
+def time_load(df, repeats: int) -> float:
+    """Best seconds to register `df` with DuckDB and copy it into a table, as the bronze loaders do."""
+    best = float("inf")
+    for _ in range(repeats):
+        con = duckdb.connect()
+        t0 = time.perf_counter()
+        con.register("txns_df", as_arrow(df))
+        con.execute("CREATE TABLE txns AS SELECT * FROM txns_df")
+        best = min(best, time.perf_counter() - t0)
+        con.close()
+    return best
+
+
+def main(num_transactions: int, repeats: int):
+    start = datetime.date(2025, 1, 1)
+    categorical = generate_transactions(start, start + datetime.timedelta(days=1), num_transactions)
+    strings = categorical.astype({column: object for column in CATEGORICAL_COLUMNS})  # one str object per row
+    per_million = 1_000_000 / len(categorical)
+
+    print(f"{len(categorical):,} line items")
+    print(f"{'encoding':<12} {'columns MB/1M rows':>19} {'frame MB/1M rows':>17} {'load (s)':>10}")
+    for label, df in (("str objects", strings), ("categorical", categorical)):
+        print(
+            f"{label:<12} {memory_mb(df, CATEGORICAL_COLUMNS) * per_million:>19.1f} "
+            f"{memory_mb(df) * per_million:>17.1f} {time_load(df, repeats):>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory & load time of categorical vs string columns")
+    parser.add_argument("--num-transactions", type=int, default=350_000, help="transactions to generate (~3 line items each)")
+    parser.add_argument("--repeats", type=int, default=3, help="timed loads per encoding")
+    args = parser.parse_args()
+    main(args.num_transactions, args.repeats)
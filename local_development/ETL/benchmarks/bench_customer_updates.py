@@ -0,0 +1,71 @@
+# imports
+import sys
+import os
+import time
+import random
+import argparse
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.customers import PROFESSIONS, generate_base_customers, bulk_update_customers
+
+
+def legacy_update_customers(df: pd.DataFrame, update_rate: float = 0.05, seed: int = None) -> pd.DataFrame:
+    """The original per-customer update loop: a full column scan plus three `.at` writes per update."""
+    fake = Faker('en_GB')
+    if seed is not None:
+        Faker.seed(seed)
+        random.seed(seed)
+
+    df_updated = df.copy()
+    num_to_update = int(len(df) * update_rate)
+    update_ids = random.sample(list(df['customerID']), num_to_update)
+
+    for cid in update_ids:
+        idx = df_updated[df_updated['customerID'] == cid].index[0]
+        df_updated.at[idx, 'profession'] = random.choice(PROFESSIONS)
+        df_updated.at[idx, 'postcode'] = fake.postcode()
+        df_updated.at[idx, 'emailAddress'] = fake.email()
+
+    return df_updated
+
+
+def scale_customers(base_df: pd.DataFrame, num_customers: int) -> pd.DataFrame:
+    """Tile a Faker-generated base up to `num_customers` rows with unique ids (Faker at 1M rows is too slow)."""
+    reps = -(-num_customers // len(base_df))
+    df = pd.concat([base_df] * reps, ignore_index=True).iloc[:num_customers].copy()
+    df['customerID'] = np.arange(10000, 10000 + num_customers)
+    return df
+
+
+def main(sizes: list, update_rate: float, legacy_max: int):
+    base_df = generate_base_customers(seed=101, num_customers=10_000)
+
+    print(f"{'customers':>12} {'path':>8} {'seconds':>10} {'updates/s':>12}")
+    for n in sizes:
+        df = scale_customers(base_df, n)
+        num_updates = int(n * update_rate)
+
+        t0 = time.perf_counter()
+        _, changed = bulk_update_customers(df, update_rate=update_rate, seed=1)
+        seconds = time.perf_counter() - t0
+        assert len(changed) == num_updates
+        print(f"{n:>12,} {'bulk':>8} {seconds:>10.3f} {num_updates / seconds:>12,.0f}")
+
+        if n <= legacy_max:
+            t0 = time.perf_counter()
+            legacy_update_customers(df, update_rate=update_rate, seed=1)
+            seconds = time.perf_counter() - t0
+            print(f"{n:>12,} {'legacy':>8} {seconds:>10.3f} {num_updates / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs bulk customer updates")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--update-rate", type=float, default=0.05)
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="largest size to run the per-row loop at")
+    args = parser.parse_args()
+    main(args.sizes, args.update_rate, args.legacy_max)
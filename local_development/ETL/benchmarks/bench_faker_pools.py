@@ -0,0 +1,42 @@
+# imports
+import sys
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing import pools
+from utils.data_sourcing.customers import generate_base_customers
+
+
+def timed_generation(num_customers: int) -> float:
+    """Seconds to generate `num_customers` base customers, starting from an empty in-process pool cache."""
+    pools.get_pool.cache_clear()
+    t0 = time.perf_counter()
+    generate_base_customers(seed=101, num_customers=num_customers)
+    return time.perf_counter() - t0
+
+
+def main(sizes: list):
+    # point the pool cache at a scratch directory, so the first run is genuinely cold
+    cache_dir = tempfile.mkdtemp(prefix="faker_pools_")
+    pools.POOL_CACHE_DIR = cache_dir
+    try:
+        print(f"{'customers':>12} {'cold (s)':>10} {'warm (s)':>10}")
+        for n in sizes:
+            shutil.rmtree(cache_dir)
+            cold = timed_generation(n)   # builds every pool with Faker, then writes it to disk
+            warm = timed_generation(n)   # reads every pool back from disk
+            print(f"{n:>12,} {cold:>10.3f} {warm:>10.3f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm (cached pool) customer generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    main(args.sizes)
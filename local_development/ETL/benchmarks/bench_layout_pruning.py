@@ -0,0 +1,95 @@
+# imports
+import sys
+import os
+import time
+import shutil
+import argparse
+import datetime
+import tempfile
+import statistics
+import duckdb
+
+# make the bronze loaders importable (they in turn make the shared `utils` package importable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bronze_layer"))
+import source_customer_data
+import source_transaction_data
+from utils.layout import TABLE_LAYOUTS, DEFAULT_ROW_GROUP_SIZE, order_by_clause
+
+# point lookups, as (table, generator, WHERE clause, pruning column & value range as (min, max))
+LOOKUPS = {
+    "one customer's history": (
+        "retail_bronze.customer_src_raw", "customers", "customerID = 15000", ("customerID", 15000, 15000)
+    ),
+    "one store's transactions": (
+        "retail_bronze.transactions_src_raw", "transactions", "store_id = 3", ("store_id", 3, 3)
+    ),
+}
+
+
+def write_partitions(con: duckdb.DuckDBPyConnection, path: str, frames: dict, table: str, layout: bool) -> list:
+    """Write one Parquet file per day, in generation order or in the table's configured layout."""
+    os.makedirs(path, exist_ok=True)
+    order_by = order_by_clause(table) if layout else ""
+    row_group_size = TABLE_LAYOUTS[table]["row_group_size"] if layout else DEFAULT_ROW_GROUP_SIZE
+    files = []
+    for day, df in frames.items():
+        file = os.path.join(path, f"{day}.parquet")
+        con.register("day_df", df)
+        con.execute(f"COPY (SELECT * FROM day_df {order_by}) TO '{file}' (FORMAT parquet, ROW_GROUP_SIZE {row_group_size})")
+        con.unregister("day_df")
+        files.append(file)
+    return files
+
+
+def pruning(con: duckdb.DuckDBPyConnection, files: list, column: str, low, high) -> tuple:
+    """Row groups in `files`, and how many min/max statistics rule out for `low <= column <= high`."""
+    return con.execute("""
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE TRY_CAST(stats_max_value AS BIGINT) < ? OR TRY_CAST(stats_min_value AS BIGINT) > ?)
+    FROM parquet_metadata(?)
+    WHERE path_in_schema = ?
+    """, [low, high, files, column]).fetchone()
+
+
+def time_query(con: duckdb.DuckDBPyConnection, files: list, where: str, repeats: int) -> float:
+    """Median seconds to run the lookup over `files`."""
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        con.execute(f"SELECT * FROM read_parquet(?) WHERE {where}", [files]).fetchall()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main(days: int, num_transactions: int, repeats: int):
+    start = datetime.date(2025, 1, 1)
+    dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    frames = {
+        "customers": {dt: source_customer_data.get_raw_customer_data(dt) for dt in dates},
+        "transactions": {dt: source_transaction_data.get_raw_transaction_data(dt, num_transactions) for dt in dates},
+    }
+
+    con = duckdb.connect()
+    work_dir = tempfile.mkdtemp(prefix="layout_bench_")
+    try:
+        print(f"{'lookup':<26} {'layout':<10} {'row groups':>11} {'skipped':>9} {'pruned':>8} {'median (s)':>11}")
+        for name, (table, source, where, (column, low, high)) in LOOKUPS.items():
+            for layout in (False, True):
+                label = "sorted" if layout else "unsorted"
+                files = write_partitions(con, os.path.join(work_dir, source, label), frames[source], table, layout)
+                total, skipped = pruning(con, files, column, low, high)
+                seconds = time_query(con, files, where, repeats)
+                print(f"{name:<26} {label:<10} {total:>11,} {skipped:>9,} {skipped / total:>8.1%} {seconds:>11.4f}")
+    finally:
+        con.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark row group pruning of bronze point lookups, with & without the table layout")
+    parser.add_argument("--days", type=int, default=7, help="daily partitions to write")
+    parser.add_argument("--num-transactions", type=int, default=100_000, help="transactions generated per day")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per lookup")
+    args = parser.parse_args()
+    main(args.days, args.num_transactions, args.repeats)
@@ -0,0 +1,253 @@
+# imports
+import sys
+import os
+import json
+import shutil
+import argparse
+import datetime
+import subprocess
+import tempfile
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# make the shared `utils` package and the layer modules importable when run as a script
+ETL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ETL_DIR)
+for layer in ("Bronze_layer", "Silver_layer", "Gold_layer"):
+    sys.path.append(os.path.join(ETL_DIR, layer))
+
+# Constants
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "pipeline.jsonl")
+START_DATE = datetime.date(2025, 1, 1)  # fixed, as every generator is seeded from the day
+
+# data volume per tier. SF1 matches the daily defaults of the bronze scripts, and each tier is 10x the last
+SCALE_TIERS = {
+    "SF1": {"customers": 10_000, "transactions": 5_000, "days": 3},
+    "SF10": {"customers": 100_000, "transactions": 50_000, "days": 3},
+    "SF100": {"customers": 1_000_000, "transactions": 500_000, "days": 3},
+}
+
+# representative reads of each layer, timed after the load
+QUERIES = {
+    "bronze.day_revenue_by_store": """
+        SELECT store_id, count(*), sum(txn_amount) FROM retail_bronze.transactions_src_raw
+        WHERE extract_date = (SELECT max(extract_date) FROM retail_bronze.transactions_src_raw)
+        GROUP BY ALL
+    """,
+    "bronze.customer_history": """
+        SELECT extract_date, profession, postcode FROM retail_bronze.customer_src_raw WHERE customerID = 10042
+    """,
+    "silver.category_revenue": """
+        SELECT transaction_date, category, sum(txn_amount) FROM retail_silver.transactions GROUP BY ALL
+    """,
+    "silver.current_customers": """
+        SELECT profession, count(*) FROM retail_silver.customers WHERE is_current GROUP BY ALL
+    """,
+    "gold.top_rfm": """
+        SELECT * FROM retail_gold.customer_rfm
+        WHERE recency_score = 5 AND frequency_score = 5 ORDER BY monetary DESC LIMIT 100
+    """,
+}
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, with a `-dirty` suffix if the tree has changes."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ETL_DIR, text=True).strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain", "--", "."], cwd=ETL_DIR, text=True).strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_tier(tier: str, workdir: str, repeats: int, backend: str = "duckdb") -> list:
+    """Run the pipeline at one scale tier against a fresh local DuckLake, returning a result per step.
+
+    Run in its own process (see `main`), so peak RSS covers this tier only. The catalog is a file in
+    `workdir`, of a local `backend` ("duckdb" or "sqlite", see `utils.session.CATALOG_BACKENDS`).
+    """
+    # keep per-stage metric lines of the loaders out of the output; the harness records its own
+    os.environ["ETL_METRICS_PATH"] = os.path.join(workdir, "etl_metrics.jsonl")
+    from utils import metrics
+    from utils.session import DuckLakeSession, catalog_uri_for
+    from utils.maintenance import compact, expire_snapshots, cleanup_old_files
+    import source_customer_data
+    import source_product_data
+    import source_store_data
+    import source_transaction_data
+    import silver_customers
+    import silver_transactions
+    import gold_sales
+
+    scale = SCALE_TIERS[tier]
+    days = [START_DATE + datetime.timedelta(days=i) for i in range(scale["days"])]
+    sources = {
+        "customers": (
+            lambda dt: source_customer_data.get_raw_customer_data(dt, scale["customers"]),
+            lambda con, tbl, dt: source_customer_data.load_raw_customer_data(con, tbl, dt),
+        ),
+        "products": (source_product_data.get_raw_product_data, source_product_data.load_raw_product_data),
+        "stores": (source_store_data.get_raw_store_data, source_store_data.load_raw_store_data),
+        "transactions": (
+            lambda dt: source_transaction_data.get_raw_transaction_data(dt, scale["transactions"]),
+            source_transaction_data.load_raw_transaction_data,
+        ),
+    }
+
+    # a DuckLake with a local file as its catalog, so nothing outside `workdir` is touched
+    session = DuckLakeSession(catalog_uri=catalog_uri_for(backend, workdir), data_path=os.path.join(workdir, "data"))
+    con = session.cursor()
+    for schema in ("retail_bronze", "retail_silver", "retail_gold", "retail_ops"):
+        con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema} ;")
+
+    results = []
+
+    def record(step: str, stage: dict, rows: int, throughput: bool = True):
+        results.append({
+            "step": step,
+            "rows": rows,
+            "wall_s": round(stage["wall_s"], 6),
+            "cpu_s": round(stage["cpu_s"], 6),
+            "rows_per_s": round(rows / stage["wall_s"], 1) if throughput and rows and stage["wall_s"] else None,
+            "peak_rss_mb": stage["peak_rss_mb"],
+        })
+
+    # generation & load, one day at a time, per source
+    totals = {}
+    for dt in days:
+        for name, (generate, load) in sources.items():
+            with metrics.stage(f"generate.{name}") as generate_stage:
+                tbl = generate(dt)
+            with metrics.stage(f"load.{name}") as load_stage:
+                load(con, tbl, dt)
+            for step, stage in ((f"generate.{name}", generate_stage), (f"load.{name}", load_stage)):
+                total = totals.setdefault(step, {"rows": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": 0.0})
+                total["rows"] += tbl.num_rows
+                total["wall_s"] += stage["wall_s"]
+                total["cpu_s"] += stage["cpu_s"]
+                total["peak_rss_mb"] = max(total["peak_rss_mb"], stage["peak_rss_mb"])
+    for step, total in totals.items():
+        record(step, total, total["rows"])
+
+    # incremental silver & gold builds over every loaded day
+    with metrics.stage("silver.customers") as stage:
+        stats = silver_customers.build_customers(con)
+    record("silver.customers", stage, stats["closed"] + stats["opened"])
+    with metrics.stage("silver.transactions") as stage:
+        stats = silver_transactions.build_transactions(con)
+    record("silver.transactions", stage, stats["rows_written"])
+    with metrics.stage("gold") as stage:
+        stats = gold_sales.refresh_gold(con)
+    record("gold", stage, sum(table_stats["rows_written"] for table_stats in stats.values()))
+
+    # catalog overhead of the backend: median of `repeats` metadata queries, on the loaded catalog
+    runs = []
+    for _ in range(repeats):
+        with metrics.stage("catalog.round_trip") as stage:
+            session.catalog_round_trip()
+        runs.append(stage)
+    record("catalog.round_trip", sorted(runs, key=lambda run: run["wall_s"])[len(runs) // 2], 0, throughput=False)
+
+    # read latency: median of `repeats` runs, after an untimed warm-up run
+    for name, query in QUERIES.items():
+        rows = len(con.execute(query).fetchall())
+        runs = []
+        for _ in range(repeats):
+            with metrics.stage(f"query.{name}") as stage:
+                con.execute(query).fetchall()
+            runs.append(stage)
+        median = sorted(runs, key=lambda run: run["wall_s"])[len(runs) // 2]
+        record(f"query.{name}", median, rows, throughput=False)  # rows returned, for reference
+
+    # maintenance: compact the day-by-day writes, then drop the files they replaced
+    with metrics.stage("maintenance") as stage:
+        compacted = compact(con)
+        expire_snapshots(con, datetime.timedelta(0))
+        cleanup_old_files(con, datetime.timedelta(0))
+    record("maintenance", stage, sum(part["rows_written"] for part in compacted))
+
+    con.close()
+    session.close()
+    return results
+
+
+def compare(results_path: str, threshold: float) -> list:
+    """Compare the latest commit's results against the commit benchmarked before it, per tier & step.
+
+    Args:
+        results_path (str): Results file written by `main`
+        threshold (float): Relative slow-down (e.g. 0.1 for 10%) beyond which a step counts as a regression
+
+    Returns:
+        list: The (backend, tier, step) triples that regressed
+    """
+    with open(results_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    commits = list(dict.fromkeys(record["commit"] for record in records))
+    if len(commits) < 2:
+        print(f"Need results from two commits to compare, found {commits}")
+        return []
+    base, head = commits[-2], commits[-1]
+
+    # latest run of each (backend, tier, step) per commit. Results from before backends were recorded used DuckDB
+    latest = {}
+    for record in records:
+        latest[(record["commit"], record.get("backend", "duckdb"), record["tier"], record["step"])] = record
+
+    regressions = []
+    print(f"{'backend':<8} {'tier':<6} {'step':<36} {base + ' (s)':>16} {head + ' (s)':>16} {'change':>8}")
+    for (commit, backend, tier, step), record in latest.items():
+        if commit != head or (base, backend, tier, step) not in latest:
+            continue
+        before = latest[(base, backend, tier, step)]["wall_s"]
+        change = (record["wall_s"] - before) / before if before else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append((backend, tier, step))
+        print(f"{backend:<8} {tier:<6} {step:<36} {before:>16.4f} {record['wall_s']:>16.4f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(tiers: list, repeats: int, results_path: str, keep: bool, backends: list = ("duckdb",)):
+    commit = git_commit()
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+
+    for backend, tier in itertools.product(backends, tiers):
+        workdir = tempfile.mkdtemp(prefix=f"ducklake_bench_{backend}_{tier}_")
+        print(f"Running {tier} {SCALE_TIERS[tier]} on a {backend} catalog in {workdir} ...")
+        try:
+            # a fresh interpreter per run, so peak memory & caches of one run do not carry into the next
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = pool.submit(run_tier, tier, workdir, repeats, backend).result()
+        finally:
+            if not keep:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        ts = datetime.datetime.now().isoformat(timespec="seconds")
+        with open(results_path, "a") as f:
+            for result in results:
+                f.write(json.dumps({"ts": ts, "commit": commit, "backend": backend, "tier": tier, **result}) + "\n")
+
+        print(f"{'step':<36} {'rows':>12} {'wall (s)':>10} {'rows/s':>12} {'peak MB':>9}")
+        for result in results:
+            rows_per_s = f"{result['rows_per_s']:,.0f}" if result["rows_per_s"] else "-"
+            print(f"{result['step']:<36} {result['rows']:>12,} {result['wall_s']:>10.4f} {rows_per_s:>12} {result['peak_rss_mb']:>9.1f}")
+    print(f"Results appended to {results_path} (commit {commit})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bronze, silver & gold pipeline at scale tiers, on a local DuckLake")
+    parser.add_argument("--tiers", nargs="+", choices=list(SCALE_TIERS), default=["SF1"], help="scale tiers to run")
+    parser.add_argument("--backends", nargs="+", choices=["duckdb", "sqlite"], default=["duckdb"],
+                        help="local catalog backends to run every tier on, to compare catalog overhead")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON lines file results are appended to")
+    parser.add_argument("--keep", action="store_true", help="keep each tier's DuckLake files for inspection")
+    parser.add_argument("--compare", action="store_true", help="only compare the last two commits in the results file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slow-down flagged as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(args.results, args.threshold) else 0)
+    main(args.tiers, args.repeats, args.results, args.keep, args.backends)
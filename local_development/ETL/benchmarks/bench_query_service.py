@@ -0,0 +1,106 @@
+# imports
+import sys
+import os
+import time
+import shutil
+import asyncio
+import argparse
+import datetime
+import tempfile
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import generate_transactions
+from utils.partitions import overwrite_partition, tag_partition
+from utils.schema_registry import ensure_tables
+from utils.session import DuckLakeSession, catalog_uri_for
+from utils.query_service import QueryService, QueryTimeout
+
+# Constants
+TABLE = "retail_bronze.transactions_src_raw"
+
+# a dashboard-like mix: small aggregates, a point lookup, and a larger result streamed in batches
+QUERIES = (
+    (f"SELECT extract_date, store_id, count(*), sum(txn_amount) FROM {TABLE} GROUP BY ALL", None),
+    (f"SELECT Product, sum(volume) FROM {TABLE} WHERE extract_date = ? GROUP BY ALL", ["2025-01-01"]),
+    (f"SELECT * FROM {TABLE} WHERE customerID = ?", [10042]),
+    (f"SELECT channel, date_trunc('hour', transaction_TS), sum(txn_amount) FROM {TABLE} GROUP BY ALL", None),
+    (f"SELECT * FROM {TABLE} WHERE extract_date = ? AND store_id = ?", ["2025-01-02", 3]),
+)
+
+
+def load(session: DuckLakeSession, days: int, num_transactions: int) -> int:
+    """Load `days` partitions of generated transactions into a fresh local DuckLake, returning the row count."""
+    con = session.cursor()
+    con.execute("CREATE SCHEMA IF NOT EXISTS retail_bronze ;")
+    ensure_tables(con, [TABLE])
+    rows = 0
+    for i in range(days):
+        dt = datetime.date(2025, 1, 1) + datetime.timedelta(days=i)
+        txns = generate_transactions(dt, dt + datetime.timedelta(days=1), num_transactions, as_arrow=True)
+        rows += overwrite_partition(con, TABLE, tag_partition(txns, f"{dt:%Y-%m-%d}"), f"{dt:%Y-%m-%d}")["rows_written"]
+    con.close()
+    return rows
+
+
+async def run_clients(service: QueryService, clients: int, queries_per_client: int) -> dict:
+    """`clients` concurrent clients, each streaming `queries_per_client` queries of the mix one after another."""
+    latencies, timeouts = [], 0
+
+    async def client(offset: int):
+        nonlocal timeouts
+        for i in range(queries_per_client):
+            sql, params = QUERIES[(offset + i) % len(QUERIES)]
+            t0 = time.perf_counter()
+            try:
+                async for _ in service.stream(sql, params):
+                    pass
+                latencies.append(time.perf_counter() - t0)
+            except QueryTimeout:
+                timeouts += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(clients)))
+    seconds = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def quantile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else float("nan")
+
+    return {
+        "queries_per_s": len(latencies) / seconds,
+        "p50_ms": quantile(0.50),
+        "p95_ms": quantile(0.95),
+        "p99_ms": quantile(0.99),
+        "timeouts": timeouts,
+    }
+
+
+async def main(days: int, num_transactions: int, concurrency: list, queries_per_client: int, workers: int, timeout_s: float):
+    workdir = tempfile.mkdtemp(prefix="ducklake_bench_query_service_")
+    session = DuckLakeSession(catalog_uri_for("duckdb", workdir), data_path=os.path.join(workdir, "data"))
+    try:
+        print(f"Loaded {load(session, days, num_transactions):,} line items over {days} partitions")
+        async with QueryService(session, max_concurrency=workers, timeout_s=timeout_s) as service:
+            await run_clients(service, 1, len(QUERIES))  # warm-up: metadata & Parquet footers cached
+            print(f"{'clients':>8} {'queries/s':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'timeouts':>9}")
+            for clients in concurrency:
+                result = await run_clients(service, clients, queries_per_client)
+                print(f"{clients:>8} {result['queries_per_s']:>10.1f} {result['p50_ms']:>9.1f} "
+                      f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['timeouts']:>9}")
+    finally:
+        session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark query service throughput & tail latency at increasing client concurrency")
+    parser.add_argument("--days", type=int, default=7, help="partitions of transactions to load")
+    parser.add_argument("--num-transactions", type=int, default=50_000, help="transactions per partition")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32, 64], help="concurrent clients per step")
+    parser.add_argument("--queries-per-client", type=int, default=20, help="queries each client runs per step")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="queries the service runs at the same time")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-query timeout, in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.num_transactions, args.concurrency, args.queries_per_client, args.workers, args.timeout))
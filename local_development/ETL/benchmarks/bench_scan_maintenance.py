@@ -0,0 +1,56 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import statistics
+
+# make the shared `utils` package and the maintenance entry point importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.session import get_session
+from maintain_ducklake import maintain, print_report
+
+# scans whose cost is dominated by opening many small files
+QUERIES = {
+    "full scan": "SELECT count(*), sum(txn_amount) FROM retail_bronze.transactions_src_raw",
+    "one partition": """
+        SELECT count(*), sum(txn_amount) FROM retail_bronze.transactions_src_raw
+        WHERE extract_date = (SELECT max(extract_date) FROM retail_bronze.transactions_src_raw)
+    """,
+    "customers by day": "SELECT extract_date, count(*) FROM retail_bronze.customer_src_raw GROUP BY ALL",
+}
+
+
+def time_queries(repeats: int) -> dict:
+    """Median seconds per query over `repeats` runs, after one untimed warm-up run."""
+    timings = {}
+    with get_session().cursor() as con:
+        for name, query in QUERIES.items():
+            con.execute(query).fetchall()
+            runs = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                con.execute(query).fetchall()
+                runs.append(time.perf_counter() - t0)
+            timings[name] = statistics.median(runs)
+    return timings
+
+
+def main(repeats: int, retain_days: float):
+    before = time_queries(repeats)
+    result = maintain(retain=datetime.timedelta(days=retain_days))
+    after = time_queries(repeats)
+
+    print_report(result["before"], result["after"])
+    print(f"\n{'query':<20} {'before (s)':>12} {'after (s)':>12} {'speed-up':>10}")
+    for name in QUERIES:
+        print(f"{name:<20} {before[name]:>12.4f} {after[name]:>12.4f} {before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bronze scans before & after DuckLake maintenance")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--retain-days", type=float, default=0, help="snapshot retention passed to maintenance")
+    args = parser.parse_args()
+    main(args.repeats, args.retain_days)
@@ -0,0 +1,51 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import get_transactions, generate_transactions
+
+
+def summarise(df) -> dict:
+    """Summary statistics used to check both generators draw from the same distributions."""
+    return {
+        "rows": len(df),
+        "items_per_txn": round(len(df) / df["transaction_id"].nunique(), 3),
+        "online_share": round(float((df["channel"] == "Online").mean()), 3),
+        "mean_volume": round(float(df["volume"].mean()), 3),
+        "mean_amount": round(float(df["txn_amount"].mean()), 2),
+    }
+
+
+def bench(fn, **kwargs) -> tuple:
+    """Time a single call of `fn`, returning (seconds, result)."""
+    t0 = time.perf_counter()
+    result = fn(**kwargs)
+    return time.perf_counter() - t0, result
+
+
+def main(sizes: list, legacy_max: int):
+    start = datetime.date(2025, 1, 1)
+    end = start + datetime.timedelta(days=1)
+
+    print(f"{'transactions':>14} {'generator':>12} {'seconds':>10} {'rows/s':>12}  summary")
+    for n in sizes:
+        runs = [("vectorized", generate_transactions)]
+        if n <= legacy_max:
+            runs.insert(0, ("legacy", get_transactions))
+
+        for name, fn in runs:
+            seconds, df = bench(fn, start=start, end=end, num_transactions=n, seed=42)
+            print(f"{n:>14,} {name:>12} {seconds:>10.3f} {len(df) / seconds:>12,.0f}  {summarise(df)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs vectorized transaction generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="largest size to run the per-row generator at")
+    args = parser.parse_args()
+    main(args.sizes, args.legacy_max)
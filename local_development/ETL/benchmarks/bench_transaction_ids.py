@@ -0,0 +1,74 @@
+# imports
+import sys
+import os
+import time
+import shutil
+import argparse
+import datetime
+import tempfile
+import statistics
+import duckdb
+import pyarrow as pa
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import generate_transactions
+from utils.layout import order_by_clause
+
+# basket totals joined back to their line items, as downstream models do
+JOIN_QUERY = """
+SELECT count(*), sum(t.txn_amount / b.basket_amount)
+FROM txns AS t
+JOIN (SELECT transaction_id, sum(txn_amount) AS basket_amount FROM txns GROUP BY transaction_id) AS b
+USING (transaction_id)
+"""
+
+
+def id_variants(num_transactions: int) -> dict:
+    """The same line items with 36-char string ids (as before), random UUIDs & time-ordered UUIDs."""
+    start = datetime.date(2025, 1, 1)
+    end = start + datetime.timedelta(days=1)
+    uuid4 = generate_transactions(start, end, num_transactions, as_arrow=True)
+    uuid7 = generate_transactions(start, end, num_transactions, as_arrow=True, id_scheme="uuid7")
+    column = uuid4.schema.get_field_index("transaction_id")
+    strings = uuid4.set_column(column, "transaction_id", pa.array([str(u) for u in uuid4["transaction_id"].to_pylist()]))
+    return {"string": strings, "uuid4": uuid4, "uuid7": uuid7}
+
+
+def parquet_mb(con: duckdb.DuckDBPyConnection, path: str) -> float:
+    """Size of `txns` written as one Parquet file in the bronze table's sort order, in MB."""
+    con.execute(f"COPY (SELECT * FROM txns {order_by_clause('retail_bronze.transactions_src_raw')}) TO '{path}' (FORMAT parquet)")
+    return os.path.getsize(path) / 1024 ** 2
+
+
+def time_join(con: duckdb.DuckDBPyConnection, repeats: int) -> float:
+    """Median seconds of the basket join over `txns`."""
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        con.execute(JOIN_QUERY).fetchall()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main(num_transactions: int, repeats: int):
+    work_dir = tempfile.mkdtemp(prefix="txn_ids_")
+    try:
+        print(f"{'ids':<8} {'id column MB':>13} {'parquet MB':>11} {'join (s)':>10}")
+        for name, txns_tbl in id_variants(num_transactions).items():
+            con = duckdb.connect()
+            con.execute("CREATE TABLE txns AS SELECT * FROM txns_tbl")
+            id_mb = txns_tbl["transaction_id"].nbytes / 1024 ** 2
+            file_mb = parquet_mb(con, os.path.join(work_dir, f"{name}.parquet"))
+            print(f"{name:<8} {id_mb:>13.1f} {file_mb:>11.1f} {time_join(con, repeats):>10.3f}")
+            con.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark string vs UUID transaction ids: size & join cost")
+    parser.add_argument("--num-transactions", type=int, default=300_000, help="transactions to generate (~3 line items each)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed joins per id type")
+    args = parser.parse_args()
+    main(args.num_transactions, args.repeats)
@@ -0,0 +1,97 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import datetime
+import itertools
+import pyarrow as pa
+
+# make the shared `utils` package importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from utils.data_sourcing.transactions import generate_transactions
+from utils.partitions import tag_partition
+from utils.maintenance import partition_files
+from utils.session import get_session, CATALOG_NAME
+
+# scratch table the matrix writes to, dropped after every cell. Options are set on the table only, so the
+# catalog's global options (and so other jobs) are left alone
+BENCH_SCHEMA, BENCH_TABLE = "retail_ops", "write_bench"
+
+
+def bench_data(days: int, num_transactions: int) -> pa.Table:
+    """`days` partitions of transactions, as one Arrow table, like a backfill writes them."""
+    start = datetime.date(2025, 1, 1)
+    return pa.concat_tables([
+        tag_partition(
+            generate_transactions(dt, dt + datetime.timedelta(days=1), num_transactions, as_arrow=True),
+            f"{dt:%Y-%m-%d}"
+        )
+        for dt in (start + datetime.timedelta(days=i) for i in range(days))
+    ])
+
+
+def time_write(con, data: pa.Table, threads: int, level: int, target_file_size: str, row_group_size: int) -> dict:
+    """Write `data` into a fresh partitioned scratch table with the given settings & options."""
+    table = f"{BENCH_SCHEMA}.{BENCH_TABLE}"
+    con.execute(f"SET threads = {threads} ;")
+    con.register("bench_src", data)
+    con.execute(f"""
+    CREATE TABLE {table} AS SELECT * FROM bench_src LIMIT 0 ;
+    ALTER TABLE {table} SET PARTITIONED BY (extract_date) ;
+    """)
+    for name, value in (("parquet_compression", "zstd"), ("parquet_compression_level", level),
+                        ("target_file_size", target_file_size), ("parquet_row_group_size", row_group_size)):
+        con.execute(
+            f"CALL {CATALOG_NAME}.set_option(?, ?, schema => ?, table_name => ?)",
+            [name, str(value), BENCH_SCHEMA, BENCH_TABLE]
+        )
+
+    t0 = time.perf_counter()
+    con.execute(f"INSERT INTO {table} SELECT * FROM bench_src ORDER BY store_id, transaction_TS")
+    seconds = time.perf_counter() - t0
+
+    parts = [part for part in partition_files(con) if part["table"] == table]
+    con.execute(f"DROP TABLE {table}")
+    con.unregister("bench_src")
+    return {
+        "seconds": seconds,
+        "files": sum(part["data_files"] for part in parts),
+        "mb": sum(part["data_bytes"] for part in parts) / 1024 ** 2,
+    }
+
+
+def main(days: int, num_transactions: int, threads: list, levels: list, file_sizes: list, row_groups: list):
+    data = bench_data(days, num_transactions)
+    print(f"{data.num_rows:,} line items over {days} partitions")
+    print(f"{'threads':>8} {'zstd':>5} {'target file':>12} {'row group':>10} {'seconds':>9} {'files':>6} {'MB':>8} {'MB/s':>7}")
+
+    results = []
+    with get_session().cursor() as con:
+        for n_threads, level, file_size, row_group in itertools.product(threads, levels, file_sizes, row_groups):
+            result = time_write(con, data, n_threads, level, file_size, row_group)
+            results.append(((n_threads, level, file_size, row_group), result))
+            print(
+                f"{n_threads:>8} {level:>5} {file_size:>12} {row_group:>10,} {result['seconds']:>9.2f} "
+                f"{result['files']:>6,} {result['mb']:>8.1f} {data.nbytes / 1024 ** 2 / result['seconds']:>7.1f}"
+            )
+
+    # fastest write among those within 5% of the smallest output, i.e. not buying speed with size
+    smallest = min(result["mb"] for _, result in results)
+    (n_threads, level, file_size, row_group), result = min(
+        (cell for cell in results if cell[1]["mb"] <= smallest * 1.05), key=lambda cell: cell[1]["seconds"]
+    )
+    print(f"\nsuggested: threads={n_threads}, parquet_compression_level={level}, "
+          f"target_file_size={file_size}, parquet_row_group_size={row_group} ({result['seconds']:.2f}s, {result['mb']:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DuckLake write settings, to pick write profile defaults")
+    parser.add_argument("--days", type=int, default=7, help="partitions written per cell")
+    parser.add_argument("--num-transactions", type=int, default=100_000, help="transactions per partition")
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, 4, os.cpu_count()}))
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 9], help="zstd compression levels")
+    parser.add_argument("--file-sizes", nargs="+", default=["128MB", "512MB"], help="DuckLake target file sizes")
+    parser.add_argument("--row-groups", type=int, nargs="+", default=[16_384, 122_880], help="rows per row group")
+    args = parser.parse_args()
+    main(args.days, args.num_transactions, args.threads, args.levels, args.file_sizes, args.row_groups)
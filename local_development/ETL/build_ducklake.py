@@ -1,15 +1,19 @@
 # imports
-import duckdb as db
-import psycopg2
-import pandas as pd
 import os
+import argparse
+from utils.session import (
+    DuckLakeSession, DATA_PATH, CATALOG_BACKEND, CATALOG_BACKENDS, catalog_uri_for, local_catalog_path, close_session
+)
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils.schema_registry import forget_ensured
+from utils import metrics
 
 
 
-def build():
-    """
-    Builds a simple duck-lake with medallion setup
-    """
+def reset_postgres_catalog():
+    """Drop & recreate the `ducklake_catalog` Postgres database."""
+    import psycopg2  # only needed for the Postgres backend
+
     # POSTGRES SETUP
     # Connection parameters (match your docker-compose.yml) NOTE - This would never actually be saved in code
     # access env variables
@@ -42,50 +46,70 @@ def build():
         raise e
     finally:
         conn.close()
+    forget_ensured()  # every table has to be created again in the new catalog
 
-    # =============================================================================================
-
-    # DUCKLAKE SETUP
-    # execute duckdb commands to create a ducklake, which uses Postgres as the Catalog Database
-    # Create an in-memory DuckDB connection
-    con = db.connect(database=':memory:')
 
-    # install ducklkae extension
-    con.execute("INSTALL ducklake;")
-    con.execute("INSTALL postgres;") # as we will be using postgres as the catalog backing
+def reset_local_catalog(backend: str):
+    """Delete the catalog file of a local backend (and its write-ahead log), so attaching creates a new one."""
+    path = local_catalog_path(backend)
+    print(f"Clear existing catalog file {path} ...")
+    for stale in (path, f"{path}.wal", f"{path}-wal", f"{path}-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    forget_ensured()  # every table has to be created again in the new catalog
+    print("Catalog file cleared")
 
-    # create the ducklake, providing details to our postgres host
-    # NOTE - this is a demo example, typically, secrets would be used and the connection details NOT stored in code
-    create_ducklake = f"""
-    ATTACH 'ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}' AS retail_ducklake
-    (DATA_PATH '/home/dev/workspace/local_development/data', ENCRYPTED) ;
 
-    USE retail_ducklake ;
+def build(profile: str = DEFAULT_PROFILE, backend: str = CATALOG_BACKEND):
     """
-    con.execute(create_ducklake)
+    Builds a simple duck-lake with medallion setup, with the Parquet write options of a write profile,
+    and its catalog in the given backend (see `utils.session.CATALOG_BACKENDS`)
+    """
+    # close any process-wide session first, as Postgres will not drop a database with open connections
+    # (and a DuckDB catalog file may only be open once)
+    close_session()
+
+    if backend == "postgres":
+        reset_postgres_catalog()
+    else:
+        reset_local_catalog(backend)
+
+    # =============================================================================================
 
-    # set the global parquet compression algorithm used when writing Parquet files
-    con.execute("CALL retail_ducklake.set_option('parquet_compression', 'zstd')")
+    # DUCKLAKE SETUP
+    # execute duckdb commands to create a ducklake, with the backend's database as the Catalog Database
+    # create the ducklake through its own session (which installs & loads the ducklake extension, and that of the backend),
+    # providing the data path to be stored in the new catalog. Connecting sets the profile's Parquet options
+    # (zstd compression & level, target file size, rows per row group) as the catalog's global options
+    session = DuckLakeSession(catalog_uri_for(backend), data_path=DATA_PATH, encrypted=True, profile=profile)
+    with metrics.job("build_ducklake"), metrics.stage("attach"):
+        con = session.connect()
 
-    ## Build Bronze Silver & Gold Layers
+    ## Build Bronze Silver & Gold Layers (plus an ops schema, for run metrics)
     build_medallion = """
     CREATE SCHEMA IF NOT EXISTS retail_bronze ;
     CREATE SCHEMA IF NOT EXISTS retail_silver ;
     CREATE SCHEMA IF NOT EXISTS retail_gold ;
+    CREATE SCHEMA IF NOT EXISTS retail_ops ;
     """
-    con.execute(build_medallion)
+    with metrics.job("build_ducklake"), metrics.stage("create_schemas"):
+        con.execute(build_medallion)
+    metrics.write_to_ducklake(con)  # only if ETL_METRICS_DUCKLAKE=1
 
-    # detach from ducklake
-    con.execute("""
-    USE memory ;
-    DETACH retail_ducklake ;         
-    """)
-    # close connection to DuckDB
-    con.close()
+    # detach from ducklake & close connection to DuckDB
+    session.close()
 
 
 # Execute Build
 if __name__ == '__main__':
-    print("Building Ducklake ...")
-    build() 
+    parser = argparse.ArgumentParser(description="Build the retail DuckLake")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile whose Parquet options the catalog starts with")
+    parser.add_argument("--backend", choices=list(CATALOG_BACKENDS), default=CATALOG_BACKEND,
+                        help="catalog database: the Postgres server, or a local DuckDB or SQLite file")
+    args = parser.parse_args()
+
+    print(f"Building Ducklake (catalog backend: {args.backend}) ...")
+    build(args.profile, args.backend)
     print("Ducklake Build Complete")
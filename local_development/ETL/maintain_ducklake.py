@@ -0,0 +1,96 @@
+# imports
+import sys
+import time
+import argparse
+import datetime
+from utils.maintenance import (
+    TARGET_FILE_BYTES, file_report, compact, expire_snapshots, cleanup_old_files, delete_orphaned_files
+)
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+
+def print_report(before: dict, after: dict):
+    """Print live data & delete files per table, and Parquet files on disk, before & after maintenance."""
+    print(f"{'table':<36} {'data files':>16} {'data MB':>18} {'delete files':>14}")
+    for table in sorted(set(before["tables"]) | set(after["tables"])):
+        b = before["tables"].get(table, {"data_files": 0, "data_bytes": 0, "delete_files": 0})
+        a = after["tables"].get(table, {"data_files": 0, "data_bytes": 0, "delete_files": 0})
+        print(
+            f"{table:<36} {b['data_files']:>7,} -> {a['data_files']:<6,} "
+            f"{b['data_bytes'] / 1024 ** 2:>8.1f} -> {a['data_bytes'] / 1024 ** 2:<7.1f} "
+            f"{b['delete_files']:>5,} -> {a['delete_files']:<5,}"
+        )
+    print(
+        f"{'on disk':<36} {before['disk']['files']:>7,} -> {after['disk']['files']:<6,} "
+        f"{before['disk']['bytes'] / 1024 ** 2:>8.1f} -> {after['disk']['bytes'] / 1024 ** 2:<7.1f}"
+    )
+
+
+def maintain(
+    target_file_bytes: int = TARGET_FILE_BYTES,
+    retain: datetime.timedelta = datetime.timedelta(days=7),
+    tables: list = None,
+    dry_run: bool = False,
+    profile: str = DEFAULT_PROFILE
+) -> dict:
+    """Compact small & deleted-from files, expire old snapshots, and delete files no longer needed.
+
+    Args:
+        target_file_bytes (int): Average file size below which a multi-file partition is merged
+        retain (datetime.timedelta): How long snapshots (and so time travel) are kept for
+        tables (list): Tables to compact, as `schema.table` (defaults to every table)
+        dry_run (bool): Report what would be done, without changing anything
+        profile (str): Write profile of the rewrites (see `utils.write_profiles`)
+
+    Returns:
+        dict: File report before & after, and what each step did
+    """
+    with get_session(profile).cursor() as con, metrics.job("maintenance"):
+        before = file_report(con)
+        with metrics.stage("compact_all"):
+            compacted = compact(con, target_file_bytes, tables, dry_run)
+        with metrics.stage("expire_snapshots") as expire_stage:
+            expired = expire_snapshots(con, retain, dry_run)
+            expire_stage["rows"] = expired
+        with metrics.stage("cleanup_old_files") as cleanup_stage:
+            cleaned = cleanup_old_files(con, retain, dry_run)
+            cleanup_stage["rows"] = cleaned
+        with metrics.stage("delete_orphaned_files") as orphan_stage:
+            orphans = delete_orphaned_files(con, retain, dry_run)
+            orphan_stage["rows"] = len(orphans)
+        after = file_report(con)
+        metrics.write_to_ducklake(con)
+
+    return {
+        "before": before,
+        "after": after,
+        "partitions_compacted": len(compacted),
+        "snapshots_expired": expired,
+        "files_cleaned": cleaned,
+        "orphans_deleted": len(orphans),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact files, expire snapshots & clean up files of the DuckLake")
+    parser.add_argument("--target-file-mb", type=int, default=TARGET_FILE_BYTES // 1024 ** 2,
+                        help="average file size below which a multi-file partition is merged")
+    parser.add_argument("--retain-days", type=float, default=7, help="days of snapshots (time travel) to keep")
+    parser.add_argument("--tables", nargs="+", default=None, help="tables to compact, as schema.table (default all)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be done, without changing anything")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    print(f"Running DuckLake maintenance{' (dry run)' if args.dry_run else ''} ...")
+    t0 = time.perf_counter()
+    result = maintain(args.target_file_mb * 1024 ** 2, datetime.timedelta(days=args.retain_days), args.tables, args.dry_run, args.profile)
+    print_report(result["before"], result["after"])
+    print(
+        f"partitions compacted: {result['partitions_compacted']}, snapshots expired: {result['snapshots_expired']}, "
+        f"files cleaned up: {result['files_cleaned']}, orphaned files deleted: {result['orphans_deleted']}"
+    )
+    print(f"Maintenance completed in {time.perf_counter() - t0:.1f}s")
+    sys.exit()
@@ -0,0 +1,115 @@
+# imports
+import sys
+import os
+import time
+import fcntl
+import argparse
+import datetime
+import functools
+
+# make the bronze loaders importable (they in turn make the shared `utils` package importable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Bronze_layer"))
+import source_customer_data
+import source_product_data
+import source_store_data
+import source_transaction_data
+from utils.orchestrator import Task, run_dag
+from utils.schema_registry import BRONZE_TABLES, ensure_tables
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils.commits import contention_stats
+from utils import metrics
+
+# held for the duration of a run, so an overlapping cron trigger exits rather than racing on the catalog
+LOCK_PATH = os.getenv("BRONZE_LOCK_PATH", "/tmp/ducklake_bronze.lock")
+
+
+def bronze_tasks(
+    dt: datetime.date,
+    num_transactions: int = 5_000,
+    customer_mode: str = "snapshot",
+    id_scheme: str = "uuid4"
+) -> list:
+    """The bronze layer as a DAG: dimensions first, then the transactions that reference them."""
+    return [
+        Task(
+            "customers",
+            generate=functools.partial(source_customer_data.get_raw_customer_data, dt),
+            load=lambda con, df: source_customer_data.load_raw_customer_data(con, df, dt, customer_mode)
+        ),
+        Task(
+            "products",
+            generate=functools.partial(source_product_data.get_raw_product_data, dt),
+            load=lambda con, df: source_product_data.load_raw_product_data(con, df, dt)
+        ),
+        Task(
+            "stores",
+            generate=functools.partial(source_store_data.get_raw_store_data, dt),
+            load=lambda con, df: source_store_data.load_raw_store_data(con, df, dt)
+        ),
+        Task(
+            "transactions",
+            generate=functools.partial(source_transaction_data.get_raw_transaction_data, dt, num_transactions, id_scheme),
+            load=lambda con, df: source_transaction_data.load_raw_transaction_data(con, df, dt),
+            depends_on=("customers", "products", "stores")
+        ),
+    ]
+
+
+def run(
+    dt: datetime.date = None,
+    num_transactions: int = 5_000,
+    customer_mode: str = "snapshot",
+    workers: int = 4,
+    id_scheme: str = "uuid4",
+    profile: str = DEFAULT_PROFILE
+) -> dict:
+    """Run the whole bronze layer for `dt` (defaults to today) in this process, through one DuckLake session
+    (writing with `profile`, see `utils.write_profiles`)."""
+    dt = dt or datetime.date.today()
+    # the tables this run writes (the CDC table is left to its loader, which also creates a view on top)
+    tables = [table for table in BRONZE_TABLES if table != source_customer_data.CDC_TABLE]
+    if customer_mode == "cdc":
+        tables.remove("retail_bronze.customer_src_raw")
+
+    with get_session(profile).cursor() as con:
+        ensure_tables(con, tables)  # create or evolve them all in one catalog query, before any load
+        results = run_dag(bronze_tasks(dt, num_transactions, customer_mode, id_scheme), con, max_workers=workers)
+        metrics.write_to_ducklake(con)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bronze layer ETL as a single-process DAG")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, default=None, help="extract date, YYYY-MM-DD (default today)")
+    parser.add_argument("--num-transactions", type=int, default=5_000, help="number of transactions to generate")
+    parser.add_argument("--customer-mode", choices=["snapshot", "cdc"], default="snapshot")
+    parser.add_argument("--workers", type=int, default=4, help="number of generator processes")
+    parser.add_argument("--id-scheme", choices=source_transaction_data.ID_SCHEMES, default="uuid4",
+                        help="random or time-ordered transaction ids")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    with open(LOCK_PATH, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"Another bronze run holds {LOCK_PATH}, exiting")
+            sys.exit(1)
+
+        print("Running ETL process for BRONZE ...")
+        t0 = time.perf_counter()
+        results = run(args.date, args.num_transactions, args.customer_mode, args.workers, args.id_scheme, args.profile)
+
+    for name, result in results.items():
+        generate_s = f"{result['generate_s']:.2f}s" if result["generate_s"] is not None else "-"
+        load_s = f"{result['load_s']:.2f}s" if result["load_s"] is not None else "-"
+        print(f"{name:<14} {result['status']:<8} generate {generate_s:>8}  load {load_s:>8}")
+    contention = contention_stats()
+    print(f"Commits: {contention['commits']:,} in {contention['attempts']:,} attempts, "
+          f"{contention['conflicts']:,} conflicts, {contention['backoff_s']:.1f}s backing off")
+    print(f"Bronze layer completed in {time.perf_counter() - t0:.1f}s")
+
+    # non-zero exit for cron / run_etl.sh if any task did not load
+    sys.exit(0 if all(result["status"] == "success" for result in results.values()) else 1)
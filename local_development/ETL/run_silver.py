@@ -0,0 +1,62 @@
+# imports
+import sys
+import os
+import time
+import argparse
+import traceback
+
+# make the silver builders importable (they in turn make the shared `utils` package importable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Silver_layer"))
+import silver_customers
+import silver_transactions
+from utils.session import get_session
+from utils.write_profiles import WRITE_PROFILES, DEFAULT_PROFILE
+from utils import metrics
+
+
+def run(customer_source: str = "snapshot", profile: str = DEFAULT_PROFILE) -> dict:
+    """Incrementally build every silver table from the bronze partitions that changed since its watermark.
+
+    Args:
+        customer_source (str): Bronze customer load mode to read from, "snapshot" or "cdc"
+        profile (str): Write profile to use (see `utils.write_profiles`)
+
+    Returns:
+        dict: Per silver table, its status ("success" or "failed"), build stats and error (if any)
+    """
+    builders = {
+        silver_customers.SILVER_TABLE: lambda con: silver_customers.build_customers(con, customer_source),
+        silver_transactions.SILVER_TABLE: silver_transactions.build_transactions,
+    }
+    results = {}
+    with get_session(profile).cursor() as con:
+        for table, build in builders.items():
+            # tables are independent, so one failing does not stop the other
+            try:
+                with metrics.job(table):
+                    results[table] = {"status": "success", "stats": build(con), "error": None}
+            except Exception:
+                results[table] = {"status": "failed", "stats": None, "error": traceback.format_exc()}
+                print(f"Table `{table}` failed:\n{results[table]['error']}")
+        metrics.write_to_ducklake(con)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally build the silver layer from new bronze partitions")
+    parser.add_argument("--customer-source", choices=list(silver_customers.SOURCES), default="snapshot",
+                        help="bronze customer load mode to read from")
+    parser.add_argument("--profile", choices=list(WRITE_PROFILES), default=DEFAULT_PROFILE,
+                        help="write profile: DuckDB threads, memory & spill, and Parquet options")
+    args = parser.parse_args()
+
+    print("Running ETL process for SILVER ...")
+    t0 = time.perf_counter()
+    results = run(args.customer_source, args.profile)
+    for table, result in results.items():
+        days = len(result["stats"]["days"]) if result["stats"] else "-"
+        print(f"{table:<28} {result['status']:<8} days {days}")
+    print(f"Silver layer completed in {time.perf_counter() - t0:.1f}s")
+
+    # non-zero exit for cron / run_etl.sh if any table failed to build
+    sys.exit(0 if all(result["status"] == "success" for result in results.values()) else 1)
@@ -0,0 +1,128 @@
+# imports
+import os
+import time
+import random
+import threading
+import duckdb
+from typing import Callable
+from utils import metrics
+
+# Constants
+MAX_ATTEMPTS = int(os.getenv("ETL_COMMIT_ATTEMPTS", "5"))
+BASE_DELAY_S = 0.1
+MAX_DELAY_S = 5.0
+
+# DuckLake surfaces a lost race on the catalog as a generic transaction error, so conflicts are told apart
+# from real failures by message: its own "conflict" errors (e.g. two writers adding files to the same table),
+# the Postgres catalog's serialization failures, deadlocks & unique violations on snapshot ids, and a SQLite
+# catalog file locked by another process
+CONFLICT_MARKERS = ("conflict", "could not serialize", "deadlock detected", "duplicate key value", "database is locked")
+
+_stats = {"commits": 0, "attempts": 0, "conflicts": 0, "failures": 0, "backoff_s": 0.0}
+_stats_lock = threading.Lock()
+
+
+def is_conflict(exc: BaseException) -> bool:
+    """Whether a DuckDB error is a commit conflict with another writer, i.e. worth retrying."""
+    if not isinstance(exc, duckdb.Error):
+        return False
+    message = str(exc).lower()
+    return any(marker in message for marker in CONFLICT_MARKERS)
+
+
+def backoff_delay(attempt: int, base_s: float = BASE_DELAY_S, max_delay_s: float = MAX_DELAY_S) -> float:
+    """Seconds to wait before retry number `attempt` (from 0): full jitter over an exponentially growing window,
+    so writers that collided once do not collide again on the same schedule."""
+    return random.uniform(0, min(max_delay_s, base_s * 2 ** attempt))
+
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def _rollback(con: duckdb.DuckDBPyConnection):
+    """Roll back the open transaction, if the failed statement left one open."""
+    try:
+        con.execute("ROLLBACK")
+    except duckdb.Error as e:
+        if "no transaction" not in str(e).lower():
+            raise
+
+
+def run_in_transaction(
+    con: duckdb.DuckDBPyConnection,
+    work: Callable[[duckdb.DuckDBPyConnection], object],
+    max_attempts: int = MAX_ATTEMPTS,
+    base_delay_s: float = BASE_DELAY_S,
+    max_delay_s: float = MAX_DELAY_S
+):
+    """Run `work(con)` in one catalog transaction and commit it, retrying on conflicts with other writers.
+
+    A conflict (see `is_conflict`) rolls the transaction back, waits a jittered, exponentially growing delay
+    and runs `work` again from the start, up to `max_attempts` times in all. Any other error is rolled back
+    and raised straight away. `work` must therefore be safe to repeat, e.g. a delete & insert of one
+    partition. Each attempt is recorded as a `commit_attempt` stage (so retries show up as several per
+    job), and each wait as `commit_backoff`, and totals for the process are kept for `contention_stats`,
+    where any error raised to the caller, DuckDB's or not, counts as one failure.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached, with no transaction open
+        work (Callable[[duckdb.DuckDBPyConnection], object]): Statements to run inside the transaction
+        max_attempts (int): Attempts before a conflict is raised (1 disables retries)
+        base_delay_s (float): Backoff window of the first retry, doubling with each one after it
+        max_delay_s (float): Largest backoff window
+
+    Returns:
+        The return value of `work` on the attempt that committed
+    """
+    for attempt in range(max_attempts):
+        _count(attempts=1)
+        try:
+            with metrics.stage("commit_attempt"):
+                con.execute("BEGIN TRANSACTION")
+                try:
+                    result = work(con)
+                    con.execute("COMMIT")
+                except BaseException:
+                    _rollback(con)
+                    raise
+        except duckdb.Error as e:
+            if not is_conflict(e):
+                _count(failures=1)
+                raise
+            _count(conflicts=1)
+            if attempt + 1 == max_attempts:
+                _count(failures=1)
+                raise
+            delay = backoff_delay(attempt, base_delay_s, max_delay_s)
+            print(f"Commit conflict (attempt {attempt + 1}/{max_attempts}), retrying in {delay:.2f}s: {e}")
+            with metrics.stage("commit_backoff"):
+                time.sleep(delay)
+            _count(backoff_s=delay)
+        except Exception:
+            _count(failures=1)  # an error raised by `work` itself, e.g. bad input, is a failure too
+            raise
+        else:
+            _count(commits=1)
+            return result
+
+
+def contention_stats(reset: bool = False) -> dict:
+    """Commit totals for this process: commits, attempts, conflicts, failures, seconds spent backing off,
+    and the share of attempts that hit a conflict.
+
+    Args:
+        reset (bool): Zero the totals after reading them
+
+    Returns:
+        dict: The totals
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        if reset:
+            _stats.update(commits=0, attempts=0, conflicts=0, failures=0, backoff_s=0.0)
+    stats["backoff_s"] = round(stats["backoff_s"], 3)
+    stats["conflict_rate"] = round(stats["conflicts"] / stats["attempts"], 3) if stats["attempts"] else 0.0
+    return stats
@@ -1,90 +1,157 @@
 # imports
 import pandas as pd
-import random
-from faker import Faker
-from faker.providers import DynamicProvider
 import datetime
-from tqdm import tqdm
-
-
-def generate_base_customers(seed: int = 12345, num_customers: int = 1000) -> pd.DataFrame:
-    """Generate consistent base customer data using Faker."""
-    fake = Faker('en_GB')
-    Faker.seed(seed)
-    random.seed(seed)
-
-    # Add dynamic profession provider
-    professions_provider = DynamicProvider(
-        provider_name="profession",
-        elements=[
-            "Engineer", "Graphic Designer", "Architect", "Civil engineer", "Software Developer",
-            "Laboratory Technician", "Mechanical engineer", "Scientist", "Veterinarian", "Artist",
-            "Bricklayer", "Producers and Directors", "Plasterer", "Nurse", "Roofer", "Musician", "Social Worker",
-            "Physiotherapist", "Health professional", "Teacher", "Radiographer", "Paramedic", "Physician", "Welder",
-            "Archaeologist", "Association football manager", "Technician", "Electrician", "Engineering technician",
-            "Accountant", "Painter and decorator", "Librarian", "Private investigator", "Pharmacy Technician",
-            "Technology specialist", "Quantity surveyor", "Air traffic controller", "Financial Manager",
-            "Official", "Chef", "Plumber", "Aviator", "Broker", "Police officer", "Designer", "Optician",
-            "Adviser", "Trader", "Consultant", "Chartered Surveyor", "Pipefitter"
-        ]
-    )
-    fake.add_provider(professions_provider)
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Optional, Tuple, Union
+from .pools import sample_pool, random_dates
+from .transactions import CATEGORY_TYPE
+
+# Constants
+PROFESSIONS = [
+    "Engineer", "Graphic Designer", "Architect", "Civil engineer", "Software Developer",
+    "Laboratory Technician", "Mechanical engineer", "Scientist", "Veterinarian", "Artist",
+    "Bricklayer", "Producers and Directors", "Plasterer", "Nurse", "Roofer", "Musician", "Social Worker",
+    "Physiotherapist", "Health professional", "Teacher", "Radiographer", "Paramedic", "Physician", "Welder",
+    "Archaeologist", "Association football manager", "Technician", "Electrician", "Engineering technician",
+    "Accountant", "Painter and decorator", "Librarian", "Private investigator", "Pharmacy Technician",
+    "Technology specialist", "Quantity surveyor", "Air traffic controller", "Financial Manager",
+    "Official", "Chef", "Plumber", "Aviator", "Broker", "Police officer", "Designer", "Optician",
+    "Adviser", "Trader", "Consultant", "Chartered Surveyor", "Pipefitter"
+]
+_PROFESSION_NAMES = pa.array(PROFESSIONS, pa.string())
+
+# Arrow schema of a customer record
+CUSTOMER_SCHEMA = pa.schema([
+    ("customerID", pa.int64()),
+    ("firstName", pa.string()),
+    ("lastName", pa.string()),
+    ("rewardsMember", pa.bool_()),
+    ("emailAddress", pa.string()),
+    ("postcode", pa.string()),
+    ("profession", CATEGORY_TYPE),
+    ("dob", pa.date32()),
+    ("customerJoined", pa.timestamp("us")),
+])
+
+
+def generate_base_customers(
+    seed: int = 12345,
+    num_customers: int = 1000,
+    as_arrow: bool = False
+) -> Union[pd.DataFrame, pa.Table]:
+    """Generate consistent base customer data, sampling Faker values from cached vocabulary pools.
+
+    With `as_arrow`, returns a `pyarrow.Table` with schema `CUSTOMER_SCHEMA`, built straight from the
+    NumPy draws, rather than a pandas DataFrame.
+    """
+    rng = np.random.default_rng(seed)
 
     bday_start = datetime.date(1950, 1, 1)
     bday_end = datetime.date(2005, 1, 1)
     joined_start = datetime.date(1990, 1, 1)
     joined_end = datetime.date(2024, 12, 31)
+    joined_seconds = rng.integers(0, (joined_end - joined_start).days * 86_400, size=num_customers, endpoint=True)
 
-    customers = []
-    for cid in tqdm(range(10000, 10000 + num_customers), desc="Generating customers"):
-        customers.append({
-            'customerID': cid,
-            'firstName': fake.first_name(),
-            'lastName': fake.last_name(),
-            'rewardsMember': fake.boolean(),
-            'emailAddress': fake.email(),
-            'postcode': fake.postcode(),
-            'profession': fake.profession(),
-            'dob': fake.date_between(bday_start, bday_end),
-            'customerJoined': fake.date_time_between(start_date=joined_start, end_date=joined_end)
-        })
+    columns = {
+        'customerID': np.arange(10000, 10000 + num_customers),
+        'firstName': sample_pool('first_name', rng, num_customers),
+        'lastName': sample_pool('last_name', rng, num_customers),
+        'rewardsMember': rng.random(num_customers) < 0.5,
+        'emailAddress': sample_pool('email', rng, num_customers),
+        'postcode': sample_pool('postcode', rng, num_customers),
+        'profession': rng.integers(0, len(PROFESSIONS), size=num_customers),
+        'dob': random_dates(rng, bday_start, bday_end, num_customers, as_object=not as_arrow),
+        'customerJoined': (np.datetime64(joined_start, 's') + joined_seconds).astype('datetime64[us]')
+    }
 
-    return pd.DataFrame(customers)
+    if as_arrow:
+        columns['profession'] = pa.DictionaryArray.from_arrays(pa.array(columns['profession'], pa.int8()), _PROFESSION_NAMES)
+        return pa.table(columns, schema=CUSTOMER_SCHEMA)
 
+    columns['profession'] = pd.Categorical.from_codes(columns['profession'], PROFESSIONS)
+    return pd.DataFrame(columns)
 
-def randomly_update_customers(df: pd.DataFrame, update_rate: float = 0.05, seed: int = None) -> pd.DataFrame:
-    """Randomly update fields for a small subset of customers."""
-    fake = Faker('en_GB')
-    if seed is not None:
-        Faker.seed(seed)
-        random.seed(seed)
-
-    professions_provider = DynamicProvider(
-        provider_name="profession",
-        elements=[
-            "Engineer", "Graphic Designer", "Architect", "Civil engineer", "Software Developer",
-            "Laboratory Technician", "Mechanical engineer", "Scientist", "Veterinarian", "Artist",
-            "Bricklayer", "Producers and Directors", "Plasterer", "Nurse", "Roofer", "Musician", "Social Worker",
-            "Physiotherapist", "Health professional", "Teacher", "Radiographer", "Paramedic", "Physician", "Welder",
-            "Archaeologist", "Association football manager", "Technician", "Electrician", "Engineering technician",
-            "Accountant", "Painter and decorator", "Librarian", "Private investigator", "Pharmacy Technician",
-            "Technology specialist", "Quantity surveyor", "Air traffic controller", "Financial Manager",
-            "Official", "Chef", "Plumber", "Aviator", "Broker", "Police officer", "Designer", "Optician",
-            "Adviser", "Trader", "Consultant", "Chartered Surveyor", "Pipefitter"
-        ]
-    )
-    fake.add_provider(professions_provider)
 
-    df_updated = df.copy()
+def bulk_update_customers(
+    df: Union[pd.DataFrame, pa.Table],
+    update_rate: float = 0.05,
+    seed: Optional[int] = None
+) -> Tuple[Union[pd.DataFrame, pa.Table], Union[pd.Series, pa.ChunkedArray]]:
+    """Randomly update profession, postcode & email for a subset of customers, in one indexed write.
+
+    Rows to change are picked by position in a single draw, so no per-customer lookup is needed.
+    The draws are the same for a DataFrame or an Arrow table, so both give the same customers.
+
+    Args:
+        df (Union[pd.DataFrame, pa.Table]): Customer data, as from `generate_base_customers`
+        update_rate (float): Fraction of customers to update
+        seed (Optional[int]): Seed for reproducibility
+
+    Returns:
+        Tuple[Union[pd.DataFrame, pa.Table], Union[pd.Series, pa.ChunkedArray]]: Updated copy of `df`, and the
+            `customerID`s that changed
+    """
+    rng = np.random.default_rng(seed)
+
     num_to_update = int(len(df) * update_rate)
-    update_ids = random.sample(list(df['customerID']), num_to_update)
+    rows = rng.choice(len(df), size=num_to_update, replace=False)
+
+    # generate all replacement values up front
+    profession_codes = rng.integers(0, len(PROFESSIONS), size=num_to_update)
+    postcodes = sample_pool('postcode', rng, num_to_update)
+    # new e-mails are drawn from those no customer has yet, so they stay unique
+    emails = sample_pool('email', rng, num_to_update, exclude=df['emailAddress'])
 
-    for cid in tqdm(update_ids, desc="Applying customer updates"):
-        idx = df_updated[df_updated['customerID'] == cid].index[0]
-        df_updated.at[idx, 'profession'] = fake.profession()
-        df_updated.at[idx, 'postcode'] = fake.postcode()
-        df_updated.at[idx, 'emailAddress'] = fake.email()
+    if isinstance(df, pa.Table):
+        return _update_rows_arrow(df, rows, profession_codes, postcodes, emails)
 
+    new_values = np.empty((num_to_update, 3), dtype=object)
+    new_values[:, 0] = np.array(PROFESSIONS, dtype=object)[profession_codes]
+    new_values[:, 1] = postcodes
+    new_values[:, 2] = emails
+
+    df_updated = df.copy()
+    columns = [df_updated.columns.get_loc(col) for col in ('profession', 'postcode', 'emailAddress')]
+    df_updated.iloc[rows, columns] = new_values
+
+    return df_updated, df_updated['customerID'].iloc[rows]
+
+
+def _update_rows_arrow(
+    tbl: pa.Table,
+    rows: np.ndarray,
+    profession_codes: np.ndarray,
+    postcodes: np.ndarray,
+    emails: np.ndarray
+) -> Tuple[pa.Table, pa.ChunkedArray]:
+    """Write replacement values into `rows` of an Arrow customer table, one column at a time."""
+    mask = np.zeros(tbl.num_rows, dtype=bool)
+    mask[rows] = True
+    mask = pa.array(mask)
+    in_row_order = np.argsort(rows)  # `replace_with_mask` consumes replacements in row order
+
+    # professions are codes into `PROFESSIONS`, so only the int8 codes change
+    codes = tbl.column('profession').combine_chunks().indices.to_numpy(zero_copy_only=False).copy()
+    codes[rows] = profession_codes
+    profession = pa.DictionaryArray.from_arrays(pa.array(codes, pa.int8()), _PROFESSION_NAMES)
+    tbl = tbl.set_column(tbl.schema.get_field_index('profession'), 'profession', profession)
+
+    for column, values in (('postcode', postcodes), ('emailAddress', emails)):
+        updated = pc.replace_with_mask(tbl.column(column).combine_chunks(), mask, pa.array(values[in_row_order], pa.string()))
+        tbl = tbl.set_column(tbl.schema.get_field_index(column), column, updated)
+
+    return tbl, tbl.column('customerID').take(pa.array(rows))
+
+
+def randomly_update_customers(
+    df: Union[pd.DataFrame, pa.Table],
+    update_rate: float = 0.05,
+    seed: int = None
+) -> Union[pd.DataFrame, pa.Table]:
+    """Randomly update fields for a small subset of customers."""
+    df_updated, _ = bulk_update_customers(df, update_rate=update_rate, seed=seed)
     return df_updated
 
 
@@ -0,0 +1,137 @@
+# imports
+import os
+import math
+import functools
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import faker
+from faker import Faker
+
+# Constants
+POOL_SIZE = 50_000  # values per vocabulary (the least, for those in `UNIQUE_POOLS`)
+POOL_SEED = 0
+POOL_CACHE_DIR = os.getenv(
+    'FAKER_POOL_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ducklake', 'faker_pools')
+)
+
+# Faker methods backing each vocabulary
+POOL_PROVIDERS = {
+    "first_name": lambda fake: fake.first_name(),
+    "last_name": lambda fake: fake.last_name(),
+    "name": lambda fake: fake.name(),
+    "postcode": lambda fake: fake.postcode(),
+    "email": lambda fake: fake.email(),
+}
+
+# vocabularies of values that identify a person, and how to tell apart the `i`-th repeat of a value.
+# Faker repeats about 9% of its e-mails within 50,000, and drawing with replacement repeats more, so these
+# pools are made unique, sized to at least the number of values drawn, and drawn without replacement: no
+# two values of one draw are the same, nor any value passed as already taken (see `sample_pool`). Other
+# vocabularies (names, postcodes) are meant to repeat
+UNIQUE_POOLS = {
+    "email": lambda value, i: value.replace("@", f"{i}@", 1),
+}
+
+
+def _pool_path(kind: str, locale: str, seed: int, size: int) -> str:
+    """On-disk location of a pool. Includes the Faker version, as its output may change between releases."""
+    unique = "_unique" if kind in UNIQUE_POOLS else ""
+    return os.path.join(POOL_CACHE_DIR, f"{kind}_{locale}_{seed}_{size}{unique}_faker{faker.VERSION}.arrow")
+
+
+def pool_size(kind: str, n: int) -> int:
+    """Size of the vocabulary to draw `n` values of `kind` from: `POOL_SIZE`, or for `UNIQUE_POOLS` the
+    least doubling of it that holds `n` values, so that a few sizes of pool cover every draw size."""
+    if kind not in UNIQUE_POOLS or n <= POOL_SIZE:
+        return POOL_SIZE
+    return POOL_SIZE * 2 ** math.ceil(math.log2(n / POOL_SIZE))
+
+
+def _make_unique(values: list, distinguish) -> list:
+    """Tell apart repeated values with `distinguish(value, i)`, for i = 2, 3, ..., keeping first occurrences as they are."""
+    seen = set(values)
+    unique, kept = [], set()
+    for value in values:
+        candidate, i = value, 1
+        while candidate in kept or (i > 1 and candidate in seen):
+            i += 1
+            candidate = distinguish(value, i)
+        kept.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+@functools.lru_cache(maxsize=None)
+def get_pool(kind: str, locale: str = 'en_GB', seed: int = POOL_SEED, size: int = POOL_SIZE) -> np.ndarray:
+    """Load a pre-generated vocabulary of Faker values, generating & caching it to disk on first use.
+
+    Args:
+        kind (str): Vocabulary to load, one of `POOL_PROVIDERS`
+        locale (str): Faker locale
+        seed (int): Seed used to generate the vocabulary
+        size (int): Number of values in the vocabulary
+
+    Returns:
+        np.ndarray: Object array of `size` values
+    """
+    path = _pool_path(kind, locale, seed, size)
+    if os.path.exists(path):
+        return feather.read_table(path).column(kind).to_numpy(zero_copy_only=False)
+
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    values = [POOL_PROVIDERS[kind](fake) for _ in range(size)]
+    if kind in UNIQUE_POOLS:
+        values = _make_unique(values, UNIQUE_POOLS[kind])
+
+    # write to a temporary file first, so concurrent processes never read a partly written pool
+    os.makedirs(POOL_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(pa.table({kind: pa.array(values, pa.string())}), tmp_path)
+    os.replace(tmp_path, path)
+    return np.array(values, dtype=object)
+
+
+def sample_pool(kind: str, rng: np.random.Generator, n: int, locale: str = 'en_GB', exclude=None) -> np.ndarray:
+    """Draw `n` values from a cached vocabulary, using vectorized index draws: with replacement, or for
+    `UNIQUE_POOLS` without, from a pool of at least `n` unique values (see `pool_size`), leaving out any
+    value in `exclude`, e.g. those already assigned, so a draw never repeats one.
+
+    Args:
+        kind (str): Vocabulary to sample, one of `POOL_PROVIDERS`
+        rng (np.random.Generator): Seeded generator driving the draws
+        n (int): Number of values to draw
+        locale (str): Faker locale
+        exclude: Values not to draw (array-like or Arrow array), for `UNIQUE_POOLS` only
+
+    Returns:
+        np.ndarray: Object array of `n` values
+    """
+    if kind not in UNIQUE_POOLS:
+        pool = get_pool(kind, locale)
+        return pool[rng.integers(0, len(pool), size=n)]
+
+    pool = get_pool(kind, locale, size=pool_size(kind, n + (len(exclude) if exclude is not None else 0)))
+    if exclude is None:
+        return pool[rng.choice(len(pool), size=n, replace=False)]
+    excluded = _as_string_array(exclude)
+    candidates = np.flatnonzero(~pc.is_in(pa.array(pool, pa.string()), value_set=excluded).to_numpy(zero_copy_only=False))
+    return pool[candidates[rng.choice(len(candidates), size=n, replace=False)]]
+
+
+def _as_string_array(values) -> pa.Array:
+    """Values as one Arrow string array, for a hash lookup."""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values.cast(pa.string()) if isinstance(values, pa.Array) else pa.array(np.asarray(values, dtype=object), pa.string())
+
+
+def random_dates(rng: np.random.Generator, start, end, n: int, as_object: bool = True) -> np.ndarray:
+    """Draw `n` uniformly distributed dates between `start` and `end` (inclusive), as `datetime.date` objects
+    (or, with `as_object=False`, as a `datetime64[D]` array, which converts to Arrow `date32` without a copy per value)."""
+    days = rng.integers(0, (end - start).days, size=n, endpoint=True)
+    dates = np.datetime64(start, 'D') + days
+    return dates.astype(object) if as_object else dates
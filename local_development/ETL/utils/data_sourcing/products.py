@@ -1,10 +1,12 @@
 # imports
 import pandas as pd
-from faker import Faker
 import datetime
-import random
-from typing import Optional
+import numpy as np
+import pyarrow as pa
+from typing import Optional, Union
 from tqdm import tqdm
+from .pools import random_dates
+from .transactions import CATEGORY_TYPE, PRICE_TYPE
 
 # Constants
 PRODUCT_PRICES = {
@@ -28,13 +30,23 @@ PRODUCT_PRICES = {
     "WiFi Range Extender": 30,
 }
 
+# Arrow schema of the product catalog
+PRODUCT_SCHEMA = pa.schema([
+    ("product_id", pa.int64()),
+    ("product_name", CATEGORY_TYPE),
+    ("category", CATEGORY_TYPE),
+    ("price", PRICE_TYPE),
+    ("launch_date", pa.date32()),
+])
+
 
 def get_product_catalog(
     product_prices: dict = PRODUCT_PRICES,
     seed: Optional[int] = 123,
     base_product_id: int = 1000,
-    show_progress: bool = False
-) -> pd.DataFrame:
+    show_progress: bool = False,
+    as_arrow: bool = False
+) -> Union[pd.DataFrame, pa.Table]:
     """Generate a product catalog from a product price map.
 
     Args:
@@ -42,13 +54,15 @@ def get_product_catalog(
         seed (Optional[int]): Seed for reproducibility
         base_product_id (int): Starting product ID number
         show_progress (bool): Whether to show progress bar
+        as_arrow (bool): Return a `pyarrow.Table` rather than a pandas DataFrame
 
     Returns:
-        pd.DataFrame: Product catalog
+        Union[pd.DataFrame, pa.Table]: Product catalog, with schema `PRODUCT_SCHEMA`
     """
-    fake = Faker()
-    Faker.seed(seed)
-    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    # fixed, like the customer join dates, so a seed gives the same catalog whichever day it runs
+    launch_start = datetime.date(2020, 1, 1)
+    launch_end = datetime.date(2024, 12, 31)
 
     # Category assignment map
     category_map = {
@@ -74,6 +88,7 @@ def get_product_catalog(
 
     rows = []
     product_names = list(product_prices.keys())
+    launch_dates = random_dates(rng, launch_start, launch_end, len(product_names), as_object=False)
     iterator = tqdm(enumerate(product_names, start=base_product_id), total=len(product_names), desc="Generating product catalog") if show_progress else enumerate(product_names, start=base_product_id)
 
     for product_id, product_name in iterator:
@@ -81,11 +96,18 @@ def get_product_catalog(
             "product_id": product_id,
             "product_name": product_name,
             "category": category_map.get(product_name, "General"),
-            "price": product_prices[product_name],
-            "launch_date": fake.date_between(start_date='-5y', end_date='today')
+            "price": product_prices[product_name]
         })
 
-    return pd.DataFrame(rows)
+    # typed columns: low-cardinality strings as dictionaries (int8 codes), prices rounded to the cent
+    table = pa.Table.from_arrays([
+        pa.array([row["product_id"] for row in rows], pa.int64()),
+        pa.array([row["product_name"] for row in rows], CATEGORY_TYPE),
+        pa.array([row["category"] for row in rows], CATEGORY_TYPE),
+        pa.array(np.array([row["price"] for row in rows], dtype=np.float64)).cast(PRICE_TYPE),
+        pa.array(launch_dates, pa.date32()),
+    ], schema=PRODUCT_SCHEMA)
+    return table if as_arrow else table.to_pandas()
 
 
 # Example usage
@@ -1,8 +1,11 @@
 import pandas as pd
-from faker import Faker
-import random
-from typing import Optional
+import datetime
+import numpy as np
+import pyarrow as pa
+from typing import Optional, Union
 from tqdm import tqdm
+from .pools import sample_pool, random_dates
+from .transactions import CATEGORY_TYPE
 
 
 UK_CITIES = [
@@ -10,23 +13,36 @@ UK_CITIES = [
     "Leeds", "Sheffield", "Bristol", "Edinburgh", "Newcastle"
 ]
 
+# Arrow schema of the store metadata. `store_id` matches the (int32) store id of transactions
+STORE_SCHEMA = pa.schema([
+    ("store_id", pa.int32()),
+    ("store_name", CATEGORY_TYPE),
+    ("manager", pa.string()),
+    ("opened_date", pa.date32()),
+])
+
 
 def get_stores(
     seed: Optional[int] = 100,
-    show_progress: bool = False
-) -> pd.DataFrame:
+    show_progress: bool = False,
+    as_arrow: bool = False
+) -> Union[pd.DataFrame, pa.Table]:
     """Generate a fixed set of 10 fake retail stores using UK city names.
 
     Args:
         seed (Optional[int]): Random seed for reproducibility
         show_progress (bool): Whether to show a progress bar
+        as_arrow (bool): Return a `pyarrow.Table` rather than a pandas DataFrame
 
     Returns:
-        pd.DataFrame: Store metadata
+        Union[pd.DataFrame, pa.Table]: Store metadata, with schema `STORE_SCHEMA`
     """
-    fake = Faker("en_GB")
-    Faker.seed(seed)
-    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    # fixed, like the customer join dates, so a seed gives the same stores whichever day it runs
+    opened_start = datetime.date(2015, 1, 1)
+    opened_end = datetime.date(2023, 12, 31)
+    managers = sample_pool('name', rng, len(UK_CITIES))
+    opened_dates = random_dates(rng, opened_start, opened_end, len(UK_CITIES), as_object=False)
 
     rows = []
     iterator = tqdm(enumerate(UK_CITIES, start=1), total=10, desc="Generating stores") if show_progress else enumerate(UK_CITIES, start=1)
@@ -35,11 +51,16 @@ def get_stores(
         rows.append({
             "store_id": store_id,
             "store_name": f"{city} Store",
-            "manager": fake.name(),
-            "opened_date": fake.date_between(start_date='-10y', end_date='-1y')
+            "manager": managers[store_id - 1]
         })
 
-    return pd.DataFrame(rows)
+    table = pa.Table.from_arrays([
+        pa.array([row["store_id"] for row in rows], pa.int32()),
+        pa.array([row["store_name"] for row in rows], CATEGORY_TYPE),
+        pa.array([row["manager"] for row in rows], pa.string()),
+        pa.array(opened_dates, pa.date32()),
+    ], schema=STORE_SCHEMA)
+    return table if as_arrow else table.to_pandas()
 
 
 # Example usage
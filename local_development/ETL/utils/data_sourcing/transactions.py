@@ -5,8 +5,10 @@ from faker.providers import DynamicProvider
 import datetime
 import random
 import uuid
-from typing import Optional
+from typing import Iterator, Optional, Union
 from tqdm import tqdm
+import numpy as np
+import pyarrow as pa
 
 # Constants
 PRODUCT_PRICES = {
@@ -29,6 +31,36 @@ PRODUCT_PRICES = {
     "Projector": 300,
     "WiFi Range Extender": 30,
 }
+CHANNELS = ["Online", "In-Store"]
+ID_SCHEMES = ("uuid4", "uuid7")  # random, or time-ordered (ids sort, and so cluster, by transaction time)
+CHANNEL_WEIGHTS = [0.7, 0.3]
+NUM_STORES = 10
+CUSTOMER_ID_RANGE = (10000, 150000)
+
+# Arrow type of low-cardinality string columns: int8 codes into a small dictionary of values, which pandas
+# reads as a Categorical and DuckDB as (dictionary-encoded) VARCHAR
+CATEGORY_TYPE = pa.dictionary(pa.int8(), pa.string())
+# exact money types: a unit price, and a line-item amount (up to 6 units)
+PRICE_TYPE = pa.decimal128(10, 2)
+AMOUNT_TYPE = pa.decimal128(12, 2)
+
+# Arrow schema of the line-item output, matching the columns of `get_transactions`
+TRANSACTION_SCHEMA = pa.schema([
+    ("transaction_id", pa.uuid()),  # 16-byte fixed binary, read by DuckDB as UUID
+    ("customerID", pa.int64()),
+    ("transaction_TS", pa.timestamp("us")),
+    ("Product", CATEGORY_TYPE),
+    ("volume", pa.int64()),
+    ("channel", CATEGORY_TYPE),
+    ("store_id", pa.int32()),  # null for online transactions
+    ("Price", PRICE_TYPE),
+    ("txn_amount", AMOUNT_TYPE),
+])
+
+# lookup tables used by the vectorized generator
+_PRODUCT_NAMES = pa.array(list(PRODUCT_PRICES.keys()), pa.string())
+_PRODUCT_PRICE_ARRAY = np.array(list(PRODUCT_PRICES.values()), dtype=np.float64)
+_CHANNEL_NAMES = pa.array(CHANNELS, pa.string())
 
 
 def get_transactions(
@@ -102,12 +134,155 @@ def get_transactions(
     return df
 
 
+def _to_epoch_us(value: Union[datetime.date, datetime.datetime]) -> int:
+    """Convert a (naive) date or datetime to microseconds since the unix epoch."""
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return (value - datetime.datetime(1970, 1, 1)) // datetime.timedelta(microseconds=1)
+
+
+def _uuid_array(rng: np.random.Generator, n: int, scheme: str = "uuid4", ts_us: np.ndarray = None) -> pa.Array:
+    """Draw `n` UUIDs from `rng` as a 16-byte `arrow.uuid` array, without a per-row loop.
+
+    Args:
+        rng (np.random.Generator): Source of the random bits
+        n (int): Number of ids
+        scheme (str): "uuid4" (random) or "uuid7" (48-bit millisecond timestamp, then random bits)
+        ts_us (np.ndarray): Per-id timestamps, in microseconds since the unix epoch (uuid7 only)
+
+    Returns:
+        pa.Array: UUIDs, with type `pa.uuid()`
+    """
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    if scheme == "uuid7":
+        # big-endian unix milliseconds in the first 6 bytes, so ids sort by time
+        raw[:, :6] = ((ts_us // 1000)[:, None] >> np.arange(40, -1, -8)) & 0xFF
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x70  # version 7
+    else:
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    storage = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), n, [None, pa.py_buffer(raw.tobytes())])
+    return pa.ExtensionArray.from_storage(pa.uuid(), storage)
+
+
+def _generate_transaction_batch(
+    rng: np.random.Generator,
+    num_transactions: int,
+    start_us: int,
+    end_us: int,
+    id_scheme: str = "uuid4"
+) -> pa.RecordBatch:
+    """Generate the line items for `num_transactions` baskets as a single Arrow record batch."""
+    n = num_transactions
+    num_products = len(_PRODUCT_PRICE_ARRAY)
+
+    # one draw per basket
+    customer_ids = rng.integers(*CUSTOMER_ID_RANGE, size=n, endpoint=True)
+    transaction_ts = rng.integers(start_us, end_us, size=n, endpoint=True)
+    transaction_ids = _uuid_array(rng, n, id_scheme, transaction_ts)
+    num_items = rng.integers(1, 5, size=n, endpoint=True)
+    channel_idx = rng.choice(len(CHANNELS), size=n, p=CHANNEL_WEIGHTS)
+    store_ids = rng.integers(1, NUM_STORES, size=n, endpoint=True)
+    in_store = channel_idx == CHANNELS.index("In-Store")
+
+    # sample products without replacement: a random permutation per basket, keeping the first `num_items`
+    permutations = np.argsort(rng.random((n, num_products)), axis=1)
+    product_idx = permutations[np.arange(num_products) < num_items[:, None]]
+
+    # expand basket level values out to one row per line item
+    basket_idx = np.repeat(np.arange(n), num_items)
+    volume = rng.integers(1, 6, size=len(product_idx), endpoint=True)
+    price = _PRODUCT_PRICE_ARRAY[product_idx]  # array lookup instead of a join
+
+    return pa.RecordBatch.from_arrays([
+        transaction_ids.take(pa.array(basket_idx)),
+        pa.array(customer_ids[basket_idx], pa.int64()),
+        pa.array(transaction_ts[basket_idx], pa.timestamp("us")),
+        pa.DictionaryArray.from_arrays(pa.array(product_idx, pa.int8()), _PRODUCT_NAMES),
+        pa.array(volume, pa.int64()),
+        pa.DictionaryArray.from_arrays(pa.array(channel_idx[basket_idx], pa.int8()), _CHANNEL_NAMES),
+        pa.array(store_ids[basket_idx], pa.int32(), mask=~in_store[basket_idx]),
+        pa.array(price).cast(PRICE_TYPE),  # rounded to the cent, so float error never reaches the table
+        pa.array(volume * price).cast(AMOUNT_TYPE),
+    ], schema=TRANSACTION_SCHEMA)
+
+
+def iter_transaction_batches(
+    start: datetime.date,
+    end: datetime.date,
+    num_transactions: int = 100_000,
+    seed: Optional[int] = None,
+    batch_size: int = 100_000,
+    show_progress: bool = False,
+    id_scheme: str = "uuid4"
+) -> Iterator[pa.RecordBatch]:
+    """Generate fake transaction line items in batches, using vectorized NumPy draws.
+
+    Each batch holds the line items of up to `batch_size` transactions, and is drawn from its own
+    child of a `numpy.random.SeedSequence`, so output is deterministic for a given seed and batch size.
+
+    Args:
+        start (datetime.date): Start date for transaction timestamps
+        end (datetime.date): End date for transaction timestamps
+        num_transactions (int): Number of unique transactions to generate
+        seed (Optional[int]): Seed value for reproducibility (defaults to one derived from `start`)
+        batch_size (int): Maximum number of transactions per batch
+        show_progress (bool): Whether to show a progress bar
+        id_scheme (str): Transaction id scheme, one of `ID_SCHEMES`
+
+    Yields:
+        pa.RecordBatch: Line-item transactions, with schema `TRANSACTION_SCHEMA`
+    """
+    if seed is None:
+        seed = int(start.strftime("%Y%m%d"))
+    start_us, end_us = _to_epoch_us(start), _to_epoch_us(end)
+
+    batch_sizes = [min(batch_size, num_transactions - i) for i in range(0, num_transactions, batch_size)]
+    child_seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    iterator = zip(batch_sizes, child_seeds)
+    if show_progress:
+        iterator = tqdm(iterator, total=len(batch_sizes), desc="Generating transaction batches")
+
+    for size, child_seed in iterator:
+        yield _generate_transaction_batch(np.random.default_rng(child_seed), size, start_us, end_us, id_scheme)
+
+
+def generate_transactions(
+    start: datetime.date,
+    end: datetime.date,
+    num_transactions: int = 100_000,
+    seed: Optional[int] = None,
+    batch_size: int = 100_000,
+    as_arrow: bool = False,
+    show_progress: bool = False,
+    id_scheme: str = "uuid4"
+) -> Union[pd.DataFrame, pa.Table]:
+    """Vectorized equivalent of `get_transactions`, with the same columns and distributions.
+
+    Args:
+        start (datetime.date): Start date for transaction timestamps
+        end (datetime.date): End date for transaction timestamps
+        num_transactions (int): Number of unique transactions to generate
+        seed (Optional[int]): Seed value for reproducibility (defaults to one derived from `start`)
+        batch_size (int): Maximum number of transactions generated per batch
+        as_arrow (bool): Return a `pyarrow.Table` rather than a pandas DataFrame
+        show_progress (bool): Whether to show a progress bar
+        id_scheme (str): Transaction id scheme, one of `ID_SCHEMES`
+
+    Returns:
+        Union[pd.DataFrame, pa.Table]: Line-item transactions (with `uuid.UUID` ids & `decimal.Decimal` prices in a DataFrame)
+    """
+    batches = iter_transaction_batches(start, end, num_transactions, seed, batch_size, show_progress, id_scheme)
+    table = pa.Table.from_batches(batches, schema=TRANSACTION_SCHEMA)
+    return table if as_arrow else table.to_pandas()
+
+
 # Example usage
 if __name__ == "__main__":
     today = datetime.date.today()
     tomorrow = today + datetime.timedelta(days=1)
 
-    df = get_transactions(
+    df = generate_transactions(
         start=today,
         end=tomorrow,
         num_transactions=10_000,
@@ -0,0 +1,45 @@
+# imports
+import duckdb
+
+# Constants
+DEFAULT_ROW_GROUP_SIZE = 122_880  # DuckDB's default, in rows
+
+# physical layout of each table's Parquet files within a partition. Rows are written sorted by `sort_by`, so
+# the min/max statistics of each row group cover a narrow range of those columns, and filters on them can
+# skip most row groups. Smaller row groups prune more finely, at the cost of more per-group overhead
+TABLE_LAYOUTS = {
+    "retail_bronze.transactions_src_raw": {"sort_by": ("store_id", "transaction_TS"), "row_group_size": 16_384},
+    "retail_bronze.customer_src_raw": {"sort_by": ("customerID",), "row_group_size": 2_048},
+    "retail_bronze.customer_cdc_raw": {"sort_by": ("customerID",), "row_group_size": 2_048},
+    "retail_bronze.products_src_raw": {"sort_by": ("product_id",), "row_group_size": DEFAULT_ROW_GROUP_SIZE},
+    "retail_bronze.stores_src_raw": {"sort_by": ("store_id",), "row_group_size": DEFAULT_ROW_GROUP_SIZE},
+}
+
+
+def sort_columns(table: str) -> tuple:
+    """Columns `table` is written sorted by, or () if it has no sort order."""
+    return TABLE_LAYOUTS.get(table, {}).get("sort_by", ())
+
+
+def order_by_clause(table: str) -> str:
+    """`ORDER BY` clause to write `table` in its configured sort order, or "" if it has none."""
+    sort_by = sort_columns(table)
+    return f"ORDER BY {', '.join(sort_by)}" if sort_by else ""
+
+
+def apply_layout(con: duckdb.DuckDBPyConnection, table: str, catalog: str = "retail_ducklake"):
+    """Set the configured Parquet row group size as a DuckLake option of `table`, e.g. right after creating it.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        table (str): Table to configure, as `schema.table`
+        catalog (str): Name the DuckLake is attached as
+    """
+    layout = TABLE_LAYOUTS.get(table)
+    if layout is None:
+        return
+    schema_name, table_name = table.split(".")
+    con.execute(
+        f"CALL {catalog}.set_option('parquet_row_group_size', ?, schema => ?, table_name => ?)",
+        [str(layout["row_group_size"]), schema_name, table_name]
+    )
@@ -0,0 +1,241 @@
+# imports
+import os
+import time
+import datetime
+import duckdb
+from typing import Optional
+from utils.partitions import COMPACTION_LOG, ensure_compaction_log, log_compaction
+from utils.layout import order_by_clause
+from utils.commits import run_in_transaction
+from utils import metrics
+
+# Constants
+TARGET_FILE_BYTES = 64 * 1024 ** 2  # partitions averaging smaller files than this are merged
+
+
+def _metadata(catalog: str) -> str:
+    return f"__ducklake_metadata_{catalog}"
+
+
+def data_path(con: duckdb.DuckDBPyConnection, catalog: str = "retail_ducklake") -> str:
+    """Data path stored in the DuckLake catalog."""
+    return con.execute(
+        f"SELECT value FROM {_metadata(catalog)}.ducklake_metadata WHERE key = 'data_path'"
+    ).fetchone()[0]
+
+
+def disk_usage(path: str) -> dict:
+    """Number & total bytes of the Parquet files under `path`."""
+    files, size = 0, 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            if name.endswith(".parquet"):
+                files += 1
+                size += os.path.getsize(os.path.join(root, name))
+    return {"files": files, "bytes": size}
+
+
+def partition_files(con: duckdb.DuckDBPyConnection, catalog: str = "retail_ducklake") -> list:
+    """Live data & delete files per table partition, from the DuckLake metadata catalog.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        list: Per table & partition value (None for unpartitioned tables), a dict of its partition column,
+            data file count & bytes, and delete file count & bytes
+    """
+    metadata = _metadata(catalog)
+    rows = con.execute(f"""
+    WITH tables AS (
+        SELECT t.table_id, s.schema_name || '.' || t.table_name AS table_name
+        FROM {metadata}.ducklake_table AS t
+        JOIN {metadata}.ducklake_schema AS s USING (schema_id)
+        WHERE t.end_snapshot IS NULL AND s.end_snapshot IS NULL
+    ),
+    partition_columns AS (
+        SELECT pc.table_id, c.column_name
+        FROM {metadata}.ducklake_partition_column AS pc
+        JOIN {metadata}.ducklake_partition_info AS pi USING (partition_id, table_id)
+        JOIN {metadata}.ducklake_column AS c ON c.table_id = pc.table_id AND c.column_id = pc.column_id
+        WHERE pi.end_snapshot IS NULL AND c.end_snapshot IS NULL AND pc.partition_key_index = 0
+    ),
+    deletes AS (
+        SELECT data_file_id, count(*) AS delete_files, sum(file_size_bytes) AS delete_bytes
+        FROM {metadata}.ducklake_delete_file
+        WHERE end_snapshot IS NULL
+        GROUP BY data_file_id
+    )
+    SELECT
+        t.table_name,
+        pc.column_name,
+        pv.partition_value,
+        count(*) AS data_files,
+        sum(f.file_size_bytes) AS data_bytes,
+        coalesce(sum(d.delete_files), 0) AS delete_files,
+        coalesce(sum(d.delete_bytes), 0) AS delete_bytes
+    FROM {metadata}.ducklake_data_file AS f
+    JOIN tables AS t USING (table_id)
+    LEFT JOIN partition_columns AS pc USING (table_id)
+    LEFT JOIN {metadata}.ducklake_file_partition_value AS pv
+        ON pv.data_file_id = f.data_file_id AND pv.partition_key_index = 0
+    LEFT JOIN deletes AS d ON d.data_file_id = f.data_file_id
+    WHERE f.end_snapshot IS NULL
+    GROUP BY ALL
+    ORDER BY ALL
+    """).fetchall()
+    keys = ("table", "partition_column", "partition", "data_files", "data_bytes", "delete_files", "delete_bytes")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def file_report(con: duckdb.DuckDBPyConnection, catalog: str = "retail_ducklake") -> dict:
+    """Live files & bytes per table (from the catalog), plus every Parquet file on disk under the data path."""
+    tables = {}
+    for part in partition_files(con, catalog):
+        table = tables.setdefault(part["table"], {"partitions": 0, "data_files": 0, "data_bytes": 0, "delete_files": 0, "delete_bytes": 0})
+        table["partitions"] += 1
+        for key in ("data_files", "data_bytes", "delete_files", "delete_bytes"):
+            table[key] += part[key]
+    return {"tables": tables, "disk": disk_usage(data_path(con, catalog))}
+
+
+def compact(
+    con: duckdb.DuckDBPyConnection,
+    target_file_bytes: int = TARGET_FILE_BYTES,
+    tables: list = None,
+    dry_run: bool = False,
+    catalog: str = "retail_ducklake"
+) -> list:
+    """Rewrite every partition that is split over small files, or that carries delete files.
+
+    A partition is rewritten in one transaction that deletes it and inserts it back from the snapshot the
+    transaction started at (`AT (VERSION => ...)`), streamed in SQL rather than read into memory, so it ends
+    up in as few files as DuckLake writes for its size, with deleted rows dropped and rows in the table's
+    configured sort order (see `utils.layout`). A writer committing to the partition meanwhile makes the
+    commit conflict, and the rewrite is retried from the newer snapshot (see `utils.commits`), so no write
+    is lost. Each rewrite logs itself in the compaction log in the same transaction, so `changed_partitions`
+    does not report compacted partitions as changed to incremental consumers (silver & gold builds), even
+    if the run stops part way. The compaction log itself is never compacted, as the snapshots that added
+    its files are how those consumers recognise compactions.
+    The replaced files stay referenced by older snapshots until those are expired, and on disk until they
+    are cleaned up. Unpartitioned tables are treated as a single partition.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        target_file_bytes (int): Average file size below which a multi-file partition is merged
+        tables (list): Tables to compact, as `schema.table` (defaults to every table)
+        dry_run (bool): Only list the partitions that would be rewritten
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        list: The partitions rewritten (or to rewrite), with their file counts & bytes before
+    """
+    candidates = [
+        part for part in partition_files(con, catalog)
+        if (tables is None or part["table"] in tables) and part["table"] != COMPACTION_LOG
+        and (part["delete_files"] > 0 or (part["data_files"] > 1 and part["data_bytes"] / part["data_files"] < target_file_bytes))
+    ]
+    if dry_run:
+        return candidates
+
+    ensure_compaction_log(con, catalog)
+    for part in candidates:
+        with metrics.stage("compact") as compact_stage:
+            part["rows_written"] = run_in_transaction(con, lambda con: _compact_partition(con, part, catalog))
+            compact_stage["rows"] = part["rows_written"]
+        print(f"Compacted `{part['table']}` {part['partition'] or ''}: "
+              f"{part['data_files']} data + {part['delete_files']} delete files -> {part['rows_written']:,} rows")
+    return candidates
+
+
+def _compact_partition(con: duckdb.DuckDBPyConnection, part: dict, catalog: str) -> int:
+    """Rewrite one partition and log the rewrite, inside the caller's transaction, so both commit together."""
+    rows_written = _rewrite(con, part["table"], part["partition_column"], part["partition"], catalog)
+    log_compaction(con, part["table"], part["partition"], catalog)
+    return rows_written
+
+
+def _rewrite(con: duckdb.DuckDBPyConnection, table: str, partition_column: Optional[str], partition: Optional[str], catalog: str) -> int:
+    """Replace the rows of one partition (or of a whole unpartitioned table) with themselves, inside the
+    caller's transaction, reading them as of the snapshot the transaction reads at (`current_snapshot()`,
+    unlike the latest committed one, is the same snapshot the DELETE sees)."""
+    snapshot_id = con.execute(f"FROM {catalog}.current_snapshot()").fetchone()[0]
+    where, params = (f"WHERE {partition_column} = ?", [partition]) if partition_column else ("", [])
+    con.execute(f"DELETE FROM {catalog}.{table} {where}", params)
+    return con.execute(f"""
+    INSERT INTO {catalog}.{table}
+    SELECT * FROM {catalog}.{table} AT (VERSION => {int(snapshot_id)}) {where} {order_by_clause(table)}
+    """, params).fetchone()[0]
+
+
+def expire_snapshots(
+    con: duckdb.DuckDBPyConnection,
+    retain: datetime.timedelta,
+    dry_run: bool = False,
+    catalog: str = "retail_ducklake"
+) -> int:
+    """Expire snapshots older than `retain`, so the files only they reference can be cleaned up.
+
+    Time travel to expired snapshots is no longer possible.
+
+    Returns:
+        int: Number of snapshots expired (or that would be)
+    """
+    older_than = datetime.datetime.now() - retain
+    return len(con.execute(
+        f"CALL ducklake_expire_snapshots('{catalog}', older_than => ?, dry_run => ?)", [older_than, dry_run]
+    ).fetchall())
+
+
+def cleanup_old_files(
+    con: duckdb.DuckDBPyConnection,
+    retain: datetime.timedelta,
+    dry_run: bool = False,
+    catalog: str = "retail_ducklake"
+) -> int:
+    """Delete files no longer referenced by any snapshot, that were scheduled for deletion over `retain` ago.
+
+    Returns:
+        int: Number of files deleted (or that would be)
+    """
+    older_than = datetime.datetime.now() - retain
+    return len(con.execute(
+        f"CALL ducklake_cleanup_old_files('{catalog}', older_than => ?, dry_run => ?)", [older_than, dry_run]
+    ).fetchall())
+
+
+def delete_orphaned_files(
+    con: duckdb.DuckDBPyConnection,
+    retain: datetime.timedelta,
+    dry_run: bool = False,
+    catalog: str = "retail_ducklake"
+) -> list:
+    """Delete Parquet files under the data path that the catalog has no record of, e.g. from a failed write.
+
+    Files are matched on name (DuckLake names every file with a fresh UUID), and only files last modified
+    over `retain` ago are considered, so files of writes still in flight are left alone.
+
+    Returns:
+        list: Paths deleted (or that would be)
+    """
+    metadata = _metadata(catalog)
+    known = {row[0] for row in con.execute(f"""
+    SELECT parse_filename(path) FROM {metadata}.ducklake_data_file
+    UNION ALL
+    SELECT parse_filename(path) FROM {metadata}.ducklake_delete_file
+    UNION ALL
+    SELECT parse_filename(path) FROM {metadata}.ducklake_files_scheduled_for_deletion
+    """).fetchall()}
+
+    cutoff = time.time() - retain.total_seconds()
+    orphans = []
+    for root, _, names in os.walk(data_path(con, catalog)):
+        for name in names:
+            path = os.path.join(root, name)
+            if name.endswith(".parquet") and name not in known and os.path.getmtime(path) < cutoff:
+                orphans.append(path)
+    if not dry_run:
+        for path in orphans:
+            os.remove(path)
+    return orphans
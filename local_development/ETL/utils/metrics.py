@@ -0,0 +1,132 @@
+# imports
+import os
+import sys
+import json
+import time
+import uuid
+import resource
+import datetime
+import threading
+import contextlib
+import contextvars
+import duckdb
+import pyarrow as pa
+
+# Constants
+METRICS_PATH = os.getenv("ETL_METRICS_PATH")  # append JSON lines here, rather than to stdout
+METRICS_TO_DUCKLAKE = os.getenv("ETL_METRICS_DUCKLAKE", "0") == "1"
+METRICS_TABLE = "retail_ops.etl_metrics"
+# groups every record emitted by this process, and by the worker processes it starts (which inherit it)
+RUN_ID = os.environ.setdefault("ETL_RUN_ID", str(uuid.uuid4()))
+
+METRICS_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("us")),
+    ("run_id", pa.string()),
+    ("job", pa.string()),
+    ("stage", pa.string()),
+    ("status", pa.string()),
+    ("wall_s", pa.float64()),
+    ("cpu_s", pa.float64()),
+    ("peak_rss_mb", pa.float64()),
+    ("rows", pa.int64()),
+    ("bytes", pa.int64()),
+    ("error", pa.string()),
+])
+
+_current_job = contextvars.ContextVar("etl_job", default=None)
+_records = []
+_emit_lock = threading.Lock()
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+@contextlib.contextmanager
+def job(name: str):
+    """Attribute every stage recorded inside the block (on this thread) to job `name`."""
+    token = _current_job.set(name)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name: str, rows: int = None, nbytes: int = None):
+    """Record wall time, CPU time, peak RSS, rows & bytes for the block, then emit it as a JSON line.
+
+    Yields the record, so `rows` and `bytes` can be filled in once known. CPU time is for the whole
+    process, so includes any other threads working at the same time.
+
+    Args:
+        name (str): Stage name, e.g. "generate" or "insert"
+        rows (int): Rows processed, if known up front
+        nbytes (int): Bytes written, if known up front
+    """
+    record = {"stage": name, "rows": rows, "bytes": nbytes}
+    wall_t0, cpu_t0 = time.perf_counter(), time.process_time()
+    try:
+        yield record
+        record["status"] = "success"
+    except BaseException as e:
+        record["status"] = "failed"
+        record["error"] = repr(e)
+        raise
+    finally:
+        record.update(
+            ts=datetime.datetime.now(),
+            run_id=RUN_ID,
+            job=_current_job.get(),
+            wall_s=round(time.perf_counter() - wall_t0, 6),
+            cpu_s=round(time.process_time() - cpu_t0, 6),
+            peak_rss_mb=round(_peak_rss_mb(), 1),
+        )
+        _emit(record)
+
+
+def _emit(record: dict):
+    """Buffer a record (for `write_to_ducklake`) and write it out as a JSON line."""
+    line = json.dumps({field: record.get(field) for field in METRICS_SCHEMA.names}, default=str)
+    with _emit_lock:
+        _records.append(record)
+        if METRICS_PATH:
+            with open(METRICS_PATH, "a") as f:
+                f.write(line + "\n")
+        else:
+            print(line)
+
+
+def collect(record: dict):
+    """Buffer a record a worker process has already emitted (see `utils.orchestrator`), for `write_to_ducklake`."""
+    with _emit_lock:
+        _records.append(record)
+
+
+def write_to_ducklake(con: duckdb.DuckDBPyConnection, force: bool = False) -> int:
+    """Append buffered records to `retail_ops.etl_metrics`, if enabled via ETL_METRICS_DUCKLAKE=1 (or `force`).
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        force (bool): Write even if not enabled through the environment
+
+    Returns:
+        int: Number of records written
+    """
+    if not (METRICS_TO_DUCKLAKE or force):
+        return 0
+    with _emit_lock:
+        records, _records[:] = list(_records), []
+    if not records:
+        return 0
+
+    metrics_tbl = pa.Table.from_pylist(
+        [{field: record.get(field) for field in METRICS_SCHEMA.names} for record in records], schema=METRICS_SCHEMA
+    )
+    con.register("metrics_tbl", metrics_tbl)
+    con.execute(f"CREATE TABLE IF NOT EXISTS {METRICS_TABLE} AS SELECT * FROM metrics_tbl LIMIT 0 ;")
+    con.execute(f"INSERT INTO {METRICS_TABLE} SELECT * FROM metrics_tbl ;")
+    con.unregister("metrics_tbl")
+    return len(records)
@@ -0,0 +1,146 @@
+# imports
+import time
+import traceback
+import multiprocessing
+import duckdb
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from utils import metrics
+
+
+class Task:
+    """One unit of the ETL DAG: a `generate` step run in a worker process, and a `load` step run by the writer.
+
+    Args:
+        name (str): Unique task name
+        generate (Callable[[], object]): Produces the data to load. Must not touch the DuckLake, and must be
+            picklable (a module-level function, or a `functools.partial` of one), as must the data it returns
+        load (Callable[[duckdb.DuckDBPyConnection, object], dict]): Writes the generated data, returning stats
+        depends_on (tuple): Names of tasks that must have loaded successfully before this one loads
+    """
+
+    def __init__(
+        self,
+        name: str,
+        generate: Callable[[], object],
+        load: Callable[[duckdb.DuckDBPyConnection, object], dict],
+        depends_on: tuple = ()
+    ):
+        self.name = name
+        self.generate = generate
+        self.load = load
+        self.depends_on = tuple(depends_on)
+
+
+def _check_dag(tasks: list):
+    """Raise a ValueError on duplicate names, unknown dependencies or cycles."""
+    names = [task.name for task in tasks]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate task names in {names}")
+    deps = {task.name: set(task.depends_on) for task in tasks}
+    for name, upstream in deps.items():
+        if not upstream <= set(names):
+            raise ValueError(f"Task `{name}` depends on unknown task(s) {sorted(upstream - set(names))}")
+
+    resolved = set()
+    while len(resolved) < len(names):
+        ready = {name for name, upstream in deps.items() if name not in resolved and upstream <= resolved}
+        if not ready:
+            raise ValueError(f"Dependency cycle between tasks {sorted(set(names) - resolved)}")
+        resolved |= ready
+
+
+def run_dag(tasks: list, con: duckdb.DuckDBPyConnection, max_workers: int = 4) -> dict:
+    """Run a DAG of tasks: generation concurrently in worker processes, loads one at a time in this one.
+
+    Every task's `generate` step is submitted to a process pool up front, since generation never reads
+    the lake, and the generators are CPU-bound Python that would hold each other up on the GIL in
+    threads. Loads are serialized on the calling thread through `con`, in dependency order, so only one
+    catalog commit is in flight at a time. A task whose generate or load step fails is recorded as
+    failed, and every task downstream of it is skipped, while unrelated tasks carry on.
+
+    Args:
+        tasks (list): Tasks making up the DAG
+        con (duckdb.DuckDBPyConnection): Cursor with the DuckLake attached, used for every load
+        max_workers (int): Number of generator processes
+
+    Returns:
+        dict: Per task name, its status ("success", "failed" or "skipped"), generate & load seconds,
+            load stats and error (if any)
+    """
+    _check_dag(tasks)
+    by_name = {task.name: task for task in tasks}
+    results = {
+        task.name: {"status": "pending", "generate_s": None, "load_s": None, "stats": None, "error": None}
+        for task in tasks
+    }
+
+    def fail(name: str, error: str):
+        results[name].update(status="failed", error=error)
+        print(f"Task `{name}` failed:\n{error}")
+
+    generated = {}
+    # generator processes are spawned rather than forked: the session is already running DuckDB threads,
+    # whose locks a forked child could inherit while held
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as pool:
+        futures = {pool.submit(_timed_generate, task.name, task.generate): task.name for task in tasks}
+        pending = set(futures)
+
+        while any(result["status"] == "pending" for result in results.values()):
+            # collect any generation that has finished, only blocking when there is nothing to load meanwhile
+            if pending:
+                timeout = 0 if _loadable(by_name, results, generated) else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures[future]
+                    try:
+                        generated[name], results[name]["generate_s"], record = future.result()
+                        metrics.collect(record)
+                    except Exception:
+                        fail(name, traceback.format_exc())
+
+            # skip anything downstream of a failure
+            for name, result in results.items():
+                if result["status"] == "pending" and any(
+                    results[dep]["status"] in ("failed", "skipped") for dep in by_name[name].depends_on
+                ):
+                    result["status"] = "skipped"
+                    generated.pop(name, None)
+
+            # load every task that is generated and whose dependencies have loaded
+            for name in _loadable(by_name, results, generated):
+                t0 = time.perf_counter()
+                try:
+                    with metrics.job(name), metrics.stage("load") as load_stage:
+                        results[name]["stats"] = by_name[name].load(con, generated.pop(name))
+                        if isinstance(results[name]["stats"], dict):
+                            load_stage.update(
+                                rows=results[name]["stats"].get("rows_written"),
+                                bytes=results[name]["stats"].get("bytes_written"),
+                            )
+                    results[name]["status"] = "success"
+                except Exception:
+                    fail(name, traceback.format_exc())
+                results[name]["load_s"] = time.perf_counter() - t0
+
+    return results
+
+
+def _timed_generate(name: str, generate: Callable[[], object]) -> tuple:
+    """Run one task's `generate` step (in a worker process), returning its data, seconds & metrics record."""
+    t0 = time.perf_counter()
+    with metrics.job(name), metrics.stage("generate") as generate_stage:
+        data = generate()
+        if hasattr(data, "__len__"):
+            generate_stage["rows"] = len(data)
+    return data, time.perf_counter() - t0, generate_stage
+
+
+def _loadable(by_name: dict, results: dict, generated: dict) -> list:
+    """Names of pending, generated tasks whose dependencies have all loaded successfully."""
+    return [
+        name for name in generated
+        if results[name]["status"] == "pending"
+        and all(results[dep]["status"] == "success" for dep in by_name[name].depends_on)
+    ]
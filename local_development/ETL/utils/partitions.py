@@ -0,0 +1,367 @@
+# imports
+import time
+import datetime
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Optional
+from utils import metrics
+from utils.layout import order_by_clause, sort_columns
+from utils.commits import MAX_ATTEMPTS, run_in_transaction
+
+# Constants
+COMPACTION_LOG = "retail_ops.compaction_log"  # rewrites that only compacted files, see `log_compaction`
+
+
+def _partition_file_counts(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    catalog: str,
+    read_snapshot: int,
+    partition_value: str
+) -> tuple:
+    """Count the data & delete files (and data bytes) a committed write added to one partition of a table,
+    from the DuckLake metadata catalog.
+
+    Only the files of the write's own snapshot are counted: the first snapshot after the one its transaction
+    read at (`read_snapshot`) to add files to the partition. Another overwrite of the partition committing in
+    between would have made the write conflict and retry from a newer snapshot, while writes to the partition
+    committed after it, or to other partitions, are not counted.
+    """
+    schema_name, table_name = table.split(".")
+    metadata = f"__ducklake_metadata_{catalog}"
+    return con.execute(f"""
+    WITH target AS (
+        SELECT t.table_id
+        FROM {metadata}.ducklake_table AS t
+        JOIN {metadata}.ducklake_schema AS s USING (schema_id)
+        WHERE s.schema_name = ? AND t.table_name = ? AND s.end_snapshot IS NULL AND t.end_snapshot IS NULL
+    ),
+    partition_files AS (
+        SELECT data_file_id FROM {metadata}.ducklake_file_partition_value
+        WHERE table_id IN (FROM target) AND partition_value = ?
+    ),
+    committed AS (
+        SELECT min(begin_snapshot) FROM (
+            SELECT begin_snapshot FROM {metadata}.ducklake_data_file
+            WHERE data_file_id IN (FROM partition_files) AND begin_snapshot > ?
+            UNION ALL
+            SELECT begin_snapshot FROM {metadata}.ducklake_delete_file
+            WHERE data_file_id IN (FROM partition_files) AND begin_snapshot > ?
+        )
+    )
+    SELECT
+        (SELECT count(*) FROM {metadata}.ducklake_data_file
+         WHERE data_file_id IN (FROM partition_files) AND begin_snapshot = (FROM committed)),
+        (SELECT count(*) FROM {metadata}.ducklake_delete_file
+         WHERE data_file_id IN (FROM partition_files) AND begin_snapshot = (FROM committed)),
+        (SELECT coalesce(sum(file_size_bytes), 0) FROM {metadata}.ducklake_data_file
+         WHERE data_file_id IN (FROM partition_files) AND begin_snapshot = (FROM committed))
+    """, [schema_name, table_name, partition_value, read_snapshot, read_snapshot]).fetchone()
+
+
+def as_arrow(data):
+    """A pandas DataFrame as an Arrow table, so Categorical columns reach DuckDB as dictionary-encoded VARCHAR.
+
+    DuckDB scans a Categorical straight from pandas as an ENUM, which DuckLake cannot store, whereas the Arrow
+    conversion keeps the int8 codes & dictionary as they are. Anything else is returned as is.
+    """
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return data
+
+
+def sort_batches(reader: pa.RecordBatchReader, table: str) -> pa.RecordBatchReader:
+    """A stream with each record batch sorted in `table`'s configured sort order (see `utils.layout`), on its own.
+
+    Sorting a whole stream in DuckDB would hold all of it before writing the first row, so a stream is
+    clustered one batch at a time instead: memory stays bounded by the batch size, and each batch still
+    writes row groups with narrow min/max ranges. Compacting the partition (see `utils.maintenance.compact`)
+    rewrites it fully sorted.
+    """
+    sort_by = sort_columns(table)
+    if not sort_by:
+        return reader
+    keys = [(column, "ascending") for column in sort_by]
+    return pa.RecordBatchReader.from_batches(reader.schema, (batch.sort_by(keys) for batch in reader))
+
+
+def _as_source(data, table: str) -> tuple:
+    """Data to register for a partition write, and the `ORDER BY` clause to insert it with: the table's sort
+    order, or none for a stream, whose batches are sorted one at a time instead (see `sort_batches`)."""
+    if isinstance(data, pa.RecordBatchReader):
+        return sort_batches(data, table), ""
+    return as_arrow(data), order_by_clause(table)
+
+
+def tag_partition(data, value: str, column: str = "extract_date"):
+    """Append a constant partition column to an Arrow table or record batch.
+
+    The column is dictionary-encoded (int8 codes into a single value), so it costs one byte per row, and
+    DuckDB reads it as VARCHAR.
+    """
+    codes = pa.array(np.zeros(data.num_rows, dtype=np.int8))
+    return data.append_column(column, pa.DictionaryArray.from_arrays(codes, pa.array([value])))
+
+
+def current_snapshot_id(con: duckdb.DuckDBPyConnection, catalog: str = "retail_ducklake") -> int:
+    """Id of the latest snapshot committed to the DuckLake (inside a transaction, the one it reads at)."""
+    return con.execute(f"SELECT max(snapshot_id) FROM ducklake_snapshots('{catalog}')").fetchone()[0]
+
+
+def ensure_compaction_log(con: duckdb.DuckDBPyConnection, catalog: str = "retail_ducklake"):
+    """Create the compaction log on first use."""
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {catalog}.{COMPACTION_LOG} (
+        table_name VARCHAR,
+        partition_value VARCHAR,
+        read_snapshot BIGINT,
+        compacted_at TIMESTAMP
+    ) ;
+    """)
+
+
+def log_compaction(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    partition_value: Optional[str],
+    catalog: str = "retail_ducklake"
+):
+    """Log a rewrite of rows unchanged (see `utils.maintenance.compact`), for `changed_partitions` to skip.
+
+    Must run inside the transaction of the rewrite: the id of the snapshot it commits is only known once
+    committed, so the log row is found by the snapshot that added it, which is the rewrite's own.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached, inside the rewrite's transaction
+        table (str): Table rewritten, as `schema.table`
+        partition_value (str): Partition rewritten (None for an unpartitioned table)
+        catalog (str): Name the DuckLake is attached as
+    """
+    read_snapshot = con.execute(f"FROM {catalog}.current_snapshot()").fetchone()[0]
+    con.execute(
+        f"INSERT INTO {catalog}.{COMPACTION_LOG} VALUES (?, ?, ?, ?)",
+        [table, partition_value, read_snapshot, datetime.datetime.now()]
+    )
+
+
+def changed_partitions(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    since_snapshot: int = -1,
+    catalog: str = "retail_ducklake"
+) -> list:
+    """Partition values of a table with data or delete files added (or data files dropped) after a snapshot.
+
+    Answered from the DuckLake metadata catalog alone, so the cost depends on the number of files
+    changed, not on the size of the table. Assumes the table has a single partition key. Files added or
+    dropped by compaction are skipped, as their rows did not change: a compaction commits its compaction
+    log row in its own snapshot, so the snapshots that added data files to the log are those of compactions.
+    The files a compaction replaced still count if they were added after `since_snapshot`, as long as the
+    snapshot that compacted them has not been expired.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        table (str): Table to check, as `schema.table`
+        since_snapshot (int): Snapshot id after which to look for changes (-1 for every partition)
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        list: Sorted partition values (as strings) changed after `since_snapshot`
+    """
+    schema_name, table_name = table.split(".")
+    metadata = f"__ducklake_metadata_{catalog}"
+    ensure_compaction_log(con, catalog)
+    log_schema, log_table = COMPACTION_LOG.split(".")
+    rows = con.execute(f"""
+    WITH target AS (
+        SELECT t.table_id
+        FROM {metadata}.ducklake_table AS t
+        JOIN {metadata}.ducklake_schema AS s USING (schema_id)
+        WHERE s.schema_name = ? AND t.table_name = ? AND s.end_snapshot IS NULL AND t.end_snapshot IS NULL
+    ),
+    compactions AS (
+        SELECT DISTINCT f.begin_snapshot
+        FROM {metadata}.ducklake_data_file AS f
+        JOIN {metadata}.ducklake_table AS t USING (table_id)
+        JOIN {metadata}.ducklake_schema AS s USING (schema_id)
+        WHERE s.schema_name = ? AND t.table_name = ? AND s.end_snapshot IS NULL AND t.end_snapshot IS NULL
+            AND f.begin_snapshot > ?
+    ),
+    changed_files AS (
+        SELECT data_file_id FROM {metadata}.ducklake_data_file
+        WHERE table_id IN (FROM target)
+            AND ((begin_snapshot > ? AND begin_snapshot NOT IN (FROM compactions))
+                 OR (end_snapshot > ? AND end_snapshot NOT IN (FROM compactions)))
+        UNION
+        SELECT data_file_id FROM {metadata}.ducklake_delete_file
+        WHERE table_id IN (FROM target) AND begin_snapshot > ? AND begin_snapshot NOT IN (FROM compactions)
+    )
+    SELECT DISTINCT partition_value
+    FROM {metadata}.ducklake_file_partition_value
+    WHERE table_id IN (FROM target) AND data_file_id IN (FROM changed_files)
+    ORDER BY partition_value
+    """, [schema_name, table_name, log_schema, log_table, since_snapshot, since_snapshot, since_snapshot, since_snapshot]).fetchall()
+    return [row[0] for row in rows]
+
+
+def _replace_partition(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    source: str,
+    partition_value: str,
+    partition_column: str,
+    catalog: str,
+    order_by: str
+) -> tuple:
+    """Delete one partition of a table (if it has any rows) and insert the rows of the registered view `source`
+    (sorted by `order_by`, if given), inside the caller's transaction.
+
+    Returns:
+        tuple: Rows deleted & rows written
+    """
+    with metrics.stage("delete") as delete_stage:
+        rows_deleted = 0
+        partition_exists = con.execute(
+            f"SELECT 1 FROM {catalog}.{table} WHERE {partition_column} = ? LIMIT 1", [partition_value]
+        ).fetchone() is not None
+        if partition_exists:
+            rows_deleted = con.execute(
+                f"DELETE FROM {catalog}.{table} WHERE {partition_column} = ?", [partition_value]
+            ).fetchone()[0]
+        delete_stage["rows"] = rows_deleted
+
+    with metrics.stage("insert") as insert_stage:
+        rows_written = con.execute(
+            f"INSERT INTO {catalog}.{table} BY NAME SELECT * FROM {source} {order_by}"
+        ).fetchone()[0]
+        insert_stage["rows"] = rows_written
+    return rows_deleted, rows_written
+
+
+def _write_stats(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    partition_value: str,
+    rows: tuple,
+    read_snapshot: int,
+    catalog: str,
+    t0: float
+) -> dict:
+    """Stats of a committed partition write, as returned by `overwrite_partition` (and recorded as a `written` stage)."""
+    with metrics.stage("written", rows=rows[1]) as written_stage:
+        files_written, delete_files_written, bytes_written = _partition_file_counts(
+            con, table, catalog, read_snapshot, partition_value
+        )
+        written_stage["bytes"] = bytes_written
+    return {
+        "table": table,
+        "partition": partition_value,
+        "rows_deleted": rows[0],
+        "rows_written": rows[1],
+        "files_written": files_written,
+        "bytes_written": bytes_written,
+        "delete_files_written": delete_files_written,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+def overwrite_partition(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    data,
+    partition_value: str,
+    partition_column: str = "extract_date",
+    catalog: str = "retail_ducklake"
+) -> dict:
+    """Replace one partition of a DuckLake table with `data`, in a single transaction.
+
+    Columns are matched by name, so the table may have columns `data` lacks (written as NULL), e.g. ones
+    added since by `utils.schema_registry`. Rows are written in the table's configured sort order (see `utils.layout`),
+    except that a record batch reader is sorted a batch at a time (see `sort_batches`), so a stream is written
+    as DuckDB pulls it, in memory bounded by its batch size. The delete is skipped entirely when the partition
+    does not exist yet (i.e. on first load), so only reruns pay for it. Readers never see the partition empty, as the delete & insert commit together.
+
+    The transaction is committed through `utils.commits.run_in_transaction`, so a conflict with another
+    writer is retried with backoff. A record batch reader can only be read once, so a stream is not retried.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        table (str): Table to write to, as `schema.table`
+        data: Partition rows (pandas DataFrame, Arrow table or Arrow record batch reader), whose
+            columns match the table and whose `partition_column` is `partition_value` throughout
+        partition_value (str): Value of the partition being replaced
+        partition_column (str): Column the table is partitioned by
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        dict: Rows deleted & written, data & delete files (and data bytes) written, and elapsed seconds
+    """
+    t0 = time.perf_counter()
+    with metrics.stage("register"):
+        source, order_by = _as_source(data, table)
+        con.register("overwrite_src", source)
+
+    def replace(con):
+        # the snapshot this attempt reads at, to find the one it commits (see `_partition_file_counts`)
+        read_snapshot = current_snapshot_id(con, catalog)
+        return read_snapshot, _replace_partition(con, table, "overwrite_src", partition_value, partition_column, catalog, order_by)
+
+    try:
+        read_snapshot, rows = run_in_transaction(
+            con, replace, max_attempts=1 if isinstance(data, pa.RecordBatchReader) else MAX_ATTEMPTS
+        )
+    finally:
+        con.unregister("overwrite_src")
+    return _write_stats(con, table, partition_value, rows, read_snapshot, catalog, t0)
+
+
+def overwrite_partitions(
+    con: duckdb.DuckDBPyConnection,
+    writes: list,
+    partition_column: str = "extract_date",
+    catalog: str = "retail_ducklake"
+) -> list:
+    """Replace one partition in each of several tables, all in a single catalog transaction (group commit).
+
+    One commit, rather than one per table, makes the writes visible together (e.g. every bronze table of a
+    day), and takes one turn on the catalog instead of several, so concurrent writers contend less. The
+    transaction is retried as a whole on conflict, as in `overwrite_partition`, unless any of the data is
+    a record batch reader.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        writes (list): (table, data, partition value) per partition to replace, as passed to `overwrite_partition`
+        partition_column (str): Column every table is partitioned by
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        list: Stats per write, as returned by `overwrite_partition` (elapsed seconds cover the whole group)
+    """
+    t0 = time.perf_counter()
+    sources = [f"overwrite_src_{i}" for i in range(len(writes))]
+    order_bys = []
+    with metrics.stage("register"):
+        for source, (table, data, _) in zip(sources, writes):
+            data, order_by = _as_source(data, table)
+            con.register(source, data)
+            order_bys.append(order_by)
+
+    def replace_all(con):
+        read_snapshot = current_snapshot_id(con, catalog)
+        return read_snapshot, [
+            _replace_partition(con, table, source, partition_value, partition_column, catalog, order_by)
+            for source, order_by, (table, _, partition_value) in zip(sources, order_bys, writes)
+        ]
+
+    try:
+        streamed = any(isinstance(data, pa.RecordBatchReader) for _, data, _ in writes)
+        read_snapshot, rows = run_in_transaction(con, replace_all, max_attempts=1 if streamed else MAX_ATTEMPTS)
+    finally:
+        for source in sources:
+            con.unregister(source)
+    return [
+        _write_stats(con, table, partition_value, table_rows, read_snapshot, catalog, t0)
+        for (table, _, partition_value), table_rows in zip(writes, rows)
+    ]
@@ -0,0 +1,192 @@
+# imports
+import os
+import re
+import json
+import hashlib
+import threading
+import collections
+import duckdb
+import pyarrow as pa
+from typing import Optional
+from utils.partitions import current_snapshot_id
+from utils.session import DuckLakeSession, get_session, CATALOG_NAME
+
+# Constants
+CACHE_DIR = os.getenv("ETL_QUERY_CACHE_DIR", "/tmp/ducklake_query_cache")
+CACHE_MAX_MB = int(os.getenv("ETL_QUERY_CACHE_MB", "1024"))
+
+# only plain reads are cached, and not those whose result changes without a new snapshot
+CACHEABLE_PREFIXES = ("select", "with", "from", "table", "pivot", "unpivot")
+VOLATILE_FUNCTIONS = re.compile(
+    r"\b(random|uuid|gen_random_uuid|now|current_timestamp|current_date|current_time|get_current_time|today|"
+    r"setseed|nextval)\b|\bduckdb_\w+\b|\bpragma_\w+\b|\bread_\w+\s*\(", re.IGNORECASE
+)
+_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|\s+|[^'\"\s/-]+|.", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """A query's text with comments dropped, whitespace collapsed, a trailing `;` removed and everything
+    outside quotes lower-cased, so that trivially different spellings of a query share a cache entry."""
+    parts = []
+    for token in _TOKENS.findall(sql):
+        if token.startswith(("'", '"')):
+            parts.append(token)
+        elif token.startswith("--") or token.startswith("/*") or token.isspace():
+            parts.append(" ")
+        else:
+            parts.append(token.lower())
+    return re.sub(r"\s+", " ", "".join(parts)).strip().rstrip(";").strip()
+
+
+def is_cacheable(normalized_sql: str) -> bool:
+    """Whether a normalized query is a read whose result depends only on the DuckLake snapshot."""
+    unquoted = re.sub(r"'(?:[^']|'')*'", "''", normalized_sql)
+    return unquoted.startswith(CACHEABLE_PREFIXES) and not VOLATILE_FUNCTIONS.search(unquoted)
+
+
+class QueryCache:
+    """Read queries against the DuckLake, with results cached on local disk as Arrow IPC files.
+
+    Results are keyed by the normalized SQL, its parameters and the id of the latest DuckLake snapshot, so
+    a repeat query between loads is read straight from disk (memory mapped) without scanning any Parquet,
+    while the first query after a new snapshot lands runs again. Entries of older snapshots can never be
+    hit again, so they are deleted as soon as a newer snapshot is seen. Beyond that, the least recently
+    used entries are evicted to keep the cache within `max_mb` (a larger result is not cached). The cache
+    lives in files named after their snapshot & key, so it is shared by every process using the same directory.
+
+    Args:
+        session (Optional[DuckLakeSession]): Session to query through (defaults to the process-wide one)
+        directory (str): Directory holding the cached results
+        max_mb (int): Size bound of the cache, in MB
+    """
+
+    def __init__(
+        self,
+        session: Optional[DuckLakeSession] = None,
+        directory: str = CACHE_DIR,
+        max_mb: int = CACHE_MAX_MB
+    ):
+        self.session = session
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 ** 2
+        self.stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evicted": 0, "invalidated": 0}
+        self._entries = collections.OrderedDict()  # file name -> size in bytes, least recently used first
+        self._size = 0
+        self._snapshot_id = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Index the result files already on disk, least recently used (by modification time) first."""
+        files = [entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".arrow")]
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+            self._entries[entry.name] = entry.stat().st_size
+            self._size += entry.stat().st_size
+
+    def _remove(self, name: str):
+        self._size -= self._entries.pop(name)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass  # already removed by another process sharing the directory
+
+    def _invalidate(self, snapshot_id: int):
+        """Drop every entry of a snapshot older than `snapshot_id`, once per new snapshot seen."""
+        if snapshot_id == self._snapshot_id:
+            return
+        stale = [name for name in self._entries if int(name.split("_", 1)[0]) < snapshot_id]
+        for name in stale:
+            self._remove(name)
+        self.stats["invalidated"] += len(stale)
+        self._snapshot_id = snapshot_id
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is within its size bound."""
+        while self._size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.stats["evicted"] += 1
+
+    def query(self, sql: str, params: Optional[list] = None, con: Optional[duckdb.DuckDBPyConnection] = None) -> pa.Table:
+        """Run a query, or read its result from the cache if it was run before at the current snapshot.
+
+        Queries that are not plain reads, or that call volatile functions (e.g. `random()`, `now()`), are
+        run every time.
+
+        Args:
+            sql (str): Query to run
+            params (Optional[list]): Query parameters
+            con (Optional[duckdb.DuckDBPyConnection]): Cursor to run the query on, left open (defaults to a
+                new cursor on the cache's session, closed once done)
+
+        Returns:
+            pa.Table: The query result
+        """
+        own_cursor = con is None
+        if own_cursor:
+            con = (self.session or get_session()).cursor()
+        try:
+            normalized = normalize_sql(sql)
+            if not is_cacheable(normalized):
+                with self._lock:
+                    self.stats["uncacheable"] += 1
+                return con.execute(sql, params).arrow()
+
+            snapshot_id = current_snapshot_id(con, CATALOG_NAME)
+            key = hashlib.sha256(json.dumps([normalized, params], default=str).encode()).hexdigest()[:32]
+            name = f"{snapshot_id}_{key}.arrow"
+            path = os.path.join(self.directory, name)
+
+            with self._lock:
+                self._invalidate(snapshot_id)
+                if name in self._entries and os.path.exists(path):
+                    self._entries.move_to_end(name)
+                    self.stats["hits"] += 1
+                    os.utime(path)  # keeps the LRU order for other processes & the next start
+                    with pa.memory_map(path) as source:
+                        return pa.ipc.open_file(source).read_all()
+                self.stats["misses"] += 1
+
+            result = con.execute(sql, params).arrow()
+            if result.nbytes > self.max_bytes:
+                return result  # would evict the whole cache, and itself
+
+            # write to a temporary file first, so readers never see a partial result
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, result.schema) as writer:
+                writer.write_table(result)
+            os.replace(tmp_path, path)
+            with self._lock:
+                if name not in self._entries:
+                    size = os.path.getsize(path)
+                    self._entries[name] = size
+                    self._size += size
+                self._evict()
+            return result
+        finally:
+            if own_cursor:
+                con.close()
+
+    def clear(self):
+        """Delete every cached result."""
+        with self._lock:
+            for name in list(self._entries):
+                self._remove(name)
+
+    def info(self) -> dict:
+        """Hit, miss, eviction & invalidation counts, plus the entries held and their total size in MB."""
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "size_mb": round(self._size / 1024 ** 2, 3)}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def cached_query(sql: str, params: Optional[list] = None) -> pa.Table:
+    """Run a read query through the process-wide `QueryCache` (on the shared session), created on first call."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache()
+    return _cache.query(sql, params)
@@ -0,0 +1,238 @@
+# imports
+import os
+import queue
+import asyncio
+import threading
+import duckdb
+import pyarrow as pa
+from typing import AsyncIterator, Optional
+from concurrent.futures import ThreadPoolExecutor
+from utils.session import DuckLakeSession, get_session
+from utils.query_cache import QueryCache
+
+# Constants
+MAX_CONCURRENCY = int(os.getenv("ETL_QUERY_CONCURRENCY", str(min(8, os.cpu_count() * 2))))
+QUERY_TIMEOUT_S = float(os.getenv("ETL_QUERY_TIMEOUT_S", "30"))
+BATCH_ROWS = 122_880  # one DuckDB row group per batch
+BUFFERED_BATCHES = 4  # batches a query may run ahead of its client, before it waits for it to catch up
+
+
+class QueryTimeout(TimeoutError):
+    """A query ran past its deadline, and was interrupted."""
+
+
+class QueryService:
+    """Serve read queries against the DuckLake to many asyncio clients at once.
+
+    Queries run on a bounded thread pool (DuckDB releases the GIL while executing), each on a cursor
+    borrowed from a pool of cursors on one attached session, so at most `max_concurrency` queries run at
+    a time and the rest queue. Results stream back as Arrow record batches: a query produces at most
+    `buffered_batches` batches ahead of its client, then waits for it, so a slow client holds back its own
+    query rather than buffering its whole result in memory. A query past its timeout is interrupted in
+    DuckDB, and its client gets a `QueryTimeout`.
+
+    Args:
+        session (Optional[DuckLakeSession]): Session to query through (defaults to the process-wide one)
+        max_concurrency (int): Queries run at the same time, i.e. worker threads & pooled cursors
+        timeout_s (float): Default time limit of a query, from submission to its last batch
+        batch_rows (int): Rows per streamed record batch
+        buffered_batches (int): Batches a query may produce ahead of its client
+        cache (Optional[QueryCache]): Result cache for `query` (see `utils.query_cache`). Streams are never cached
+    """
+
+    def __init__(
+        self,
+        session: Optional[DuckLakeSession] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        timeout_s: float = QUERY_TIMEOUT_S,
+        batch_rows: int = BATCH_ROWS,
+        buffered_batches: int = BUFFERED_BATCHES,
+        cache: Optional[QueryCache] = None
+    ):
+        self.session = session or get_session()
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.batch_rows = batch_rows
+        self.buffered_batches = buffered_batches
+        self.cache = cache
+        self.stats = {"queries": 0, "timeouts": 0, "errors": 0, "cancelled": 0, "rows": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ducklake_query")
+        self._cursors = queue.LifoQueue()  # idle cursors, most recently used first
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def _borrow_cursor(self) -> duckdb.DuckDBPyConnection:
+        """An idle cursor from the pool, or a new one while fewer than `max_concurrency` are open."""
+        try:
+            return self._cursors.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if len(self._opened) < self.max_concurrency:
+                    cursor = self.session.cursor()
+                    self._opened.append(cursor)
+                    return cursor
+            return self._cursors.get()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _produce(self, sql: str, params: Optional[list], put, slots: threading.Semaphore, running: dict, cached: bool):
+        """Run a query on a worker thread, handing its schema & then each batch to `put` once its client has
+        room for it, or with `cached` its whole result through the cache. Stops early once `running["done"]`
+        is set, by the client leaving or the deadline."""
+        done = running["done"]
+        if done.is_set():  # timed out, or the client left, while queued
+            return
+        cursor = self._borrow_cursor()
+        with running["lock"]:
+            running["cursor"] = cursor
+        try:
+            if cached:
+                put(("result", self.cache.query(sql, params, cursor)))
+                return
+            reader = cursor.execute(sql, params).fetch_record_batch(self.batch_rows)
+            put(("schema", reader.schema))
+            for batch in reader:
+                while not slots.acquire(timeout=0.1):  # backpressure: wait for the client to take a batch
+                    if done.is_set():
+                        return
+                if done.is_set():
+                    return
+                put(("batch", batch))
+            put(("end", None))
+        except Exception as e:
+            put(("error", e))
+        finally:
+            with running["lock"]:
+                running["cursor"] = None
+            self._cursors.put(cursor)
+
+    async def _stream(self, sql: str, params: Optional[list], timeout_s: Optional[float], cached: bool = False):
+        """The query's schema, then its record batches (see `stream`), or with `cached` its whole result
+        through the cache (see `query`)."""
+        loop = asyncio.get_running_loop()
+        timeout_s = timeout_s or self.timeout_s
+        deadline = loop.time() + timeout_s
+        items = asyncio.Queue()
+        slots = threading.Semaphore(self.buffered_batches)
+        running = {"cursor": None, "done": threading.Event(), "lock": threading.Lock()}
+        self._count(queries=1)
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, item)
+            except RuntimeError:
+                pass  # the client's event loop has closed, so nobody is waiting for the result
+
+        def forward_failure(worker: asyncio.Future):
+            # an error the worker raised rather than handed over, e.g. while borrowing a cursor
+            if not worker.cancelled() and worker.exception() is not None:
+                items.put_nowait(("error", worker.exception()))
+
+        worker = loop.run_in_executor(self._executor, self._produce, sql, params, put, slots, running, cached)
+        worker.add_done_callback(forward_failure)
+        finished = False
+        try:
+            while True:
+                try:
+                    kind, value = await asyncio.wait_for(items.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    self._count(timeouts=1)
+                    raise QueryTimeout(f"Query exceeded its {timeout_s}s timeout: {sql.strip()[:200]}") from None
+                if kind == "error":
+                    self._count(errors=1)
+                    raise value
+                if kind == "end":
+                    finished = True
+                    return
+                if kind == "result":
+                    finished = True
+                    yield value
+                    return
+                if kind == "batch":
+                    slots.release()
+                    self._count(rows=value.num_rows)
+                yield value
+        except GeneratorExit:
+            if not finished:
+                self._count(cancelled=1)  # the client stopped reading before the end
+            raise
+        finally:
+            if not finished:
+                # stop the worker, interrupting the query if it is still executing in DuckDB. The worker
+                # returns its cursor to the pool by itself, so the client is not held up waiting for it
+                running["done"].set()
+                with running["lock"]:
+                    if running["cursor"] is not None:
+                        running["cursor"].interrupt()
+
+    async def stream(
+        self,
+        sql: str,
+        params: Optional[list] = None,
+        timeout_s: Optional[float] = None
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Stream a query's result as Arrow record batches, as the client consumes them.
+
+        Args:
+            sql (str): Query to run
+            params (Optional[list]): Query parameters
+            timeout_s (Optional[float]): Time limit for the whole result, waiting for a worker included
+                (defaults to the service's)
+
+        Yields:
+            pa.RecordBatch: The result, `batch_rows` rows at a time
+
+        Raises:
+            QueryTimeout: If the query is still running (or queued) at its deadline
+        """
+        items = self._stream(sql, params, timeout_s)
+        try:
+            await items.__anext__()  # the schema
+            async for batch in items:
+                yield batch
+        finally:
+            await items.aclose()
+
+    async def query(self, sql: str, params: Optional[list] = None, timeout_s: Optional[float] = None) -> pa.Table:
+        """Run a query to completion and return its whole result, through the result cache if the service has one.
+
+        A cached query runs on a pooled cursor like any other, so it counts towards `max_concurrency` and is
+        interrupted at its deadline.
+
+        Args:
+            sql (str): Query to run
+            params (Optional[list]): Query parameters
+            timeout_s (Optional[float]): Time limit of the query (defaults to the service's)
+
+        Returns:
+            pa.Table: The query result
+
+        Raises:
+            QueryTimeout: If the query is still running (or queued) at its deadline
+        """
+        items = self._stream(sql, params, timeout_s, cached=self.cache is not None)
+        try:
+            if self.cache is not None:
+                result = await items.__anext__()
+                self._count(rows=result.num_rows)
+                return result
+            schema = await items.__anext__()
+            return pa.Table.from_batches([batch async for batch in items], schema=schema)
+        finally:
+            await items.aclose()
+
+    def close(self):
+        """Wait for running queries, then close every pooled cursor (the session stays open)."""
+        self._executor.shutdown(wait=True)
+        for cursor in self._opened:
+            cursor.close()
+        self._opened.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,226 @@
+# imports
+import threading
+import duckdb
+from utils.layout import apply_layout
+
+# Constants
+CUSTOMER_COLUMNS = (
+    ("customerID", "BIGINT"),
+    ("firstName", "VARCHAR"),
+    ("lastName", "VARCHAR"),
+    ("rewardsMember", "BOOLEAN"),
+    ("emailAddress", "VARCHAR"),
+    ("postcode", "VARCHAR"),
+    ("profession", "VARCHAR"),
+    ("dob", "DATE"),
+    ("customerJoined", "TIMESTAMP"),
+)
+
+# columns (name, DuckDB type) & partitioning of every bronze table, matching the Arrow schemas of the
+# generators in `utils.data_sourcing`. A column appended here is added to existing tables by `ensure_tables`,
+# without a rebuild, and reads as NULL in rows written before it existed
+BRONZE_TABLES = {
+    "retail_bronze.customer_src_raw": {
+        "columns": CUSTOMER_COLUMNS + (("extract_date", "VARCHAR"),),
+        "partition_by": ("extract_date",),
+    },
+    "retail_bronze.customer_cdc_raw": {
+        "columns": CUSTOMER_COLUMNS + (("row_hash", "VARCHAR"), ("operation", "VARCHAR"), ("extract_date", "VARCHAR")),
+        "partition_by": ("extract_date",),
+    },
+    "retail_bronze.products_src_raw": {
+        "columns": (
+            ("product_id", "BIGINT"),
+            ("product_name", "VARCHAR"),
+            ("category", "VARCHAR"),
+            ("price", "DECIMAL(10, 2)"),
+            ("launch_date", "DATE"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+    "retail_bronze.stores_src_raw": {
+        "columns": (
+            ("store_id", "INTEGER"),
+            ("store_name", "VARCHAR"),
+            ("manager", "VARCHAR"),
+            ("opened_date", "DATE"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+    "retail_bronze.transactions_src_raw": {
+        "columns": (
+            ("transaction_id", "UUID"),
+            ("customerID", "BIGINT"),
+            ("transaction_TS", "TIMESTAMP"),
+            ("Product", "VARCHAR"),
+            ("volume", "BIGINT"),
+            ("channel", "VARCHAR"),
+            ("store_id", "INTEGER"),
+            ("Price", "DECIMAL(10, 2)"),
+            ("txn_amount", "DECIMAL(12, 2)"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+}
+
+# silver & gold tables built from query results, matching the column types of those queries (see
+# `Silver_layer/silver_customers.py`, `Silver_layer/silver_transactions.py` & `Gold_layer/gold_sales.py`),
+# so they are created before their first load like the bronze tables, rather than from the schema of the
+# first result
+SILVER_TABLES = {
+    # SCD2 customer versions: the cleaned columns, in the order the builder inserts them, then the row hash
+    # & validity range. Not partitioned, as a change closes a version of any earlier day
+    "retail_silver.customers": {
+        "columns": (
+            ("customer_id", "BIGINT"),
+            ("first_name", "VARCHAR"),
+            ("last_name", "VARCHAR"),
+            ("rewards_member", "BOOLEAN"),
+            ("email_address", "VARCHAR"),
+            ("postcode", "VARCHAR"),
+            ("profession", "VARCHAR"),
+            ("dob", "DATE"),
+            ("customer_joined", "TIMESTAMP"),
+            ("row_hash", "VARCHAR"),
+            ("valid_from", "DATE"),
+            ("valid_to", "DATE"),
+            ("is_current", "BOOLEAN"),
+        ),
+    },
+    "retail_silver.transactions": {
+        "columns": (
+            ("transaction_id", "UUID"),
+            ("customer_id", "BIGINT"),
+            ("transaction_ts", "TIMESTAMP"),
+            ("transaction_date", "DATE"),
+            ("product_id", "BIGINT"),
+            ("product_name", "VARCHAR"),
+            ("category", "VARCHAR"),
+            ("volume", "INTEGER"),
+            ("channel", "VARCHAR"),
+            ("store_id", "INTEGER"),
+            ("unit_price", "DECIMAL(10, 2)"),
+            ("txn_amount", "DECIMAL(12, 2)"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+}
+
+GOLD_TABLES = {
+    "retail_gold.daily_sales": {
+        "columns": (
+            ("transaction_date", "DATE"),
+            ("store_id", "INTEGER"),
+            ("channel", "VARCHAR"),
+            ("category", "VARCHAR"),
+            ("transactions", "BIGINT"),
+            ("line_items", "BIGINT"),
+            ("units", "DECIMAL(38, 0)"),
+            ("revenue", "DECIMAL(38, 2)"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+    "retail_gold.customer_daily": {
+        "columns": (
+            ("customer_id", "BIGINT"),
+            ("transaction_date", "DATE"),
+            ("transactions", "BIGINT"),
+            ("units", "DECIMAL(38, 0)"),
+            ("revenue", "DECIMAL(38, 2)"),
+            ("last_transaction_ts", "TIMESTAMP"),
+            ("extract_date", "VARCHAR"),
+        ),
+        "partition_by": ("extract_date",),
+    },
+}
+
+# tables known to match the registry in this process, so repeat loads skip the catalog query
+_ensured = set()
+_ensure_lock = threading.Lock()
+
+
+def forget_ensured():
+    """Forget which tables were ensured, so the next `ensure_tables` checks the catalog again, e.g. after
+    the DuckLake is dropped & rebuilt in the same process."""
+    with _ensure_lock:
+        _ensured.clear()
+
+
+def existing_columns(con: duckdb.DuckDBPyConnection, tables: list, catalog: str = "retail_ducklake") -> dict:
+    """Columns of each of `tables` that exists, looked up in one `information_schema` query.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        tables (list): Tables to look up, as `schema.table`
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        dict: Per existing table, a dict of its column names to DuckDB types (missing tables are left out)
+    """
+    rows = con.execute("""
+    SELECT table_schema || '.' || table_name, column_name, data_type
+    FROM information_schema.columns
+    WHERE table_catalog = ? AND list_contains(?, table_schema || '.' || table_name)
+    ORDER BY ordinal_position
+    """, [catalog, list(tables)]).fetchall()
+    columns = {}
+    for table, column, data_type in rows:
+        columns.setdefault(table, {})[column] = data_type
+    return columns
+
+
+def ensure_tables(
+    con: duckdb.DuckDBPyConnection,
+    tables: list = None,
+    registry: dict = BRONZE_TABLES,
+    catalog: str = "retail_ducklake"
+) -> dict:
+    """Create missing registry tables, and add registry columns missing from existing ones.
+
+    Idempotent, and cheap to call before every load: the first call per process checks every table asked
+    for in a single catalog query, and later calls for the same tables return without touching the catalog.
+    Columns are only ever added; a type that differs from the registry (e.g. in a table created by an
+    older version) is left as is, as inserts cast to it.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        tables (list): Registry tables to ensure, as `schema.table` (defaults to every table)
+        registry (dict): Table definitions, as in `BRONZE_TABLES` (or `SILVER_TABLES`, `GOLD_TABLES`)
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        dict: Tables created, and columns added per table
+    """
+    tables = [table for table in (tables or list(registry)) if table not in _ensured]
+    changes = {"created": [], "columns_added": {}}
+    if not tables:
+        return changes
+
+    # writers on other threads may ensure the same tables concurrently, and only one may create each
+    with _ensure_lock:
+        current = existing_columns(con, tables, catalog)
+        for table in tables:
+            spec = registry[table]
+            if table not in current:
+                print(f"Table: `{table}` does not yet exist. Creating ...")
+                columns = ", ".join(f"{name} {data_type}" for name, data_type in spec["columns"])
+                con.execute(f"CREATE TABLE IF NOT EXISTS {catalog}.{table} ({columns}) ;")
+                if spec.get("partition_by"):
+                    con.execute(f"ALTER TABLE {catalog}.{table} SET PARTITIONED BY ({', '.join(spec['partition_by'])}) ;")
+                apply_layout(con, table, catalog)
+                changes["created"].append(table)
+                print(f"Table: `{table}` created")
+            else:
+                missing = [(name, data_type) for name, data_type in spec["columns"] if name not in current[table]]
+                for name, data_type in missing:
+                    con.execute(f"ALTER TABLE {catalog}.{table} ADD COLUMN IF NOT EXISTS {name} {data_type} ;")
+                if missing:
+                    changes["columns_added"][table] = [name for name, _ in missing]
+                    print(f"Table: `{table}` added columns {changes['columns_added'][table]}")
+            _ensured.add(table)
+    return changes
@@ -0,0 +1,190 @@
+# imports
+import os
+import time
+import atexit
+import threading
+import duckdb
+from typing import Optional
+from utils.write_profiles import apply_profile
+
+# Constants
+CATALOG_NAME = "retail_ducklake"
+DATA_PATH = "/home/dev/workspace/local_development/data"
+
+# database holding the DuckLake catalog (its metadata). Postgres is the shared deployment; a local DuckDB or
+# SQLite file keeps every catalog operation in-process, for dev, test & benchmark runs without the docker
+# Postgres. Every backend stores the same metadata tables, so the ETL behaves the same on each. A DuckDB
+# catalog file can only be open in one process at a time, so concurrent jobs in separate processes need SQLite
+CATALOG_BACKEND = os.getenv("ETL_CATALOG_BACKEND", "postgres")
+CATALOG_BACKENDS = {
+    "postgres": {"extensions": ("ducklake", "postgres"), "uri_prefix": "ducklake:postgres:"},
+    "duckdb": {"extensions": ("ducklake",), "uri_prefix": "ducklake:"},
+    "sqlite": {"extensions": ("ducklake", "sqlite"), "uri_prefix": "ducklake:sqlite:"},
+}
+LOCAL_CATALOG_DIR = os.getenv("ETL_CATALOG_DIR", os.path.dirname(DATA_PATH))
+
+
+def postgres_catalog_uri() -> str:
+    """DuckLake catalog URI for the Postgres catalog database, built from the PG_* env variables."""
+    # NOTE - this is a demo example, typically, secrets would be used and the connection details NOT stored in code
+    pg_host = os.getenv('PG_HOST')
+    pg_user = os.getenv('PG_USER')
+    pg_password = os.getenv('PG_PASSWORD')
+    return f"ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}"
+
+
+def local_catalog_path(backend: str, directory: Optional[str] = None) -> str:
+    """Path of the catalog file of a local backend ("duckdb" or "sqlite"), in `directory` (defaults to ETL_CATALOG_DIR)."""
+    return os.path.join(directory or LOCAL_CATALOG_DIR, f"ducklake_catalog.{backend}")
+
+
+def catalog_uri_for(backend: Optional[str] = None, directory: Optional[str] = None) -> str:
+    """DuckLake catalog URI for a backend (defaults to ETL_CATALOG_BACKEND, or "postgres").
+
+    Args:
+        backend (Optional[str]): One of `CATALOG_BACKENDS`
+        directory (Optional[str]): Directory of the catalog file, for the local backends
+
+    Returns:
+        str: URI to attach
+    """
+    backend = backend or CATALOG_BACKEND
+    if backend not in CATALOG_BACKENDS:
+        raise ValueError(f"Unknown catalog backend `{backend}`, expected one of {sorted(CATALOG_BACKENDS)}")
+    if backend == "postgres":
+        return postgres_catalog_uri()
+    return CATALOG_BACKENDS[backend]["uri_prefix"] + local_catalog_path(backend, directory)
+
+
+def backend_of(uri: str) -> str:
+    """Catalog backend of a DuckLake URI, going by its prefix (a bare path is a DuckDB file)."""
+    for backend in ("postgres", "sqlite"):
+        if uri.startswith(CATALOG_BACKENDS[backend]["uri_prefix"]):
+            return backend
+    return "duckdb"
+
+
+class DuckLakeSession:
+    """A DuckDB connection with the DuckLake attached, shared by every job in the process.
+
+    Extensions are loaded, the catalog attached and the write profile (see `utils.write_profiles`), if
+    any, applied once, on first use. Only writers give a profile, as it changes the catalog's global
+    Parquet options: a session without one (e.g. for reads) leaves DuckDB's settings and the catalog's
+    options as they are. Callers get their own cursor (which shares the attached catalog and settings)
+    rather than opening their own connection. The catalog is `catalog_uri` if given, or else
+    that of `backend` (see `catalog_uri_for`), and only the extensions its backend needs are loaded.
+    """
+
+    def __init__(
+        self,
+        catalog_uri: Optional[str] = None,
+        data_path: Optional[str] = None,
+        encrypted: bool = False,
+        profile: Optional[str] = None,
+        backend: Optional[str] = None
+    ):
+        self.catalog_uri = catalog_uri or catalog_uri_for(backend)
+        self.backend = backend_of(self.catalog_uri)
+        self.data_path = data_path
+        self.encrypted = encrypted
+        self.profile = profile
+        self.timings = {"load_extensions_s": None, "attach_s": None, "catalog_round_trips_s": []}
+        self._con = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> duckdb.DuckDBPyConnection:
+        """The session's connection, loading extensions & attaching the DuckLake on first call."""
+        with self._lock:
+            if self._con is None:
+                con = duckdb.connect(database=":memory:")
+
+                t0 = time.perf_counter()
+                for extension in CATALOG_BACKENDS[self.backend]["extensions"]:
+                    con.install_extension(extension)
+                    con.load_extension(extension)
+                self.timings["load_extensions_s"] = time.perf_counter() - t0
+
+                options = []
+                if self.data_path:
+                    options.append(f"DATA_PATH '{self.data_path}'")
+                if self.encrypted:
+                    options.append("ENCRYPTED")
+                attach_options = f" ({', '.join(options)})" if options else ""
+
+                t0 = time.perf_counter()
+                con.execute(f"ATTACH '{self.catalog_uri}' AS {CATALOG_NAME}{attach_options} ;")
+                self.timings["attach_s"] = time.perf_counter() - t0
+
+                con.execute(f"USE {CATALOG_NAME} ;")
+                if self.profile is not None:
+                    apply_profile(con, self.profile, CATALOG_NAME)
+                self._con = con
+        return self._con
+
+    def set_profile(self, profile: str):
+        """Switch to another write profile, applying it straight away if the session is already connected."""
+        with self._lock:
+            self.profile = profile
+            if self._con is not None:
+                apply_profile(self._con, profile, CATALOG_NAME)
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """A new cursor on the session's connection, with the DuckLake as its default catalog."""
+        cur = self.connect().cursor()
+        cur.execute(f"USE {CATALOG_NAME} ;")
+        return cur
+
+    def catalog_round_trip(self) -> float:
+        """Time one metadata query against the catalog database, e.g. to gauge catalog latency."""
+        cur = self.cursor()
+        t0 = time.perf_counter()
+        cur.execute(f"SELECT max(snapshot_id) FROM ducklake_snapshots('{CATALOG_NAME}')").fetchone()
+        elapsed = time.perf_counter() - t0
+        cur.close()
+        self.timings["catalog_round_trips_s"].append(elapsed)
+        return elapsed
+
+    def close(self):
+        """Detach the DuckLake and close the connection (and with it, every cursor)."""
+        with self._lock:
+            if self._con is not None:
+                self._con.execute("USE memory ;")
+                self._con.execute(f"DETACH {CATALOG_NAME} ;")
+                self._con.close()
+                self._con = None
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(profile: Optional[str] = None) -> DuckLakeSession:
+    """The process-wide DuckLake session, created on first call.
+
+    Args:
+        profile (Optional[str]): Write profile to use (see `utils.write_profiles`), given by writer entry
+            points only. Switches an existing session to it if given; otherwise the session keeps its
+            profile, or starts without one
+
+    Returns:
+        DuckLakeSession: The shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = DuckLakeSession(profile=profile)
+        elif profile is not None and profile != _session.profile:
+            _session.set_profile(profile)
+        return _session
+
+
+def close_session():
+    """Close the process-wide session, if one is open. The next `get_session` call starts a new one."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+atexit.register(close_session)
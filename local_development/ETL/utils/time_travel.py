@@ -0,0 +1,150 @@
+# imports
+import datetime
+import duckdb
+import pyarrow as pa
+from typing import Optional
+from utils.partitions import current_snapshot_id
+from utils.schema_registry import existing_columns
+
+# Constants
+BATCH_ROWS = 122_880  # rows per streamed record batch
+
+
+def snapshot_at(con: duckdb.DuckDBPyConnection, timestamp: datetime.datetime, catalog: str = "retail_ducklake") -> Optional[int]:
+    """Id of the latest snapshot committed at or before `timestamp`, or None if the DuckLake is younger."""
+    return con.execute(
+        f"SELECT max(snapshot_id) FROM ducklake_snapshots('{catalog}') WHERE snapshot_time <= ?", [timestamp]
+    ).fetchone()[0]
+
+
+def _column_list(con: duckdb.DuckDBPyConnection, table: str, catalog: str) -> str:
+    """Select list of every current column of a table."""
+    columns = list(existing_columns(con, [table], catalog).get(table, {}))
+    if not columns:
+        raise ValueError(f"Table `{table}` does not exist in `{catalog}`")
+    return ", ".join(columns)
+
+
+def read_at(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    snapshot_id: int,
+    columns: Optional[list] = None,
+    where: Optional[str] = None,
+    params: Optional[list] = None,
+    catalog: str = "retail_ducklake",
+    batch_rows: int = BATCH_ROWS
+) -> pa.RecordBatchReader:
+    """Stream a table as it was at a snapshot (DuckLake time travel), e.g. a bronze partition before a rerun.
+
+    Only the files live at that snapshot are read, with filters in `where` pruning them as for any query.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached, kept open while reading
+        table (str): Table to read, as `schema.table`
+        snapshot_id (int): Snapshot to read the table at (see `snapshot_at` to find one by time)
+        columns (Optional[list]): Columns to read (defaults to every column)
+        where (Optional[str]): Filter, e.g. "extract_date = ?"
+        params (Optional[list]): Parameters of `where`
+        catalog (str): Name the DuckLake is attached as
+        batch_rows (int): Rows per record batch
+
+    Returns:
+        pa.RecordBatchReader: The rows, as DuckDB produces them
+    """
+    select = "*" if columns is None else ", ".join(columns)
+    filter_clause = f"WHERE {where}" if where else ""
+    return con.execute(
+        f"SELECT {select} FROM {catalog}.{table} AT (VERSION => {int(snapshot_id)}) {filter_clause}", params
+    ).fetch_record_batch(batch_rows)
+
+
+def table_changes(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    from_snapshot: int,
+    to_snapshot: Optional[int] = None,
+    net: bool = True,
+    catalog: str = "retail_ducklake",
+    batch_rows: int = BATCH_ROWS
+) -> pa.RecordBatchReader:
+    """Stream the rows inserted into & deleted from a table after `from_snapshot`, up to `to_snapshot`.
+
+    Read from the DuckLake change feed, i.e. only the data & delete files the snapshots in between added,
+    never the rest of the table. Every loader replaces whole `extract_date` partitions, so a rerun shows up
+    as every old row of the partition deleted and every new one inserted, most of them identical. With
+    `net`, rows deleted & inserted again unchanged cancel out (as multisets, so duplicates are counted),
+    leaving the rows that really changed; without it, each raw change is returned with its snapshot id.
+
+    The net changes are found by hash rather than by comparing whole rows: the feed is aggregated into a
+    net count per row hash (+1 per insert or update postimage, -1 per delete or update preimage), and
+    only rows whose hash does not cancel out are joined back and streamed, as many times as the count,
+    so memory holds the hashes & the rows that changed, not both sides of the diff.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached, kept open while reading
+        table (str): Table to diff, as `schema.table`
+        from_snapshot (int): Snapshot to diff from (its own changes are not included)
+        to_snapshot (Optional[int]): Snapshot to diff to, inclusive (defaults to the latest)
+        net (bool): Cancel out rows deleted & re-inserted unchanged
+        catalog (str): Name the DuckLake is attached as
+        batch_rows (int): Rows per record batch
+
+    Returns:
+        pa.RecordBatchReader: A `change_type` column ("insert" or "delete"), then the table's columns
+            (preceded by `snapshot_id` when not `net`)
+    """
+    to_snapshot = current_snapshot_id(con, catalog) if to_snapshot is None else to_snapshot
+    schema_name, table_name = table.split(".")
+    select = _column_list(con, table, catalog)
+    args = [catalog, schema_name, table_name, from_snapshot + 1, to_snapshot]
+
+    if net:
+        changes = f"""
+        SELECT CASE WHEN change_type IN ('delete', 'update_preimage') THEN -1 ELSE 1 END AS change_sign,
+               hash({select}) AS row_hash, {select}
+        FROM ducklake_table_changes(?, ?, ?, ?, ?)
+        """
+        query = f"""
+        SELECT CASE WHEN n.net_count > 0 THEN 'insert' ELSE 'delete' END AS change_type,
+               c.* EXCLUDE (change_sign, row_hash)
+        FROM ({changes}) AS c
+        JOIN (
+            SELECT row_hash, sum(change_sign) AS net_count
+            FROM ({changes})
+            GROUP BY row_hash
+            HAVING sum(change_sign) <> 0
+        ) AS n USING (row_hash)
+        WHERE c.change_sign = sign(n.net_count)
+        QUALIFY row_number() OVER (PARTITION BY row_hash) <= abs(n.net_count)
+        """
+        return con.execute(query, args + args).fetch_record_batch(batch_rows)
+
+    # the raw feed: an update (which the loaders never issue) shows up as a delete & an insert
+    query = f"""
+    SELECT CASE WHEN change_type LIKE 'update_pre%' THEN 'delete' WHEN change_type LIKE 'update_post%' THEN 'insert'
+                ELSE change_type END AS change_type,
+           snapshot_id, {select}
+    FROM ducklake_table_changes(?, ?, ?, ?, ?)
+    ORDER BY snapshot_id
+    """
+    return con.execute(query, args).fetch_record_batch(batch_rows)
+
+
+def changes_since(
+    con: duckdb.DuckDBPyConnection,
+    table: str,
+    since_snapshot: int,
+    catalog: str = "retail_ducklake",
+    batch_rows: int = BATCH_ROWS
+) -> tuple:
+    """Net changes to a table since a consumer's last read, and the snapshot to record as its new watermark.
+
+    Pins the latest snapshot first, so changes committed while the consumer works are picked up next time
+    rather than skipped (see `utils.watermarks`).
+
+    Returns:
+        tuple: The changes (as from `table_changes`, with `net`) & the snapshot id they run up to
+    """
+    to_snapshot = current_snapshot_id(con, catalog)
+    return table_changes(con, table, since_snapshot, to_snapshot, True, catalog, batch_rows), to_snapshot
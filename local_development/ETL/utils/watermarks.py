@@ -0,0 +1,62 @@
+# imports
+import datetime
+import duckdb
+from typing import Optional
+
+# Constants
+WATERMARK_TABLE = "retail_ops.watermarks"
+
+
+def _ensure_watermark_table(con: duckdb.DuckDBPyConnection):
+    """Create the watermark table on first use."""
+    con.execute(f"""
+    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+        target VARCHAR,
+        source VARCHAR,
+        extract_date VARCHAR,
+        snapshot_id BIGINT,
+        updated_at TIMESTAMP
+    ) ;
+    """)
+
+
+def get_watermark(con: duckdb.DuckDBPyConnection, target: str, source: str) -> Optional[dict]:
+    """High-water mark of a source table, as processed into a target table.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        target (str): Table built from `source`, as `schema.table`
+        source (str): Table read from, as `schema.table`
+
+    Returns:
+        Optional[dict]: The latest `extract_date` processed and the `snapshot_id` of `source` it was read
+            at, or None if `source` has never been processed into `target`
+    """
+    _ensure_watermark_table(con)
+    row = con.execute(
+        f"SELECT extract_date, snapshot_id FROM {WATERMARK_TABLE} WHERE target = ? AND source = ?",
+        [target, source]
+    ).fetchone()
+    return {"extract_date": row[0], "snapshot_id": row[1]} if row else None
+
+
+def set_watermark(con: duckdb.DuckDBPyConnection, target: str, source: str, extract_date: str, snapshot_id: int):
+    """Record the high-water mark of a source table for a target table.
+
+    Replacing the watermark takes a delete & an insert, so it must run in a transaction: the caller's,
+    so that the watermark is committed together with the data it covers, or else its own through
+    `utils.commits.run_in_transaction`. Run bare, a failure between the two would lose the watermark.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached & in use
+        target (str): Table built from `source`, as `schema.table`
+        source (str): Table read from, as `schema.table`
+        extract_date (str): Latest `extract_date` partition of `source` processed
+        snapshot_id (int): Snapshot of `source` read, i.e. later snapshots are still to process
+    """
+    _ensure_watermark_table(con)
+    con.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE target = ? AND source = ?", [target, source])
+    con.execute(
+        f"INSERT INTO {WATERMARK_TABLE} VALUES (?, ?, ?, ?, ?)",
+        [target, source, extract_date, snapshot_id, datetime.datetime.now()]
+    )
@@ -0,0 +1,93 @@
+# imports
+import os
+import duckdb
+from typing import Optional
+
+# Constants
+DEFAULT_PROFILE = os.getenv("ETL_WRITE_PROFILE", "nightly")
+SPILL_DIRECTORY = os.getenv("DUCKDB_SPILL_DIR", "/tmp/duckdb_spill")
+TOTAL_MEMORY_MB = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 1024 ** 2
+
+# how the ETL writes Parquet, per kind of run. `settings` are DuckDB settings of the process, `options` are DuckLake options stored in the catalog, which apply to every file written
+# after they are set (per-table options, e.g. row group sizes from `utils.layout`, take precedence).
+# On 1M sorted transaction lines, zstd level 3 compressed within 1% of level 6 in 85% of the time, while
+# level 9 bought 3% smaller files for 40% more write time. `benchmarks/bench_write_profiles.py` runs the
+# full matrix (threads, level, target file size, row group size) to re-pick these on the target host
+WRITE_PROFILES = {
+    # daily loads of a few small partitions, sharing the host with the catalog database & other jobs
+    "nightly": {
+        "settings": {
+            "threads": min(4, os.cpu_count()),
+            "memory_limit": "4GB",
+            "temp_directory": SPILL_DIRECTORY,
+        },
+        "options": {
+            "parquet_compression": "zstd",
+            "parquet_compression_level": 3,
+            "target_file_size": "128MB",
+            "parquet_row_group_size": 122_880,
+        },
+    },
+    # many partitions at once on a dedicated host: every core, 80% of RAM (DuckDB's own default) spilling
+    # to disk beyond it, and larger files, so a long history is not split over thousands of them
+    "backfill": {
+        "settings": {
+            "threads": os.cpu_count(),
+            "memory_limit": f"{int(TOTAL_MEMORY_MB * 0.8)}MB",
+            "temp_directory": SPILL_DIRECTORY,
+        },
+        "options": {
+            "parquet_compression": "zstd",
+            "parquet_compression_level": 3,
+            "target_file_size": "512MB",
+            "parquet_row_group_size": 122_880,
+        },
+    },
+}
+
+
+def apply_settings(con: duckdb.DuckDBPyConnection, profile: str):
+    """Apply a profile's DuckDB settings, which are shared by every cursor of the connection."""
+    for name, value in WRITE_PROFILES[profile]["settings"].items():
+        if name == "temp_directory":
+            os.makedirs(value, exist_ok=True)
+        con.execute(f"SET {name} = '{value}' ;")
+
+
+def apply_options(con: duckdb.DuckDBPyConnection, profile: str, catalog: str = "retail_ducklake") -> dict:
+    """Set a profile's DuckLake options in the catalog, skipping those already set to the same value.
+
+    The current options are read in one metadata query, so a run whose profile matches the last one
+    does not write to the catalog at all.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Connection with the DuckLake attached
+        profile (str): One of `WRITE_PROFILES`
+        catalog (str): Name the DuckLake is attached as
+
+    Returns:
+        dict: The options changed, with their new values
+    """
+    current = dict(con.execute(
+        f"SELECT key, value FROM __ducklake_metadata_{catalog}.ducklake_metadata WHERE scope IS NULL"
+    ).fetchall())
+    changed = {
+        name: str(value) for name, value in WRITE_PROFILES[profile]["options"].items()
+        if current.get(name) != str(value)
+    }
+    for name, value in changed.items():
+        con.execute(f"CALL {catalog}.set_option(?, ?)", [name, value])
+    return changed
+
+
+def apply_profile(con: duckdb.DuckDBPyConnection, profile: Optional[str] = None, catalog: str = "retail_ducklake") -> dict:
+    """Apply a write profile (defaults to ETL_WRITE_PROFILE, or "nightly"): DuckDB settings, then DuckLake options.
+
+    Returns:
+        dict: The DuckLake options changed, with their new values
+    """
+    profile = profile or DEFAULT_PROFILE
+    if profile not in WRITE_PROFILES:
+        raise ValueError(f"Unknown write profile `{profile}`, expected one of {sorted(WRITE_PROFILES)}")
+    apply_settings(con, profile)
+    return apply_options(con, profile, catalog)
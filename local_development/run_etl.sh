@@ -4,7 +4,12 @@ set -e
 # Python path from your conda env
 PYTHON="/opt/conda/envs/duck_etl/bin/python"
 
+# Catalog database: the docker-compose Postgres by default. Set ETL_CATALOG_BACKEND=duckdb or sqlite to keep the
+# catalog in a local file instead (in ETL_CATALOG_DIR), e.g. for dev runs without Postgres
+export ETL_CATALOG_BACKEND="${ETL_CATALOG_BACKEND:-postgres}"
+
 echo "Using Python from: $PYTHON"
+echo "Catalog backend: $ETL_CATALOG_BACKEND"
 echo
 
 echo "Build Ducklake ..."
@@ -19,17 +24,25 @@ echo "Running Retail DuckLake ETL ..."
 # Run scripts
 
 # Bronze Layer
-$PYTHON ETL/Bronze_layer/source_customer_data.py &
-$PYTHON ETL/Bronze_layer/source_transaction_data.py &
-$PYTHON ETL/Bronze_layer/source_store_data.py &
-$PYTHON ETL/Bronze_layer/source_product_data.py &
-
-wait 
+# one process: sources are generated concurrently, then loaded one commit at a time through a single catalog session
+$PYTHON ETL/run_bronze.py
 
 echo "End of Bronze Layer Build"
 echo "======================================================="
 
 # Silver Layer
+# incremental: only bronze partitions changed since each silver table's watermark are processed
+$PYTHON ETL/run_silver.py
+
+echo "End of Silver Layer Build"
+echo "======================================================="
+
+# Gold Layer
+# daily cubes re-aggregate only the silver partitions that changed, then customer RFM is re-scored
+$PYTHON ETL/Gold_layer/gold_sales.py
+
+echo "End of Gold Layer Build"
+echo "======================================================="
 
 echo
 echo "All scripts completed using duck_etl environment."
\ No newline at end of file
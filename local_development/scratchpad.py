@@ -1,39 +1,36 @@
 # imports
+import sys
 import os
-import duckdb
 import pandas as pd
 pd.set_option('display.max_colwidth', None)
 
+# make the shared ETL `utils` package importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ETL"))
+from utils.session import close_session
+from utils.query_cache import QueryCache
 
-# connect to Ducklake 
-pg_host = os.getenv('PG_HOST')
-pg_user = os.getenv('PG_USER')
-pg_password = os.getenv('PG_PASSWORD')
 
-# DuckDB connection with context manager for auto-close
-con = duckdb.connect(database=":memory:")
-
-con.execute(f"""
-ATTACH 'ducklake:postgres:dbname=ducklake_catalog host={pg_host} user={pg_user} password={pg_password}' AS retail_ducklake ;
-USE retail_ducklake ;
-""")
+# query Ducklake through the result cache (on the shared session, which attaches the catalog once). Repeat
+# queries are read from local disk until a new snapshot is committed
+cache = QueryCache()
 
 # test RAW customer data
-cust = con.execute("SELECT * FROM retail_bronze.customer_src_raw LIMIT 10").fetch_df()
+cust = cache.query("SELECT * FROM retail_bronze.customer_src_raw LIMIT 10").to_pandas()
 cust.head(10)
 
 # test RAW transaction data
-txns = con.execute("SELECT * FROM retail_bronze.transactions_src_raw LIMIT 10").fetch_df()
+txns = cache.query("SELECT * FROM retail_bronze.transactions_src_raw LIMIT 10").to_pandas()
 txns.head(10)
 
 # test stores
-strs = con.execute("SELECT * FROM retail_bronze.stores_src_raw LIMIT 10").fetch_df()
+strs = cache.query("SELECT * FROM retail_bronze.stores_src_raw LIMIT 10").to_pandas()
 strs.head(10)
 
 # products
-prd = con.execute("SELECT * FROM retail_bronze.products_src_raw LIMIT 20").fetch_df()
+prd = cache.query("SELECT * FROM retail_bronze.products_src_raw LIMIT 20").to_pandas()
 prd.head(20)
 
 # close connection
-con.close()
+print(cache.info())
+close_session()
 exit()